@@ -52,6 +52,6 @@ class BadgeEngine:
         if key not in badges:
             badges.add(key)  # Adiciona a nova conquista
             self.profile.data["badges"] = list(badges)  # Atualiza a lista de conquistas no perfil
-            self.profile._save()  # Salva as alterações no repositório de perfil
+            self.profile._save("badges")  # Salva as alterações no repositório de perfil
             return True
         return False  # A conquista já foi obtida anteriormente
@@ -0,0 +1,190 @@
+# card_search.py
+# Este arquivo implementa a busca de texto em todos os flashcards de todos os baralhos.
+# Índice invertido palavra -> cartões, mais trigramas do vocabulário (trigrama -> palavras) para achar
+# trechos de palavras ("protoc" acha "protocolo"). É mantido pelos eventos "decks" do DeckRepo e
+# persistido em decks/_search.json com a assinatura de cada baralho, para não reler baralhos inalterados.
+
+import os, json, math, heapq
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+from utils import DECKS_DIR, WORD_RE, trigrams, normalize_text as normalize  # Minúsculas e sem acentos
+from persistence import ENGINE
+from events import on_change
+
+SEARCH_PATH = os.path.join(DECKS_DIR, "_search.json")
+FRONT_WEIGHT = 2.0  # Palavras da frente valem mais que as do verso
+PARTIAL_WEIGHT = 0.5  # Trecho de palavra vale menos que a palavra inteira
+
+def tokenize(text: str) -> List[str]:
+    return WORD_RE.findall(normalize(text))
+
+Doc = Tuple[str, str]  # (arquivo do baralho, id do cartão)
+
+# Resultado de uma busca
+@dataclass
+class SearchHit:
+    deck: str  # Nome do baralho
+    card_id: str  # Id estável do cartão
+    front: str
+    back: str
+    score: float
+
+class CardSearchIndex:
+    """
+    Índice de busca dos cartões.
+    - search(query, limit): cartões que contêm todas as palavras da consulta (inteiras ou como trecho),
+      ordenados por relevância (TF-IDF simples, frente com peso maior).
+    O índice é montado na primeira busca e depois atualizado incrementalmente.
+    """
+    def __init__(self, repo):
+        self.repo = repo  # DeckRepo
+        self._built = False
+        self._decks: Dict[str, Dict] = {}  # arquivo -> {"name", "sig", "cards": {id: [frente, verso]}}
+        self._post: Dict[str, Dict[Doc, float]] = {}  # palavra -> documento -> peso do termo
+        self._tri: Dict[str, Set[str]] = {}  # trigrama -> palavras do vocabulário
+        on_change("decks", self._on_deck_change)
+
+    # ---------- montagem ----------
+    def _ensure(self):
+        if self._built: return
+        self._built = True
+        saved = self._load()
+        changed = False
+        for info in self.repo.list_deck_infos():
+            sig = [info.mtime_ns, info.size, info.journal_size]
+            entry = saved.pop(info.file, None)
+            if entry is not None and entry.get("sig") == sig:
+                self._decks[info.file] = entry
+                for cid, (front, back) in entry["cards"].items():
+                    self._add_doc((info.file, cid), front, back)
+            else:
+                deck = self.repo.load_file(info.file)
+                if deck is not None:
+                    self._index_deck(info.file, deck)
+                changed = True
+        if changed or saved:
+            self._save()
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(SEARCH_PATH, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            return raw.get("decks", {}) if raw.get("version") == 1 else {}
+        except Exception:
+            return {}
+
+    def _dump(self) -> str:
+        for fn, entry in self._decks.items():  # O índice está em dia: vale a assinatura atual do manifesto
+            info = self.repo.file_info(fn)
+            if info is not None:
+                entry["sig"] = [info.mtime_ns, info.size, info.journal_size]
+        return json.dumps({"version": 1, "decks": self._decks}, ensure_ascii=False, separators=(",", ":"))
+
+    def _save(self):
+        ENGINE.mark_dirty(SEARCH_PATH, self._dump)
+
+    def _index_deck(self, fn: str, deck):
+        self._drop_deck(fn)
+        entry = self._decks[fn] = {"name": deck.name, "sig": None, "cards": {}}
+        for c in deck.cards:
+            entry["cards"][c.id] = [c.front, c.back]
+            self._add_doc((fn, c.id), c.front, c.back)
+
+    def _drop_deck(self, fn: str):
+        entry = self._decks.pop(fn, None)
+        if entry is None: return
+        for cid, (front, back) in entry["cards"].items():
+            self._remove_doc((fn, cid), front, back)
+
+    # ---------- documentos ----------
+    @staticmethod
+    def _weights(front: str, back: str) -> Dict[str, float]:
+        w: Dict[str, float] = {}
+        for t in tokenize(front): w[t] = w.get(t, 0.0) + FRONT_WEIGHT
+        for t in tokenize(back): w[t] = w.get(t, 0.0) + 1.0
+        return w
+
+    def _add_doc(self, doc: Doc, front: str, back: str):
+        for t, w in self._weights(front, back).items():
+            p = self._post.get(t)
+            if p is None:
+                p = self._post[t] = {}
+                for g in trigrams(t): self._tri.setdefault(g, set()).add(t)
+            p[doc] = w
+
+    def _remove_doc(self, doc: Doc, front: str, back: str):
+        for t in self._weights(front, back):
+            p = self._post.get(t)
+            if p is None: continue
+            p.pop(doc, None)
+            if not p:
+                del self._post[t]
+                for g in trigrams(t):
+                    s = self._tri.get(g)
+                    if s is not None:
+                        s.discard(t)
+                        if not s: del self._tri[g]
+
+    # ---------- eventos do DeckRepo ----------
+    def _on_deck_change(self, deck: str, op: str, card=None, **_):
+        if not self._built: return  # A primeira busca lê o estado atual
+        fn = self.repo.file_for(deck)
+        if op == "delete":
+            self._drop_deck(fn); self._save()
+        elif op == "save":
+            d = self.repo.load_file(fn)
+            if d is not None: self._index_deck(fn, d); self._save()
+        elif card is not None:
+            entry = self._decks.setdefault(fn, {"name": deck, "sig": None, "cards": {}})
+            old = entry["cards"].get(card.id)
+            if op == "del":
+                if old is not None:
+                    self._remove_doc((fn, card.id), *old); del entry["cards"][card.id]; self._save()
+            elif old is None or old != [card.front, card.back]:  # Revisões (só datas) não mexem no índice
+                if old is not None: self._remove_doc((fn, card.id), *old)
+                entry["cards"][card.id] = [card.front, card.back]
+                self._add_doc((fn, card.id), card.front, card.back)
+                self._save()
+
+    # ---------- busca ----------
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Palavras do vocabulário que casam com o termo: a própria (peso 1) e as que o contêm (peso menor)."""
+        out: Dict[str, float] = {}
+        if term in self._post: out[term] = 1.0
+        if len(term) >= 3:
+            grams = sorted((self._tri.get(g, set()) for g in trigrams(term)), key=len)
+            if grams and grams[0]:
+                cands = set(grams[0]).intersection(*grams[1:])
+                for t in cands:
+                    if t != term and term in t: out[t] = PARTIAL_WEIGHT
+        return out
+
+    def search(self, query: str, limit: int = 50, deck: Optional[str] = None) -> List[SearchHit]:
+        """Cartões com todas as palavras de `query`, do mais ao menos relevante."""
+        self._ensure()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms: return []
+        n_docs = max(1, sum(len(e["cards"]) for e in self._decks.values()))
+        scores: Optional[Dict[Doc, float]] = None
+        # Termos mais raros primeiro: o conjunto de candidatos encolhe rápido
+        expanded = sorted((self._expand(t) for t in terms), key=lambda m: sum(len(self._post[w]) for w in m))
+        for words in expanded:
+            acc: Dict[Doc, float] = {}
+            for w, mult in words.items():
+                p = self._post[w]
+                idf = math.log(1 + n_docs / len(p))
+                items = p.items() if scores is None else ((d, p[d]) for d in scores if d in p)
+                for d, tw in items:
+                    s = tw * idf * mult
+                    if s > acc.get(d, 0.0): acc[d] = s  # Melhor casamento do termo no documento
+            scores = {d: s + (scores[d] if scores is not None else 0.0) for d, s in acc.items()}
+            if not scores: return []
+        items = scores.items()
+        if deck is not None:
+            items = [(d, s) for d, s in items if self._decks[d[0]]["name"] == deck]
+        hits: List[SearchHit] = []
+        for (fn, cid), s in heapq.nlargest(limit, items, key=lambda x: x[1]):
+            entry = self._decks[fn]
+            front, back = entry["cards"][cid]
+            hits.append(SearchHit(entry["name"], cid, front, back, s))
+        return hits
@@ -1,8 +1,31 @@
 # command.py
 # Este arquivo implementa o padrão de design Command, que encapsula ações como objetos, permitindo desfazer e refazer operações.
 # Ele inclui uma classe base abstrata para comandos e implementações específicas para gerenciar tarefas.
+# O histórico é limitado (por número de passos e bytes estimados), edições seguidas do mesmo campo
+# são fundidas em um único passo e a pilha de desfazer pode ser salva de forma compacta em disco.
 
+import json, time
 from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager, ExitStack
+from typing import Deque, List, Optional, Tuple
+from persistence import ENGINE  # Descarga única ao fim de um lote
+
+MAX_STEPS = 200  # Passos guardados na pilha de desfazer
+MAX_BYTES = 512 * 1024  # Tamanho estimado máximo do histórico (estado serializado)
+COALESCE_S = 2.0  # Edições do mesmo campo/tarefa dentro desta janela viram um único passo
+TASK_FIELDS = ("id", "title", "priority", "tags", "scheduled", "done")  # Ordem do formato compacto
+
+def _exists(repo, tid) -> bool:
+    try: return repo.get(tid) is not None
+    except KeyError: return False
+
+def _batching(stack: ExitStack, entered: set, cmd):
+    """Entra (uma vez por repositório) no batch() do repositório usado pelo comando, se existir."""
+    repo = getattr(cmd, "repo", None)
+    if repo is not None and hasattr(repo, "batch") and id(repo) not in entered:
+        entered.add(id(repo))
+        stack.enter_context(repo.batch())
 
 # Classe base abstrata para comandos
 class Command(ABC):
@@ -13,32 +36,179 @@ class Command(ABC):
     @abstractmethod
     def undo(self): ...  # Método para desfazer o comando
 
+    def merge(self, other: 'Command') -> bool:
+        """Absorve `other` (executado logo depois) neste passo; False se não for possível."""
+        return False
+
+    def state(self) -> Optional[list]:
+        """Forma compacta (JSON) para salvar o histórico; None = comando não persistível."""
+        return None
+
+    def valid(self) -> bool:
+        """Se o comando ainda pode ser desfeito no estado atual do repositório (histórico recarregado)."""
+        return True
+
+# Comando composto: vários comandos como um único passo de desfazer/refazer
+class CompositeCommand(Command):
+    """Executa os comandos em ordem (e os desfaz na ordem inversa) dentro de um único lote de persistência."""
+    def __init__(self, commands=None, label: str = ""):
+        self.commands: List[Command] = list(commands or [])  # Comandos agrupados
+        self.label = label  # Descrição opcional (ex.: "Concluir 12 tarefas")
+
+    def _run(self, steps):
+        with ExitStack() as stack:
+            stack.enter_context(ENGINE.batch())
+            entered = set()
+            for c in self.commands: _batching(stack, entered, c)
+            for step in steps: step()
+
+    def do(self):
+        self._run([c.do for c in self.commands])
+
+    def undo(self):
+        self._run([c.undo for c in reversed(self.commands)])
+
+    def state(self):
+        parts = [c.state() for c in self.commands]
+        return None if any(p is None for p in parts) else ["group", self.label, parts]
+
+    def valid(self):
+        return all(c.valid() for c in self.commands)
+
 # Gerenciador de comandos para controle de desfazer/refazer
 class CommandManager:
-    def __init__(self):
+    """
+    Pilhas de desfazer/refazer limitadas a `max_steps` passos e `max_bytes` (estimados pelo estado
+    serializado de cada passo; os mais antigos são descartados primeiro). Com `repo` e `path`, a pilha
+    de desfazer é recarregada na criação e salva (via ENGINE) a cada mudança.
+    """
+    def __init__(self, repo=None, path: Optional[str] = None, max_steps: int = MAX_STEPS,
+                 max_bytes: int = MAX_BYTES, coalesce_s: float = COALESCE_S):
         """Inicializa as pilhas de comandos para desfazer e refazer."""
-        self._undo = []  # Pilha de comandos executados
-        self._redo = []  # Pilha de comandos desfeitos
+        self._undo: Deque[Tuple[Command, int]] = deque()  # Pilha de (comando, bytes estimados) executados
+        self._redo: List[Tuple[Command, int]] = []  # Pilha de comandos desfeitos
+        self._tx = None  # (comandos, ExitStack, repositórios) da transação aberta
+        self.repo = repo  # Repositório usado para recriar os comandos salvos
+        self.path = path  # Arquivo do histórico (None = só em memória)
+        self.max_steps = max_steps
+        self.max_bytes = max_bytes
+        self.coalesce_s = coalesce_s
+        self._bytes = 0  # Total estimado das duas pilhas
+        self._last_at = 0.0  # Momento do último do() (para fundir edições)
+        if repo is not None and path:
+            self._load()
+
+    # ---------- limites ----------
+    @staticmethod
+    def _size(cmd: Command) -> int:
+        st = cmd.state()
+        return len(json.dumps(st, ensure_ascii=False, separators=(",", ":"))) if st is not None else 256
+
+    def _push(self, cmd: Command):
+        n = self._size(cmd)
+        self._undo.append((cmd, n)); self._bytes += n
+        for _, m in self._redo: self._bytes -= m
+        self._redo.clear()  # Limpa a pilha de refazer
+        while len(self._undo) > 1 and (len(self._undo) > self.max_steps or self._bytes > self.max_bytes):
+            self._bytes -= self._undo.popleft()[1]  # Descarta o passo mais antigo
+
+    def stats(self) -> dict:
+        """Tamanho atual do histórico."""
+        return {"undo": len(self._undo), "redo": len(self._redo), "bytes": self._bytes}
 
     def do(self, cmd: 'Command'):
-        """Executa um comando e o adiciona à pilha de desfazer."""
+        """Executa um comando e o adiciona à pilha de desfazer (ou à transação aberta)."""
+        if self._tx is not None:
+            cmds, stack, entered = self._tx
+            _batching(stack, entered, cmd)
+            cmd.do()
+            cmds.append(cmd)
+            return
         cmd.do()  # Executa o comando
-        self._undo.append(cmd)  # Adiciona à pilha de desfazer
-        self._redo.clear()  # Limpa a pilha de refazer
+        now = time.monotonic()
+        recent, self._last_at = now - self._last_at <= self.coalesce_s, now
+        if recent and self._undo and not self._redo and self._undo[-1][0].merge(cmd):
+            top, n = self._undo.pop(); self._bytes -= n
+            if not getattr(top, "noop", False):  # Edições que voltaram ao valor original somem
+                m = self._size(top); self._undo.append((top, m)); self._bytes += m
+        else:
+            self._push(cmd)  # Adiciona à pilha de desfazer
+        self._save()
+
+    @contextmanager
+    def transaction(self, label: str = ""):
+        """
+        Agrupa os comandos executados com do() dentro do bloco em um único passo de desfazer.
+        A persistência fica adiada até o fim do bloco (uma descarga). Se o bloco falhar,
+        os comandos já executados são desfeitos e a exceção é propagada.
+        """
+        if self._tx is not None:  # Transações aninhadas entram na externa
+            yield self; return
+        cmds: List[Command] = []
+        with ExitStack() as stack:
+            stack.enter_context(ENGINE.batch())
+            self._tx = (cmds, stack, set())
+            try:
+                yield self
+            except BaseException:
+                self._tx = None
+                for c in reversed(cmds): c.undo()
+                raise
+            finally:
+                self._tx = None
+            if cmds:
+                self._push(cmds[0] if len(cmds) == 1 else CompositeCommand(cmds, label))
+                self._last_at = 0.0  # Não funde com o passo seguinte
+                self._save()
 
     def undo(self):
         """Desfaz o último comando executado."""
         if not self._undo: return  # Verifica se há comandos para desfazer
-        c = self._undo.pop()  # Remove o último comando da pilha de desfazer
+        c, n = self._undo.pop()  # Remove o último comando da pilha de desfazer
+        if not c.valid():  # Tarefas mudaram por fora (histórico recarregado): o resto não é confiável
+            self._undo.clear(); self._bytes = sum(m for _, m in self._redo)
+            self._save(); return
         c.undo()  # Desfaz o comando
-        self._redo.append(c)  # Adiciona à pilha de refazer
+        self._redo.append((c, n))  # Adiciona à pilha de refazer
+        self._last_at = 0.0
+        self._save()
 
     def redo(self):
         """Refaz o último comando desfeito."""
         if not self._redo: return  # Verifica se há comandos para refazer
-        c = self._redo.pop()  # Remove o último comando da pilha de refazer
+        c, n = self._redo.pop()  # Remove o último comando da pilha de refazer
         c.do()  # Reexecuta o comando
-        self._undo.append(c)  # Adiciona novamente à pilha de desfazer
+        self._undo.append((c, n))  # Adiciona novamente à pilha de desfazer
+        self._last_at = 0.0
+        self._save()
+
+    # ---------- persistência ----------
+    def _dump(self) -> str:
+        steps = [st for st in (c.state() for c, _ in self._undo) if st is not None]
+        return json.dumps({"version": 1, "undo": steps}, ensure_ascii=False, separators=(",", ":"))
+
+    def _save(self):
+        if self.path and self.repo is not None:
+            ENGINE.mark_dirty(self.path, self._dump)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        if raw.get("version") != 1: return
+        for st in raw.get("undo", [])[-self.max_steps:]:
+            try:
+                cmd = from_state(self.repo, st)
+            except (KeyError, IndexError, TypeError, ValueError):
+                cmd = None
+            if cmd is None:  # Passo ilegível: os anteriores não são mais alcançáveis
+                self._undo.clear(); self._bytes = 0
+                continue
+            self._push(cmd)
+        if self._undo and not self._undo[-1][0].valid():  # Tarefas mudaram por fora desde o último salvamento
+            self._undo.clear(); self._bytes = 0
 
 # Comando para adicionar uma nova tarefa
 class AddTask(Command):
@@ -56,6 +226,12 @@ class AddTask(Command):
         """Remove a tarefa criada."""
         self.repo.remove(self.created.id)
 
+    def state(self):
+        return ["add", self.kw, self.created.id if self.created else None]
+
+    def valid(self):
+        return self.created is not None and _exists(self.repo, self.created.id)
+
 # Comando para editar uma tarefa existente
 class EditTask(Command):
     def __init__(self, repo, tid, fields):
@@ -75,26 +251,48 @@ class EditTask(Command):
         """Restaura os valores anteriores da tarefa."""
         self.repo.update(self.tid, **self.prev)
 
+    def merge(self, other):
+        """Funde uma edição seguinte da mesma tarefa e dos mesmos campos (mantém os valores originais)."""
+        if not isinstance(other, EditTask) or other.repo is not self.repo or other.tid != self.tid \
+                or set(other.fields) != set(self.fields):
+            return False
+        self.fields = other.fields
+        return True
+
+    @property
+    def noop(self) -> bool:
+        """Edição que voltou aos valores originais."""
+        return self.prev is not None and all(self.prev[k] == v for k, v in self.fields.items())
+
+    def state(self):
+        return ["edit", self.tid, self.fields, self.prev]
+
+    def valid(self):
+        return _exists(self.repo, self.tid)
+
 # Comando para excluir uma tarefa
 class DeleteTask(Command):
     def __init__(self, repo, tid):
         """Inicializa o comando com o ID da tarefa a ser excluída."""
         self.repo = repo  # Repositório de tarefas
         self.tid = tid  # ID da tarefa
-        self.prev = None  # Armazena os dados da tarefa para desfazer
+        self.prev = None  # Valores da tarefa (na ordem de TASK_FIELDS) para desfazer
 
     def do(self):
         """Remove a tarefa do repositório."""
         t = self.repo.get(self.tid)  # Obtém a tarefa
-        self.prev = t.to_dict()  # Salva os dados da tarefa
+        self.prev = [getattr(t, k) for k in TASK_FIELDS]  # Lista em vez de dict: metade da memória
         self.repo.remove(self.tid)  # Remove a tarefa
 
     def undo(self):
         """Restaura a tarefa removida."""
-        from models import Task
-        obj = Task.from_dict(self.prev)  # Reconstrói a tarefa
-        self.repo.tasks.append(obj)  # Adiciona de volta ao repositório
-        self.repo._save()  # Salva as alterações
+        self.repo.restore(dict(zip(TASK_FIELDS, self.prev)))  # Reconstrói a tarefa com o mesmo ID e registra a operação
+
+    def state(self):
+        return ["del", self.prev]
+
+    def valid(self):
+        return not _exists(self.repo, self.tid)
 
 # Comando para alternar o estado de conclusão de uma tarefa
 class ToggleDone(Command):
@@ -116,4 +314,37 @@ class ToggleDone(Command):
     def undo(self):
         """Restaura o estado anterior da tarefa."""
         # Não decrementa estatísticas ao desfazer para simplificar
-        self.repo.update(self.tid, done=self.prev)
\ No newline at end of file
+        self.repo.update(self.tid, done=self.prev)
+
+    def merge(self, other):
+        """Dois cliques seguidos na mesma tarefa se anulam."""
+        if not isinstance(other, ToggleDone) or other.repo is not self.repo or other.tid != self.tid:
+            return False
+        self.noop = True
+        return True
+
+    def state(self):
+        return ["toggle", self.tid, self.prev]
+
+    def valid(self):
+        return _exists(self.repo, self.tid)
+
+def from_state(repo, st) -> Optional[Command]:
+    """Recria um comando já executado a partir de Command.state() (estatísticas não são religadas)."""
+    kind = st[0]
+    if kind == "add":
+        c = AddTask(repo, **st[1])
+        c.created = repo.get(st[2]) if st[2] is not None and _exists(repo, st[2]) else None
+    elif kind == "edit":
+        c = EditTask(repo, st[1], st[2]); c.prev = st[3]
+    elif kind == "del":
+        c = DeleteTask(repo, st[1][0]); c.prev = list(st[1])
+    elif kind == "toggle":
+        c = ToggleDone(repo, st[1]); c.prev = st[2]
+    elif kind == "group":
+        parts = [from_state(repo, p) for p in st[2]]
+        if any(p is None for p in parts): return None
+        c = CompositeCommand(parts, st[1])
+    else:
+        return None
+    return c
@@ -0,0 +1,101 @@
+# cooccur.py
+# Este arquivo implementa a matriz esparsa de coocorrência de tags ("java" aparece junto de "poo" em N tarefas),
+# usada para sugerir tags relacionadas às que já estão na tarefa.
+# O TaskRepo a atualiza a cada add/update/remove aplicando só a diferença entre as tags antigas e as novas,
+# e a salva em data/cooccur.json junto com o snapshot das tarefas (o journal é reaplicado por cima).
+
+import json, heapq, hashlib
+from itertools import permutations
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+TOP_K = 16  # Vizinhos mais fortes guardados em cache por tag
+
+def text_sig(text: str) -> str:
+    """Assinatura do snapshot de tarefas ao qual a matriz salva corresponde."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def pair_delta(old: Iterable[str], new: Iterable[str]) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]:
+    """Pares ordenados (a, b) que saem e que entram quando as tags de uma tarefa passam de `old` para `new`."""
+    old_p = set(permutations(set(old), 2))
+    new_p = set(permutations(set(new), 2))
+    return old_p - new_p, new_p - old_p
+
+def rank_related(tops: Dict[str, Tuple[int, Sequence[Tuple[int, str]]]], exclude: Set[str], k: int) -> List[str]:
+    """
+    Soma, para cada candidata, a fração das tarefas de cada tag da tarefa em que ela aparece junto
+    (tops: tag -> (nº de tarefas, [(coocorrências, vizinha), ...])). Custa O(m·K), não depende do nº de tags.
+    """
+    score: Dict[str, float] = {}
+    for freq, top in tops.values():
+        if not freq: continue
+        for n, b in top:
+            if b not in exclude:
+                score[b] = score.get(b, 0.0) + n / freq
+    return [b for b, _ in heapq.nsmallest(k, score.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+class CooccurrenceIndex:
+    """
+    Coocorrências em memória: pares[a][b] = nº de tarefas com a e b (simétrica), freq[a] = nº de tarefas com a.
+    - update(old, new): aplica a troca de tags de uma tarefa.
+    - related(tags, k): tags que mais aparecem junto das `tags`, sem elas.
+    """
+    def __init__(self):
+        self.pairs: Dict[str, Dict[str, int]] = {}
+        self.freq: Dict[str, int] = {}
+        self._top: Dict[str, List[Tuple[int, str]]] = {}  # Cache: tag -> vizinhos mais fortes (invalidado por mudança)
+
+    def update(self, old: Iterable[str], new: Iterable[str]):
+        old, new = set(old or ()), set(new or ())
+        if old == new: return
+        for t in old - new:
+            n = self.freq.get(t, 0) - 1
+            if n > 0: self.freq[t] = n
+            else: self.freq.pop(t, None)
+        for t in new - old:
+            self.freq[t] = self.freq.get(t, 0) + 1
+        gone, came = pair_delta(old, new)
+        for a, b in gone:
+            row = self.pairs.get(a)
+            if row is None: continue
+            n = row.get(b, 0) - 1
+            if n > 0: row[b] = n
+            else:
+                row.pop(b, None)
+                if not row: del self.pairs[a]
+            self._top.pop(a, None)
+        for a, b in came:
+            row = self.pairs.setdefault(a, {})
+            row[b] = row.get(b, 0) + 1
+            self._top.pop(a, None)
+
+    def top(self, tag: str) -> List[Tuple[int, str]]:
+        """Vizinhos mais fortes da tag (em cache até a linha mudar)."""
+        top = self._top.get(tag)
+        if top is None:
+            row = self.pairs.get(tag, {})
+            top = self._top[tag] = [(n, b) for b, n in heapq.nsmallest(TOP_K, row.items(), key=lambda kv: (-kv[1], kv[0]))]
+        return top
+
+    def related(self, tags: Iterable[str], k: int = 6) -> List[str]:
+        tags = set(tags)
+        return rank_related({t: (self.freq.get(t, 0), self.top(t)) for t in tags}, tags, k)
+
+    # ---------- persistência ----------
+    def dump(self, sig: str) -> str:
+        return json.dumps({"version": 1, "sig": sig, "freq": self.freq, "pairs": self.pairs},
+                          ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def load(path: str, sig: str) -> Optional["CooccurrenceIndex"]:
+        """Matriz salva para o snapshot com assinatura `sig` (None se não existir ou estiver desatualizada)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if raw.get("version") != 1 or raw.get("sig") != sig:
+            return None
+        idx = CooccurrenceIndex()
+        idx.freq = {t: int(n) for t, n in raw.get("freq", {}).items()}
+        idx.pairs = {a: {b: int(n) for b, n in row.items()} for a, row in raw.get("pairs", {}).items()}
+        return idx
@@ -2,10 +2,19 @@
 # Este arquivo implementa o repositório para gerenciar baralhos e cartões de estudo.
 # Ele fornece métodos para criar, listar, atualizar e excluir baralhos e cartões, além de funcionalidades específicas como múltipla escolha.
 
-import os, json, random, re
-from typing import List, Optional
-from utils import DECKS_DIR, ensure_data_dirs  # Utilitários para gerenciar diretórios e dados
-from models import Deck, Card  # Modelos de dados para baralhos e cartões
+import os, json, random, re, uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from utils import DECKS_DIR, DECKS_JOURNAL, ensure_data_dirs  # Utilitários para gerenciar diretórios e dados
+from models import Deck, Card, DeckInfo  # Modelos de dados para baralhos e cartões
+from persistence import ENGINE, atomic_write  # Gravação adiada/atômica
+from journal import Journal  # Journal de operações append-only
+from events import emit  # Feed de mudanças ("decks")
+from distractors import DistractorIndex  # Alternativas para múltipla escolha
+
+# Manifesto dos baralhos: nome, arquivo, nº de cartões e histograma de revisões por arquivo.
+# Arquivos com prefixo "_" em DECKS_DIR são metadados, não baralhos.
+INDEX_PATH = os.path.join(DECKS_DIR, "_index.json")
 
 # Função auxiliar para gerar nomes seguros para arquivos
 # Substitui caracteres inválidos por "_" e normaliza o nome
@@ -15,11 +24,77 @@ def _safe_name(name: str) -> str:
     s = re.sub(r'_+', '_', s)  # Remove múltiplos "_" consecutivos
     return s.strip('_')
 
+# Cache LRU de baralhos já carregados, limitado pelo total de cartões
+class DeckCache:
+    """
+    Guarda objetos Deck por caminho, validados por (mtime_ns, tamanho) do arquivo.
+    Quando o total de cartões passa de `max_cards`, os baralhos usados há mais tempo são descartados,
+    exceto os de `pinned` (baralhos com patches ainda não compactados, que não podem ser relidos do arquivo).
+    """
+    def __init__(self, max_cards: int = 100_000, pinned=()):
+        self.max_cards = max_cards  # Limite de cartões mantidos em memória
+        self.pinned = pinned  # Caminhos que nunca são descartados (consultado a cada descarte)
+        self._items: "OrderedDict[str, Tuple[Tuple[int, int], Deck, int]]" = OrderedDict()
+        self._cards = 0  # Total de cartões em cache
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path: str, sig: Tuple[int, int]) -> Optional[Deck]:
+        """Retorna o baralho em cache se a assinatura do arquivo não mudou."""
+        item = self._items.get(path)
+        if item is None or item[0] != sig:
+            self.misses += 1
+            return None
+        self._items.move_to_end(path)
+        self.hits += 1
+        return item[1]
+
+    def put(self, path: str, sig: Tuple[int, int], deck: Deck):
+        """Guarda (ou substitui) o baralho e aplica o limite de cartões."""
+        self.invalidate(path)
+        n = len(deck.cards)  # Guardado junto: reatualizado por put() a cada alteração do baralho
+        self._items[path] = (sig, deck, n)
+        self._cards += n
+        if self._cards > self.max_cards:
+            for old in list(self._items)[:-1]:  # Do mais antigo ao mais recente, sem o que acabou de entrar
+                if self._cards <= self.max_cards: break
+                if old in self.pinned: continue
+                self._cards -= self._items.pop(old)[2]
+
+    def invalidate(self, path: str):
+        """Remove o baralho do cache, se presente."""
+        item = self._items.pop(path, None)
+        if item is not None:
+            self._cards -= item[2]
+
+    def stats(self) -> Dict[str, int]:
+        """Métricas do cache (acertos, faltas, baralhos e cartões em memória)."""
+        return {"hits": self.hits, "misses": self.misses, "decks": len(self._items), "cards": self._cards}
+
+def _sig(st) -> Tuple[int, int]:
+    return (st.st_mtime_ns, st.st_size)
+
+def _journal_path(path: str) -> str:
+    """Journal de cartões do baralho: mesmo nome do arquivo, extensão .journal."""
+    return os.path.splitext(path)[0] + ".journal"
+
+def _new_card_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+# Campos de Card que podem ser alterados por um patch "set"
+_CARD_FIELDS = ("front", "back", "interval", "ease", "due")
+
 # Classe principal para gerenciar baralhos
 class DeckRepo:
     def __init__(self):
         ensure_data_dirs()  # Garante que os diretórios necessários existem
         self._bootstrap_default_decks()  # Inicializa baralhos padrão, se necessário
+        self._index: Dict[str, DeckInfo] = self._load_index()  # arquivo -> entrada do manifesto
+        self.use_journal = DECKS_JOURNAL  # Patches por cartão em vez de reescrever o baralho inteiro
+        self._journals: Dict[str, Journal] = {}  # caminho do baralho -> journal aberto
+        self._live: Dict[str, Deck] = {}  # caminho -> baralho com patches ainda não compactados
+        self.cache = DeckCache(pinned=self._live)  # Baralhos já carregados (os de _live ficam fixos)
+        self._distractors: Dict[str, Tuple[Deck, DistractorIndex]] = {}  # nome -> (baralho, índice de respostas)
 
     # ---------------- bootstrap ----------------
     def _bootstrap_default_decks(self):
@@ -64,33 +139,251 @@ class DeckRepo:
             {"front":"Interface define...","back":"contrato de métodos","interval":1,"ease":2.5,"due":None},
         ])
 
+    # ---------------- manifesto ----------------
+    def _load_index(self) -> Dict[str, DeckInfo]:
+        """Lê decks/_index.json (entradas inválidas são ignoradas e reconstruídas sob demanda)."""
+        try:
+            with open(INDEX_PATH, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            return {e["file"]: DeckInfo(**e) for e in raw.get("decks", [])}
+        except Exception:
+            return {}
+
+    def _dump_index(self) -> str:
+        entries = [e.__dict__ for e in sorted(self._index.values(), key=lambda e: e.file)]
+        return json.dumps({"version": 1, "decks": entries}, ensure_ascii=False, separators=(",", ":"))
+
+    def _save_index(self):
+        ENGINE.mark_dirty(INDEX_PATH, self._dump_index)
+
+    @staticmethod
+    def _deck_files():
+        """Itera (nome do arquivo, stat) dos baralhos em DECKS_DIR."""
+        with os.scandir(DECKS_DIR) as it:
+            for e in it:
+                if e.name.endswith(".json") and not e.name.startswith("_") and e.is_file():
+                    yield e.name, e.stat()
+
+    @staticmethod
+    def _info_for(fn: str, deck: Deck, st, journal_size: int = 0) -> DeckInfo:
+        """Monta a entrada do manifesto a partir de um baralho já carregado."""
+        hist: Dict[str, int] = {}
+        for c in deck.cards:
+            k = c.due or ""
+            hist[k] = hist.get(k, 0) + 1
+        return DeckInfo(name=deck.name, file=fn, cards=len(deck.cards), due_hist=hist,
+                        mtime_ns=st.st_mtime_ns, size=st.st_size, journal_size=journal_size)
+
+    @staticmethod
+    def _journal_size(fn: str) -> int:
+        try: return os.path.getsize(_journal_path(os.path.join(DECKS_DIR, fn)))
+        except OSError: return 0
+
+    def _touch_info(self, path: str, deck: Deck, old_due=(), new_due=()):
+        """Atualiza a entrada do manifesto após um patch (contagem e histograma de revisões)."""
+        info = self._index.get(os.path.basename(path))
+        if info is None:
+            return  # Ainda não indexado: list_deck_infos monta a entrada completa
+        for d in old_due:
+            k = d or ""
+            info.due_hist[k] = info.due_hist.get(k, 0) - 1
+            if info.due_hist[k] <= 0: del info.due_hist[k]
+        for d in new_due:
+            k = d or ""
+            info.due_hist[k] = info.due_hist.get(k, 0) + 1
+        info.cards = len(deck.cards)
+        j = self._journals.get(path)
+        info.journal_size = j.size if j is not None else 0
+        self._save_index()
+
+    def list_deck_infos(self) -> List[DeckInfo]:
+        """
+        Lista os baralhos pelo manifesto, sem carregar cartões.
+        Só os arquivos cujo (mtime, tamanho) ou journal mudou desde a última indexação são lidos de novo.
+        """
+        changed = False
+        seen = set()
+        for fn, st in self._deck_files():
+            seen.add(fn)
+            cur = self._index.get(fn)
+            jsize = self._journal_size(fn)
+            if (cur is not None and cur.mtime_ns == st.st_mtime_ns and cur.size == st.st_size
+                    and cur.journal_size == jsize):
+                continue
+            deck = self._read_file(fn, st)
+            if deck is None:
+                if self._index.pop(fn, None) is not None: changed = True
+                continue
+            self._index[fn] = self._info_for(fn, deck, os.stat(os.path.join(DECKS_DIR, fn)), self._journal_size(fn))
+            changed = True
+        for fn in [fn for fn in self._index if fn not in seen]:
+            del self._index[fn]; changed = True
+        if changed:
+            self._save_index()
+        return sorted(self._index.values(), key=lambda e: e.name.lower())
+
     # ---------------- I/O ----------------
+    def _read_file(self, fn: str, st=None) -> Optional[Deck]:
+        """Carrega um único arquivo de baralho, usando o cache se o arquivo não mudou (None se ilegível)."""
+        path = os.path.join(DECKS_DIR, fn)
+        deck = self._live.get(path)
+        if deck is not None:
+            return deck  # Patches pendentes: este objeto é a única versão atual do baralho
+        try:
+            sig = _sig(st or os.stat(path))
+            deck = self.cache.get(path, sig)
+            if deck is not None:
+                return deck
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            cards = [Card(**c) for c in raw.get("cards", [])]
+            deck = Deck(name=raw.get("name", os.path.splitext(fn)[0]), cards=cards)
+        except Exception:
+            return None
+        if self._assign_ids(deck):
+            self._write_deck(path, deck)  # Migração: grava os ids antes de qualquer patch referenciá-los
+            sig = _sig(os.stat(path))
+        if os.path.exists(_journal_path(path)):
+            self._replay(path, deck)
+        self.cache.put(path, sig, deck)
+        return deck
+
+    @staticmethod
+    def _assign_ids(deck: Deck) -> bool:
+        """Dá um id estável aos cartões que ainda não têm (baralhos antigos). Retorna True se algum mudou."""
+        changed = False
+        for c in deck.cards:
+            if not c.id:
+                c.id = _new_card_id(); changed = True
+        return changed
+
+    def _journal(self, path: str) -> Journal:
+        j = self._journals.get(path)
+        if j is None:
+            j = self._journals[path] = Journal(_journal_path(path))
+        return j
+
+    def _replay(self, path: str, deck: Deck):
+        """Reaplica os patches do journal sobre o baralho recém-lido."""
+        j = self._journal(path)
+        by_id = {c.id: c for c in deck.cards}
+        removed = set()
+        for op in j.replay():
+            kind = op.get("op")
+            if kind == "add":
+                c = Card(**op["card"])
+                deck.cards.append(c); by_id[c.id] = c
+                removed.discard(c.id)
+            elif kind == "set":
+                c = by_id.get(op.get("id"))
+                if c is not None:
+                    for k, v in op.get("f", {}).items():
+                        if k in _CARD_FIELDS: setattr(c, k, v)
+            elif kind == "del":
+                if by_id.pop(op.get("id"), None) is not None:
+                    removed.add(op["id"])
+        if removed:
+            deck.cards = [c for c in deck.cards if c.id not in removed]
+        if j.ops:
+            self._live[path] = deck
+            if j.needs_compaction():
+                self._schedule_compact(path)
+
     def list_decks(self) -> List[Deck]:
-        """Lista todos os baralhos disponíveis no diretório."""
+        """Lista todos os baralhos disponíveis no diretório (carrega todos os cartões)."""
         decks: List[Deck] = []
-        for fn in os.listdir(DECKS_DIR):
-            if not fn.endswith(".json"): continue
-            try:
-                with open(os.path.join(DECKS_DIR, fn), "r", encoding="utf-8") as f:
-                    raw = json.load(f)
-                cards = [Card(**c) for c in raw.get("cards", [])]
-                name = raw.get("name", os.path.splitext(fn)[0])
-                decks.append(Deck(name=name, cards=cards))
-            except Exception:
-                continue
+        for fn, st in self._deck_files():
+            deck = self._read_file(fn, st)
+            if deck is not None:
+                decks.append(deck)
         decks.sort(key=lambda d: d.name.lower())
         return decks
 
+    def get_deck(self, name: str) -> Optional[Deck]:
+        """Carrega um único baralho pelo nome (arquivo canônico primeiro, depois o manifesto)."""
+        fn = os.path.basename(self._deck_path(name))
+        if os.path.exists(os.path.join(DECKS_DIR, fn)):
+            return self._read_file(fn)
+        for info in self.list_deck_infos():
+            if info.name == name:
+                return self._read_file(info.file)
+        return None
+
+    def load_file(self, fn: str) -> Optional[Deck]:
+        """Carrega o baralho de um arquivo de DECKS_DIR (nome do arquivo, como no manifesto)."""
+        return self._read_file(fn)
+
+    def file_for(self, name: str) -> str:
+        """Nome do arquivo em que o baralho `name` é gravado."""
+        return os.path.basename(self._deck_path(name))
+
+    def file_info(self, fn: str) -> Optional[DeckInfo]:
+        """Entrada atual do manifesto para o arquivo (None se não indexado)."""
+        return self._index.get(fn)
+
     def _deck_path(self, name: str) -> str:
         """Retorna o caminho do arquivo JSON correspondente ao baralho."""
         return os.path.join(DECKS_DIR, f"{_safe_name(name)}.json")
 
+    def _write_deck(self, path: str, deck: Deck):
+        # Um cartão por linha: legível e serializado pelo codificador em C (indent=2 usa o codificador em Python)
+        cards = ",\n    ".join(json.dumps(c.__dict__, ensure_ascii=False) for c in deck.cards)
+        name = json.dumps(deck.name, ensure_ascii=False)
+        text = f'{{\n  "name": {name},\n  "cards": [\n    {cards}\n  ]\n}}' if cards else f'{{\n  "name": {name},\n  "cards": []\n}}'
+        atomic_write(path, text)
+
     def save_deck(self, deck: Deck):
-        """Salva um baralho no arquivo correspondente."""
+        """Salva o baralho inteiro (absorvendo o journal) e atualiza sua entrada no manifesto."""
         path = self._deck_path(deck.name)
-        payload = {"name": deck.name, "cards": [c.__dict__ for c in deck.cards]}
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
+        self._assign_ids(deck)
+        self._write_deck(path, deck)
+        j = self._journals.get(path)
+        if j is not None and j.size:
+            j.reset()  # Só depois que o snapshot foi gravado
+        elif j is None and os.path.exists(_journal_path(path)):
+            self._journal(path).reset()
+        self._live.pop(path, None)
+        fn, st = os.path.basename(path), os.stat(path)
+        self.cache.put(path, _sig(st), deck)  # O objeto salvo passa a ser a versão em cache
+        self._index[fn] = self._info_for(fn, deck, st)
+        self._save_index()
+        self._distractors.pop(deck.name, None)  # Reconstruído sob demanda
+        emit("decks", deck=deck.name, op="save")
+
+    # ---------------- patches por cartão ----------------
+    def _patch(self, deck: Deck, card: Card, op: Dict, old_due=(), new_due=()):
+        """
+        Registra a alteração de um cartão: uma linha no journal do baralho (O(1)) ou,
+        com o journal desativado, o baralho inteiro.
+        """
+        path = self._deck_path(deck.name)
+        if not self.use_journal or not os.path.exists(path):
+            self.save_deck(deck)  # Sem journal (ou baralho ainda sem arquivo): grava o snapshot
+        else:
+            j = self._journal(path)
+            j.append(op)
+            self._live[path] = deck
+            self.cache.put(path, _sig(os.stat(path)), deck)  # Fixa este objeto e atualiza sua contagem de cartões
+            self._touch_info(path, deck, old_due, new_due)
+            if j.needs_compaction():
+                self._schedule_compact(path)
+        emit("decks", deck=deck.name, op=op["op"], card=card)
+
+    def _schedule_compact(self, path: str):
+        """Agenda a reescrita do baralho (e o esvaziamento do journal) no motor de persistência."""
+        ENGINE.schedule(path, lambda: self._compact(path))
+
+    def _compact(self, path: str):
+        """Reescreve o snapshot do baralho com os patches aplicados e só então esvazia o journal."""
+        deck = self._live.pop(path, None)
+        if deck is None or not os.path.exists(path):
+            return  # Já salvo por save_deck ou baralho excluído
+        self._write_deck(path, deck)
+        self._journal(path).reset()
+        fn, st = os.path.basename(path), os.stat(path)
+        self.cache.put(path, _sig(st), deck)
+        self._index[fn] = self._info_for(fn, deck, st)
+        self._save_index()
 
     def create_deck(self, name: str) -> Deck:
         """Cria um novo baralho vazio."""
@@ -103,36 +396,74 @@ class DeckRepo:
         path = self._deck_path(name)
         if os.path.exists(path):
             os.remove(path)
+        j = self._journals.pop(path, None)
+        if j is not None: j.close()
+        if os.path.exists(_journal_path(path)):
+            os.remove(_journal_path(path))
+        self._live.pop(path, None)
+        self.cache.invalidate(path)
+        self._distractors.pop(name, None)
+        emit("decks", deck=name, op="delete")
+        if self._index.pop(os.path.basename(path), None) is not None:
+            self._save_index()
 
     # -------- cards --------
-    def add_card(self, deck: Deck, front: str, back: str):
+    # As alterações são gravadas como patches identificados pelo id do cartão (não pelo índice).
+    def add_card(self, deck: Deck, front: str, back: str) -> Card:
         """Adiciona um novo cartão ao baralho."""
-        deck.cards.append(Card(front=front, back=back, interval=1, ease=2.5, due=None))
-        self.save_deck(deck)
+        c = Card(front=front, back=back, interval=1, ease=2.5, due=None, id=_new_card_id())
+        deck.cards.append(c)
+        self._with_distractors(deck, add=c.back)
+        self._patch(deck, c, {"op": "add", "card": c.__dict__}, new_due=[c.due])
+        return c
 
     def update_card(self, deck: Deck, index: int, front: Optional[str]=None, back: Optional[str]=None):
         """Atualiza o conteúdo de um cartão existente."""
         c = deck.cards[index]
-        if front is not None: c.front = front
-        if back  is not None: c.back  = back
-        self.save_deck(deck)
+        f = {}
+        if front is not None: c.front = f["front"] = front
+        if back  is not None and back != c.back:
+            self._with_distractors(deck, add=back, remove=c.back)
+            c.back = f["back"] = back
+        if f:
+            self._patch(deck, c, {"op": "set", "id": c.id, "f": f})
 
     def delete_card(self, deck: Deck, index: int):
         """Remove um cartão do baralho pelo índice."""
-        deck.cards.pop(index)
-        self.save_deck(deck)
+        c = deck.cards.pop(index)
+        self._with_distractors(deck, remove=c.back)
+        self._patch(deck, c, {"op": "del", "id": c.id}, old_due=[c.due])
+
+    def review_card(self, deck: Deck, card: Card, interval: int, ease: float, due: Optional[str]):
+        """Aplica e persiste o resultado de uma revisão (intervalo, facilidade e próxima data)."""
+        old = card.due
+        card.interval, card.ease, card.due = interval, ease, due
+        self._patch(deck, card, {"op": "set", "id": card.id, "f": {"interval": interval, "ease": ease, "due": due}},
+                    old_due=[old], new_due=[due])
 
     # -------- MCQ --------
-    def mcq_options(self, deck: Deck, correct: str, k: int = 4) -> List[str]:
-        """Gera opções para múltipla escolha com base nos cartões do baralho."""
-        backs = list({c.back for c in deck.cards if c.back})  # Coleta todas as respostas únicas
-        if correct not in backs:
-            backs.append(correct)  # Garante que a resposta correta está incluída
-        random.shuffle(backs)  # Embaralha as opções
-        while len(backs) < k:
-            backs.append(f"Opção {len(backs)+1}")  # Adiciona opções fictícias se necessário
-        if correct not in backs[:k]:
-            backs[k-1] = correct  # Garante que a resposta correta está entre as primeiras k opções
-        sample = backs[:k]
-        random.shuffle(sample)  # Embaralha novamente as opções finais
-        return sample
+    def _distractor_index(self, deck: Deck) -> DistractorIndex:
+        """Índice de respostas do baralho (montado uma vez por objeto Deck)."""
+        item = self._distractors.get(deck.name)
+        if item is None or item[0] is not deck:
+            item = self._distractors[deck.name] = (deck, DistractorIndex(c.back for c in deck.cards))
+        return item[1]
+
+    def _with_distractors(self, deck: Deck, add: Optional[str] = None, remove: Optional[str] = None):
+        """Atualiza o índice de respostas, se já montado para este baralho."""
+        item = self._distractors.get(deck.name)
+        if item is None or item[0] is not deck:
+            return
+        if remove is not None: item[1].remove(remove)
+        if add is not None: item[1].add(add)
+
+    def mcq_options(self, deck: Deck, correct: str, k: int = 4, hard: bool = False) -> List[str]:
+        """
+        Gera `k` opções de múltipla escolha (a correta mais k-1 respostas de outros cartões), em O(k).
+        Com hard=True, prefere respostas parecidas com a correta (palavras ou tamanho em comum).
+        """
+        options = [correct] + self._distractor_index(deck).sample(correct, k - 1, hard=hard)
+        while len(options) < k:
+            options.append(f"Opção {len(options)+1}")  # Adiciona opções fictícias se necessário
+        random.shuffle(options)  # Embaralha só as k opções
+        return options
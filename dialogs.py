@@ -7,7 +7,7 @@ from tkinter import ttk, messagebox
 import datetime as dt
 import calendar
 from widgets import PlaceholderEntry, TagInput  # Widgets personalizados
-from tags_repo import TagsRepo  # Repositório para gerenciar tags
+from registry import tags_repo  # Instância compartilhada do repositório de tags
 
 # Classe base para modais com layout padronizado
 class Modal(ttk.Frame):
@@ -117,7 +117,6 @@ from tkinter import ttk, messagebox
 import datetime as dt
 import calendar
 from widgets import PlaceholderEntry, TagInput
-from tags_repo import TagsRepo
 
 
 # dialogs.py (SUBSTITUIR ESTA CLASSE)
@@ -126,7 +125,6 @@ from tkinter import ttk, messagebox
 import datetime as dt
 import calendar
 from widgets import PlaceholderEntry, TagInput
-from tags_repo import TagsRepo
 
 
 class Modal(ttk.Frame):
@@ -195,11 +193,9 @@ class Modal(ttk.Frame):
 
 # dialogs.py — SUBSTITUIR APENAS A CLASSE TaskDialog
 from widgets import PlaceholderEntry, TagInput
-from tags_repo import TagsRepo
 
 # dialogs.py — TaskDialog robusto (com fallback de tags)
 from widgets import PlaceholderEntry, TagInput  # garante estes imports
-from tags_repo import TagsRepo
 import tkinter as tk
 from tkinter import ttk, messagebox
 import datetime as dt
@@ -254,7 +250,7 @@ class TaskDialog(Modal):
         self.tags_widget = None
         self.tags_fallback = None
         try:
-            self.tags_widget = TagInput(form, initial=data.get("tags", []), repo=TagsRepo())
+            self.tags_widget = TagInput(form, initial=data.get("tags", []), repo=tags_repo())
             self.tags_widget.grid(row=2, column=1, columnspan=2, padx=PADX, pady=PADY, sticky="ew")
         except Exception as e:
             # fallback seguro
@@ -317,10 +313,6 @@ class TaskDialog(Modal):
             "tags": tags,
             "scheduled": date_txt or None
         }
-        try:
-            TagsRepo().add_many(tags)
-        except Exception:
-            pass
         self.win.destroy()
 
 
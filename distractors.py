@@ -0,0 +1,98 @@
+# distractors.py
+# Este arquivo implementa o índice de alternativas erradas (distratores) usado na múltipla escolha.
+# Cada baralho mantém a lista de respostas distintas e um índice invertido de palavras, atualizados
+# a cada cartão adicionado/editado/removido, para sortear k alternativas em O(k) em vez de
+# percorrer e embaralhar todas as respostas a cada pergunta.
+
+import random
+from typing import Dict, List, Optional, Set
+from utils import WORD_RE  # Mesma regra de palavras das buscas
+
+def _tokens(text: str) -> Set[str]:
+    """Palavras da resposta (minúsculas) mais uma classe de tamanho, para achar respostas "parecidas"."""
+    toks = {w for w in WORD_RE.findall(text.lower())}
+    toks.add(f"\0len{len(text).bit_length()}")  # Tamanhos na mesma potência de 2 contam como semelhantes
+    return toks
+
+class DistractorIndex:
+    """
+    Respostas distintas de um baralho.
+    - add(back) / remove(back): mantêm contagens, a lista de sorteio (remoção por troca com o último) e o índice de palavras.
+    - sample(correct, n, hard=False): n respostas distintas diferentes de `correct`.
+      Com hard=True, prefere respostas que compartilham palavras/tamanho com a correta.
+    """
+    def __init__(self, backs=()):
+        self._values: List[str] = []  # Respostas distintas (para sorteio por índice)
+        self._pos: Dict[str, int] = {}  # resposta -> posição em _values
+        self._count: Dict[str, int] = {}  # resposta -> nº de cartões com ela
+        self._by_token: Dict[str, Set[str]] = {}  # palavra -> respostas que a contêm
+        for b in backs:
+            self.add(b)
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, back: str):
+        if not back: return
+        n = self._count.get(back, 0)
+        self._count[back] = n + 1
+        if n:
+            return
+        self._pos[back] = len(self._values)
+        self._values.append(back)
+        for t in _tokens(back):
+            self._by_token.setdefault(t, set()).add(back)
+
+    def remove(self, back: str):
+        n = self._count.get(back, 0)
+        if n > 1:
+            self._count[back] = n - 1; return
+        if not n:
+            return
+        del self._count[back]
+        i = self._pos.pop(back)
+        last = self._values.pop()
+        if last != back:  # Move o último para o buraco (O(1))
+            self._values[i] = last
+            self._pos[last] = i
+        for t in _tokens(back):
+            s = self._by_token.get(t)
+            if s is not None:
+                s.discard(back)
+                if not s: del self._by_token[t]
+
+    def sample(self, correct: str, n: int, hard: bool = False, rng: Optional[random.Random] = None) -> List[str]:
+        """Sorteia até `n` respostas distintas diferentes de `correct`."""
+        rng = rng or random
+        avail = len(self._values) - (1 if correct in self._pos else 0)
+        n = min(n, avail)
+        if n <= 0:
+            return []
+        out: List[str] = self._hard(correct, n) if hard else []
+        chosen = set(out); chosen.add(correct)
+        if avail <= 2 * n:  # Poucas respostas: sorteio direto sobre a lista toda
+            rest = [v for v in self._values if v not in chosen]
+            out.extend(rng.sample(rest, n - len(out)))
+            return out
+        while len(out) < n:  # Rejeição: esperado O(n) tentativas quando há muito mais respostas que n
+            v = self._values[rng.randrange(len(self._values))]
+            if v not in chosen:
+                chosen.add(v); out.append(v)
+        return out
+
+    def _hard(self, correct: str, n: int, cap: int = 8) -> List[str]:
+        """Respostas com mais palavras em comum com `correct` (desempate: tamanho mais próximo)."""
+        toks = _tokens(correct)
+        postings = sorted((self._by_token.get(t, set()) for t in toks), key=len)  # Palavras raras primeiro
+        limit = cap * n  # Limita o trabalho em palavras muito comuns
+        cands: Dict[str, int] = {}
+        for p in postings:
+            for v in p:
+                if v != correct and v not in cands:
+                    cands[v] = 0
+                    if len(cands) >= limit: break
+            if len(cands) >= limit: break
+        for v in cands:
+            cands[v] = sum(1 for p in postings if v in p)
+        ranked = sorted(cands, key=lambda v: (-cands[v], abs(len(v) - len(correct))))
+        return ranked[:n]
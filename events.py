@@ -0,0 +1,32 @@
+# events.py
+# Este arquivo implementa um feed de mudanças simples (publish/subscribe) entre repositórios e abas.
+# Os repositórios publicam um tópico ("profile", "tasks", "stats", "tags", "decks") a cada mutação e
+# as abas se inscrevem para redesenhar apenas o que mudou, sem botões de "Atualizar" manuais.
+
+from typing import Callable, Dict, List
+
+_subscribers: Dict[str, List[Callable]] = {}  # tópico -> callbacks inscritos
+
+def on_change(topic: str, callback: Callable) -> Callable[[], None]:
+    """
+    Inscreve `callback(**payload)` no tópico. Retorna uma função que cancela a inscrição
+    (use-a ao destruir widgets de vida curta, como diálogos).
+    """
+    _subscribers.setdefault(topic, []).append(callback)
+    def unsubscribe():
+        subs = _subscribers.get(topic, [])
+        if callback in subs:
+            subs.remove(callback)
+    return unsubscribe
+
+def emit(topic: str, **payload):
+    """Notifica os inscritos do tópico. Erros de um callback não impedem os demais."""
+    for cb in list(_subscribers.get(topic, ())):
+        try:
+            cb(**payload)
+        except Exception as e:
+            print(f"[events] callback de '{topic}' falhou:", e)
+
+def clear():
+    """Remove todas as inscrições (útil ao recriar a janela principal)."""
+    _subscribers.clear()
@@ -2,12 +2,17 @@
 # Este arquivo implementa a aba "Flashcards" do aplicativo, onde os usuários podem gerenciar e estudar cartões de memória.
 # Ele utiliza o tkinter para criar a interface gráfica e interage com o repositório de baralhos para manipular os dados dos flashcards.
 
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from deck_repo import DeckRepo  # Repositório para gerenciar baralhos e cartões
 from dialogs import DeckDialog, CardDialog  # Diálogos para criar/editar baralhos e cartões
 from widgets import CoinFloat  # Animação de moedas para recompensas
-from utils import today_str  # Função utilitária para obter a data atual
+from importer import DeckImporter  # Importação em massa (CSV/TSV/.zip)
+from utils import DECKS_DIR, today_str  # Pasta dos baralhos e data atual
+from registry import deck_repo, scheduler, card_search  # Repositório de baralhos, fila de revisão e busca compartilhados
+
+SESSION_SIZE = 20  # Cartões devidos buscados por vez na fila de revisão
 
 # Classe para selecionar um baralho
 class DeckSelector(tk.Toplevel):
@@ -24,21 +29,24 @@ class DeckSelector(tk.Toplevel):
         ttk.Label(frame, text="Escolha um baralho:", style="Header.TLabel").pack(anchor="w", pady=4)
         self.listbox = tk.Listbox(frame, height=10)  # Lista de baralhos
         self.listbox.pack(fill=tk.BOTH, expand=True)
-        decks = self.repo.list_decks()  # Obtém a lista de baralhos
-        for d in decks:
-            self.listbox.insert(tk.END, d.name)  # Adiciona os nomes dos baralhos à lista
+        self._names = []  # Nomes dos baralhos, na mesma ordem da lista
+        self.refresh()  # Preenche a lista a partir do manifesto (sem carregar os cartões)
 
         # Barra de botões
         bar = ttk.Frame(frame); bar.pack(fill=tk.X, pady=6)
         ttk.Button(bar, text="Novo", command=self.new_deck).pack(side=tk.LEFT)
         ttk.Button(bar, text="Excluir", command=self.delete_deck).pack(side=tk.LEFT, padx=4)
+        self.btn_import = ttk.Button(bar, text="Importar…", command=self.import_file)
+        self.btn_import.pack(side=tk.LEFT, padx=4)
         ttk.Button(bar, text="Selecionar", style="Accent.TButton", command=self.pick).pack(side=tk.RIGHT)
+        self.lbl_status = ttk.Label(frame, text="")  # Progresso da importação
+        self.lbl_status.pack(anchor="w")
 
     def current_name(self):
         """Obtém o nome do baralho atualmente selecionado na lista."""
         sel = self.listbox.curselection()
         if not sel: return None
-        return self.listbox.get(sel[0])
+        return self._names[sel[0]]
 
     def new_deck(self):
         """Cria um novo baralho."""
@@ -56,11 +64,34 @@ class DeckSelector(tk.Toplevel):
             self.repo.delete_deck(name)
             self.refresh()
 
+    def import_file(self):
+        """Importa cartões de um CSV/TSV ou .zip de baralhos, em fatias para não travar a janela."""
+        path = filedialog.askopenfilename(parent=self, title="Importar cartões",
+                                          filetypes=[("Cartões", "*.csv *.tsv *.zip"), ("Todos", "*.*")])
+        if not path: return
+        self.btn_import.configure(state="disabled")
+        def progress(frac, added):
+            if self.winfo_exists():
+                self.lbl_status.configure(text=f"Importando… {frac:.0%} ({added} cartões)")
+        def done(res):
+            if not self.winfo_exists(): return
+            self.btn_import.configure(state="normal")
+            self.lbl_status.configure(text=f"{res.added} novos, {res.duplicates} repetidos, {res.invalid} inválidos")
+            self.refresh()
+        def error(e):
+            if not self.winfo_exists(): return
+            self.btn_import.configure(state="normal"); self.lbl_status.configure(text="")
+            messagebox.showerror("Importar", f"Não foi possível ler o arquivo:\n{e}", parent=self)
+        DeckImporter(self.repo, path).run_async(self, on_progress=progress, on_done=done, on_error=error)
+
     def refresh(self):
         """Atualiza a lista de baralhos exibida na janela."""
         self.listbox.delete(0, tk.END)
-        for d in self.repo.list_decks():
-            self.listbox.insert(tk.END, d.name)
+        today = today_str()
+        infos = self.repo.list_deck_infos()
+        self._names = [i.name for i in infos]
+        for i in infos:
+            self.listbox.insert(tk.END, f"{i.name}  ({i.cards} cartões, {i.due_count(today)} p/ hoje)")
 
     def pick(self):
         """Seleciona o baralho atual e chama a função de callback."""
@@ -129,16 +160,55 @@ class CardManager(tk.Toplevel):
         self.repo.delete_card(self.deck, i)
         self.refresh()
 
+# Classe para buscar cartões em todos os baralhos
+class CardSearchWindow(tk.Toplevel):
+    """Janela de busca de texto nos cartões; duplo clique abre o baralho do resultado."""
+    def __init__(self, parent, on_pick):
+        super().__init__(parent)
+        self.title("Buscar Cartões")
+        self.index = card_search()  # Índice de busca compartilhado
+        self.on_pick = on_pick  # Callback com o nome do baralho escolhido
+        self.hits = []  # Resultados exibidos
+        self._after = None  # Busca agendada (debounce da digitação)
+
+        frame = ttk.Frame(self, style="Card.TFrame"); frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+        self.var = tk.StringVar()
+        entry = ttk.Entry(frame, textvariable=self.var, width=60); entry.pack(fill=tk.X)
+        entry.focus_set()
+        self.var.trace_add("write", lambda *_: self._schedule())
+        self.listbox = tk.Listbox(frame, width=80, height=14); self.listbox.pack(fill=tk.BOTH, expand=True, pady=6)
+        self.listbox.bind("<Double-Button-1>", lambda e: self.pick())
+        self.lbl = ttk.Label(frame, text=""); self.lbl.pack(anchor="w")
+
+    def _schedule(self):
+        if self._after is not None: self.after_cancel(self._after)
+        self._after = self.after(150, self.run)
+
+    def run(self):
+        """Executa a busca e preenche a lista."""
+        self._after = None
+        self.hits = self.index.search(self.var.get(), limit=100)
+        self.listbox.delete(0, tk.END)
+        for h in self.hits:
+            self.listbox.insert(tk.END, f"[{h.deck}]  {h.front}  →  {h.back}")
+        self.lbl.configure(text=f"{len(self.hits)} resultado(s)" if self.var.get().strip() else "")
+
+    def pick(self):
+        sel = self.listbox.curselection()
+        if not sel: return
+        self.on_pick(self.hits[sel[0]].deck)
+        self.destroy()
+
 # Classe principal que representa a aba "Flashcards"
 class FlashcardsTab(ttk.Frame):
     def __init__(self, parent, profile):
         super().__init__(parent)
         self.profile = profile  # Perfil do usuário
-        self.repo = DeckRepo()  # Repositório de baralhos
-        self.decks = self.repo.list_decks()  # Lista de baralhos disponíveis
-        self.deck_i = 0  # Índice do baralho atual
-        self.deck = self.decks[self.deck_i]  # Baralho atual
-        self.idx = 0  # Índice do cartão atual
+        self.repo = deck_repo()  # Repositório de baralhos (instância compartilhada)
+        self.deck = self._first_deck()  # Baralho atual (só ele é carregado)
+        self.sched = scheduler()  # Fila de revisão (SM-2)
+        self.queue = []  # Cartões devidos da sessão atual
+        self.card = None  # Cartão exibido (None = nada para revisar)
         self.front = True  # Indica se o lado frontal do cartão está sendo exibido
         self.streak = 0  # Contador de streaks (acertos consecutivos)
         self.session_hits = 0; self.session_total = 0  # Estatísticas da sessão
@@ -149,6 +219,7 @@ class FlashcardsTab(ttk.Frame):
         ttk.Label(header, text="Flashcards", style="Header.TLabel").pack(side=tk.LEFT, padx=8)
         ttk.Button(header, text="Selecionar Baralho", command=self.open_selector).pack(side=tk.LEFT, padx=4)
         ttk.Button(header, text="Gerenciar Cartões", command=self.open_manager).pack(side=tk.LEFT, padx=4)
+        ttk.Button(header, text="🔎 Buscar", command=lambda: CardSearchWindow(self, on_pick=self._select_deck)).pack(side=tk.LEFT, padx=4)
         ttk.Button(header, text="Trocar para Texto" , command=self.toggle_mode).pack(side=tk.RIGHT, padx=4)
 
         # Informações do baralho
@@ -162,13 +233,24 @@ class FlashcardsTab(ttk.Frame):
         self.canvas = tk.Canvas(self, width=640, height=320, bg="#FFFFFF", highlightthickness=0)
         self.canvas.pack(pady=10)
         self.card_bg = self.canvas.create_rectangle(20,20,620,300, fill="#FFFBFF", outline="#E9E1FF", width=2)
-        txt = self.deck.cards[self.idx].front if self.deck.cards else "(vazio)"
-        self.text = self.canvas.create_text(320,140, text=txt, font=("TkDefaultFont", 18, "bold"))
+        self.text = self.canvas.create_text(320,140, text="", font=("TkDefaultFont", 18, "bold"))
+        self._refill()
 
         # Barra de ações
         self.bar = ttk.Frame(self); self.bar.pack(pady=6)
         self._build_controls()
 
+    def _first_deck(self):
+        """Primeiro baralho legível do manifesto; sem nenhum, cria um "Exemplo" vazio (sem sobrescrever arquivos ilegíveis)."""
+        for info in self.repo.list_deck_infos():
+            deck = self.repo.get_deck(info.name)
+            if deck is not None:
+                return deck
+        name, n = "Exemplo", 1
+        while os.path.exists(os.path.join(DECKS_DIR, self.repo.file_for(name))):
+            n += 1; name = f"Exemplo {n}"
+        return self.repo.create_deck(name)
+
     # ----------- controles dinâmicos -----------
     def _build_controls(self):
         """Constrói os controles dinâmicos com base no modo atual (múltipla escolha ou texto)."""
@@ -200,17 +282,13 @@ class FlashcardsTab(ttk.Frame):
 
     def _select_deck(self, name: str):
         """Seleciona um novo baralho e atualiza a interface."""
-        decks = self.repo.list_decks()
-        for i, d in enumerate(decks):
-            if d.name == name:
-                self.decks = decks
-                self.deck_i = i
-                self.deck = d
-                break
-        self.idx = 0; self.front = True; self.streak = 0
+        deck = self.repo.get_deck(name)
+        if deck is None: return
+        self.deck = deck
+        self.front = True; self.streak = 0
+        self._refill()
         self.lbl_deck.configure(text=f"Deck: {self.deck.name}")
         self.lbl_streak.configure(text="Streak: 0")
-        self._update_text()
 
         # Se estiver em MCQ, preparar alternativas do novo deck
         if self.mode_mcq: self._prepare_mcq()
@@ -222,11 +300,11 @@ class FlashcardsTab(ttk.Frame):
     # ----------- estudo: modo MCQ -----------
     def _prepare_mcq(self):
         """Prepara as alternativas para o modo de múltipla escolha."""
-        if not self.deck.cards:
+        if self.card is None:
             for b in self.btns: b.configure(text="—", state="disabled")
             return
-        c = self.deck.cards[self.idx]
-        options = self.repo.mcq_options(self.deck, c.back, k=4)
+        c = self.card
+        options = self.repo.mcq_options(self.deck, c.back, k=4, hard=self.streak >= 3)  # Em sequência, alternativas mais parecidas
         self._correct_text = c.back
         for i, b in enumerate(self.btns):
             b.configure(text=options[i], state="normal")
@@ -236,7 +314,7 @@ class FlashcardsTab(ttk.Frame):
 
     def answer(self, btn_index: int):
         """Processa a resposta do usuário no modo de múltipla escolha."""
-        if not self.deck.cards: return
+        if self.card is None: return
         chosen = self.btns[btn_index].cget("text")
         correct = (chosen == self._correct_text)
         self._grade_internal(correct)
@@ -244,20 +322,20 @@ class FlashcardsTab(ttk.Frame):
     # ----------- estudo: modo texto (acertou/errou) -----------
     def flip(self):
         """Vira o cartão para mostrar o outro lado."""
-        if not self.deck.cards: return
+        if self.card is None: return
         self.front = not self.front
-        c = self.deck.cards[self.idx]
+        c = self.card
         self.canvas.itemconfig(self.text, text=c.front if self.front else c.back)
 
     def grade(self, correct: bool):
         """Processa a resposta do usuário no modo texto."""
-        if not self.deck.cards: return
+        if self.card is None: return
         self._grade_internal(correct)
 
     # ----------- núcleo de pontuação -----------
     def _grade_internal(self, correct: bool):
         """Processa a pontuação e atualiza o estado do cartão."""
-        c = self.deck.cards[self.idx]
+        c = self.card
         self.session_total += 1
         if correct:
             self.session_hits += 1
@@ -265,29 +343,43 @@ class FlashcardsTab(ttk.Frame):
             base = 2 + min(self.streak, 5)  # Combo até 5
             self.profile.add_rewards(coins=base, xp=2)  # +XP por acerto
             CoinFloat.show(self.winfo_toplevel(), f"+{base} 🪙", near_widget=self.canvas, offset=(0, -10))
-            # SM-2 simplificado
-            c.interval = max(1, int(round(c.interval * c.ease)))
-            c.ease = max(1.3, c.ease + 0.1)
         else:
             self.streak = 0
-            c.interval = 1
-            c.ease = max(1.3, c.ease - 0.1)
-        c.due = today_str()
+        self.sched.grade(self.deck, c, correct, today=today_str())  # SM-2: nova data, persiste e recoloca na fila
+        if self.queue and self.queue[0] is c:
+            self.queue.pop(0)
         self.lbl_streak.configure(text=f"Streak: {self.streak}")
-        self.next_card()
+        self._show_next()
+
+    # ----------- fila de revisão -----------
+    def _refill(self):
+        """Busca os próximos cartões devidos do baralho atual e exibe o primeiro."""
+        due = self.sched.next_due(SESSION_SIZE, deck=self.deck.name, today=today_str())
+        if due: self.deck = due[0][0]  # Mesmo objeto que o DeckRepo e a fila usam
+        self.queue = [c for _, c in due]
+        self.card = self.queue[0] if self.queue else None
+        self._update_text()
 
-    def next_card(self):
-        """Avança para o próximo cartão no baralho."""
-        if not self.deck.cards:
-            self.canvas.itemconfig(self.text, text="(vazio)"); return
-        self.idx = (self.idx + 1) % len(self.deck.cards)
+    def _show_next(self):
+        """Exibe o cartão seguinte da fila (busca mais quando ela acaba)."""
+        if not self.queue:
+            self._refill()
+        else:
+            self.card = self.queue[0]
+            self._update_text()
         self.front = True
-        self._update_text()
         if self.mode_mcq: self._prepare_mcq()
 
+    def next_card(self):
+        """Pula o cartão atual (ele continua devido e volta ao fim da fila)."""
+        if self.queue:
+            self.queue.append(self.queue.pop(0))
+        self._show_next()
+
     def _update_text(self):
         """Atualiza o texto exibido no cartão."""
-        if not self.deck.cards:
-            self.canvas.itemconfig(self.text, text="(vazio)")
+        if self.card is None:
+            msg = "(vazio)" if not self.deck.cards else "Nada para revisar hoje 🎉"
+            self.canvas.itemconfig(self.text, text=msg)
         else:
-            self.canvas.itemconfig(self.text, text=self.deck.cards[self.idx].front)
+            self.canvas.itemconfig(self.text, text=self.card.front)
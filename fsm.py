@@ -1,52 +1,211 @@
 # fsm.py
 # Este arquivo implementa a máquina de estados finitos (FSM) para gerenciar o ciclo Pomodoro.
 # A classe `PomodoroFSM` controla os estados de foco, pausas curtas e pausas longas, além de rastrear ciclos concluídos.
+# O tempo é medido por prazos absolutos em um relógio monotônico: atrasos do loop de eventos (diálogos,
+# gravações, suspensão) não atrasam o cronômetro, e advance(now) recupera qualquer intervalo em O(1).
+# simulate(schedule, duration) usa a mesma máquina sem Tk e sem relógio, saltando de fase em fase,
+# para testes e projeções ("e se eu mudar para 50/10?").
+
+import math, time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+PHASES = ("FOCUS", "BREAK", "LONG_BREAK")  # Estados em que o tempo corre
+REWARD_COINS = 10  # Moedas por foco concluído
+REWARD_XP = 10  # XP por foco concluído
 
 class PomodoroFSM:
-    def __init__(self, focus=25*60, short=5*60, long=15*60):
+    def __init__(self, focus=25*60, short=5*60, long=15*60, every=4, clock: Callable[[], float] = time.monotonic):
         """
         Inicializa a máquina de estados com os tempos padrão para foco, pausa curta e pausa longa.
-        
+
         Parâmetros:
         - focus: Duração da sessão de foco em segundos (padrão: 25 minutos).
         - short: Duração da pausa curta em segundos (padrão: 5 minutos).
         - long: Duração da pausa longa em segundos (padrão: 15 minutos).
+        - every: A cada quantos focos vem a pausa longa (padrão: 4).
+        - clock: Relógio monotônico em segundos (substituível em testes).
         """
-        self.focus, self.short, self.long = focus, short, long  # Define as durações dos estados
-        self.state, self.remaining, self.cycles = "IDLE", focus, 0  # Estado inicial, tempo restante e ciclos concluídos
+        self.focus, self.short, self.long, self.every = focus, short, long, every  # Define as durações dos estados
+        self.clock = clock
+        self.state, self.cycles = "IDLE", 0  # Estado inicial e ciclos concluídos
+        self.paused = False  # Fase atual congelada (pause)
+        self.deadline: Optional[float] = None  # Fim da fase atual no relógio (quando rodando)
+        self._left = float(focus)  # Tempo restante quando parado/pausado
+
+    # ---------- consultas ----------
+    def duration(self, state: Optional[str] = None) -> int:
+        """Duração total da fase (a atual, se `state` não for dado)."""
+        state = state or self.state
+        return self.long if state == "LONG_BREAK" else self.short if state == "BREAK" else self.focus
+
+    @property
+    def running(self) -> bool:
+        return self.state in PHASES and not self.paused
+
+    def remaining_at(self, now: Optional[float] = None) -> float:
+        """Segundos restantes na fase atual (fracionários)."""
+        if not self.running:
+            return self._left
+        now = self.clock() if now is None else now
+        return max(0.0, self.deadline - now)
+
+    @property
+    def remaining(self) -> int:
+        """Segundos inteiros exibidos (arredondados para cima: 25:00 no início, 00:01 no último segundo)."""
+        return math.ceil(self.remaining_at())
+
+    # ---------- controles ----------
+    def start(self, now: Optional[float] = None):
+        """
+        Inicia o ciclo Pomodoro no estado "FOCUS". Se estiver pausado, retoma de onde parou;
+        se já estiver rodando, não faz nada.
+        """
+        now = self.clock() if now is None else now
+        if self.paused:
+            self.resume(now); return
+        if self.running:
+            return
+        self.state = "FOCUS"
+        self.deadline = now + self.focus
+
+    def pause(self, now: Optional[float] = None):
+        """Congela a fase atual guardando o tempo restante."""
+        if not self.running: return
+        now = self.clock() if now is None else now
+        self.advance(now)
+        self._left = self.remaining_at(now)
+        self.paused, self.deadline = True, None
+
+    def resume(self, now: Optional[float] = None):
+        """Retoma a fase pausada com um novo prazo."""
+        if not self.paused: return
+        now = self.clock() if now is None else now
+        self.paused = False
+        self.deadline = now + self._left
+
+    def reset(self):
+        """Volta ao estado inicial (parado, foco completo, sem ciclos)."""
+        self.state, self.cycles, self.paused = "IDLE", 0, False
+        self.deadline, self._left = None, float(self.focus)
 
-    def start(self):
+    # ---------- tempo ----------
+    def _next(self) -> int:
+        """Passa para a fase seguinte (o novo prazo conta a partir do prazo anterior). Retorna focos concluídos."""
+        if self.state == "FOCUS":
+            self.cycles += 1  # Incrementa o número de ciclos concluídos
+            self.state = "LONG_BREAK" if self.cycles % self.every == 0 else "BREAK"
+            done = 1
+        else:
+            self.state, done = "FOCUS", 0
+        self.deadline += self.duration()
+        return done
+
+    def advance(self, now: Optional[float] = None) -> int:
         """
-        Inicia o ciclo Pomodoro, alterando o estado para "FOCUS" e definindo o tempo restante para a duração do foco.
+        Leva a máquina até o instante `now`, atravessando quantas fases tiverem terminado.
+
+        Retorna:
+        - O número de sessões de foco concluídas nesse intervalo (0 se nenhuma).
         """
-        self.state, self.remaining = "FOCUS", self.focus
+        if not self.running: return 0
+        now = self.clock() if now is None else now
+        if now < self.deadline: return 0
+        done = self._next()
+        # Ciclos inteiros (every focos + pausas) de uma vez; o resto é no máximo um ciclo de fases
+        period = self.every * self.focus + (self.every - 1) * self.short + self.long
+        k = int((now - self.deadline) // period) if now >= self.deadline else 0
+        if k:
+            self.deadline += k * period
+            self.cycles += k * self.every
+            done += k * self.every
+        while now >= self.deadline:
+            done += self._next()
+        return done
 
     def tick(self):
         """
-        Avança a máquina de estados em 1 segundo. Gerencia as transições entre os estados.
-        
+        Avança a máquina até o instante atual.
+
         Retorna:
-        - True: Se o estado atual foi concluído e houve uma transição (ex.: de "FOCUS" para "BREAK").
-        - False: Se o estado atual ainda não foi concluído.
+        - True: Se alguma sessão de foco foi concluída desde a última chamada.
+        - False: Caso contrário.
         """
-        if self.state not in ("FOCUS", "BREAK", "LONG_BREAK"):  # Verifica se o estado é válido para contagem
-            return False
+        return self.advance() > 0
 
-        self.remaining -= 1  # Reduz o tempo restante em 1 segundo
+    # ---------- persistência ----------
+    def to_dict(self, now: Optional[float] = None) -> Dict:
+        """Estado serializável, com o tempo restante da fase no instante `now`."""
+        return {"focus": self.focus, "short": self.short, "long": self.long, "every": self.every,
+                "state": self.state, "cycles": self.cycles, "left": self.remaining_at(now)}
 
-        if self.remaining > 0:
-            return False  # O estado atual ainda não foi concluído
+    @staticmethod
+    def from_dict(d: Dict, clock: Callable[[], float] = time.monotonic) -> "PomodoroFSM":
+        """
+        Recria a máquina salva, sempre pausada na fase e no tempo restante em que estava:
+        o tempo com o app fechado não conta nem conclui fases (Iniciar retoma).
+        """
+        fsm = PomodoroFSM(d.get("focus", 25*60), d.get("short", 5*60), d.get("long", 15*60), d.get("every", 4), clock)
+        state = d.get("state", "IDLE")
+        if state not in PHASES:
+            return fsm
+        fsm.state, fsm.cycles, fsm.paused = state, int(d.get("cycles", 0)), True
+        fsm._left = max(1.0, min(float(d.get("left", fsm.duration())), float(fsm.duration())))
+        return fsm
 
-        if self.state == "FOCUS":
-            # Transição do estado "FOCUS" para "BREAK" ou "LONG_BREAK"
-            self.cycles += 1  # Incrementa o número de ciclos concluídos
-            if self.cycles % 4 == 0:
-                self.state, self.remaining = "LONG_BREAK", self.long  # Após 4 ciclos, inicia uma pausa longa
-            else:
-                self.state, self.remaining = "BREAK", self.short  # Caso contrário, inicia uma pausa curta
-            return True
-
-        elif self.state in ("BREAK", "LONG_BREAK"):
-            # Transição de "BREAK" ou "LONG_BREAK" de volta para "FOCUS"
-            self.state, self.remaining = "FOCUS", self.focus
-            return False
\ No newline at end of file
+# ---------- simulação ----------
+# Configuração de um ciclo Pomodoro (em segundos)
+@dataclass
+class Schedule:
+    focus: int = 25*60
+    short: int = 5*60
+    long: int = 15*60
+    every: int = 4  # Focos até a pausa longa
+
+    @staticmethod
+    def parse(text: str) -> "Schedule":
+        """Lê "foco/pausa[/longa[/a cada]]" em minutos (ex.: "50/10", "25/5/15/4"); o que faltar fica no padrão."""
+        parts = [p.strip() for p in text.replace(",", "/").split("/") if p.strip()]
+        vals = [int(p) for p in parts[:4]]
+        if any(v <= 0 for v in vals): raise ValueError("durações devem ser positivas")
+        sch = Schedule()
+        for name, v in zip(("focus", "short", "long"), vals): setattr(sch, name, v * 60)
+        if len(vals) > 3: sch.every = vals[3]
+        return sch
+
+# Resultado de uma simulação
+@dataclass
+class Simulation:
+    sessions: int = 0  # Focos concluídos (= ciclos)
+    long_breaks: int = 0  # Pausas longas iniciadas
+    focus_minutes: int = 0  # Minutos creditados nas estatísticas
+    coins: int = 0
+    xp: int = 0
+    end_state: str = "FOCUS"  # Fase em andamento no fim
+    end_remaining: float = 0.0  # Segundos que faltavam nessa fase
+    timeline: List[Tuple[float, str, float]] = field(default_factory=list)  # (início, fase, duração até o fim ou o corte)
+
+def simulate(schedule: Schedule, duration: float, timeline: bool = True) -> Simulation:
+    """
+    Simula `duration` segundos de Pomodoro a partir do início de um foco, sem Tk e sem esperar.
+    Com `timeline`, registra cada fase (um passo por fase); sem, só os totais (O(1) via advance()).
+    Créditos iguais aos da aba: REWARD_COINS/REWARD_XP e os minutos de foco por sessão concluída.
+    """
+    fsm = PomodoroFSM(schedule.focus, schedule.short, schedule.long, schedule.every, clock=lambda: 0.0)
+    fsm.start(0.0)
+    out = Simulation()
+    if timeline:
+        start = 0.0
+        while True:
+            out.timeline.append((start, fsm.state, min(fsm.deadline, duration) - start))
+            if fsm.deadline > duration: break
+            start = fsm.deadline
+            fsm._next()
+    else:
+        fsm.advance(duration)
+    out.sessions = fsm.cycles
+    out.long_breaks = fsm.cycles // schedule.every
+    out.focus_minutes = int(schedule.focus / 60) * fsm.cycles
+    out.coins, out.xp = REWARD_COINS * fsm.cycles, REWARD_XP * fsm.cycles
+    out.end_state, out.end_remaining = fsm.state, fsm.remaining_at(duration)
+    return out
@@ -4,6 +4,7 @@
 
 import tkinter as tk
 from tkinter import ttk
+from registry import on_change  # Feed de mudanças dos repositórios
 
 # Classe principal que representa a aba "Games"
 class GamesTab(ttk.Frame):
@@ -25,6 +26,8 @@ class GamesTab(ttk.Frame):
         # Contém os cartões dos jogos desbloqueados
         self.grid = ttk.Frame(self); self.grid.pack(fill=tk.BOTH, expand=True)
         self.refresh()  # Atualiza a lista de jogos ao inicializar a aba
+        # Recria os cartões apenas quando a lista de jogos desbloqueados muda
+        on_change("profile", lambda keys=(): self.refresh() if not keys or "unlocked_games" in keys else None)
 
     # Atualiza a lista de jogos exibidos na aba
     def refresh(self):
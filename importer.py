@@ -0,0 +1,186 @@
+# importer.py
+# Este arquivo implementa a importação em massa de cartões para o DeckRepo.
+# Aceita CSV/TSV (frente, verso[, baralho]) e pacotes .zip com baralhos em JSON (mesmo formato de decks/).
+# As linhas são lidas sob demanda (sem carregar o arquivo inteiro), validadas e deduplicadas; os cartões
+# novos ficam separados até finish(), que os junta aos baralhos e grava cada um uma única vez (um erro no
+# meio não deixa cartões pela metade nos baralhos em cache). Em Tk, o trabalho é fatiado com after().
+
+import os, csv, json, zipfile, hashlib
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from models import Deck, Card
+from persistence import ENGINE
+
+MAX_FIELD = 2000  # Tamanho máximo de frente/verso (caracteres)
+CHUNK_ROWS = 2000  # Linhas processadas por fatia no modo assíncrono
+
+Row = Tuple[str, str, str, Dict]  # (baralho, frente, verso, campos extras de revisão)
+
+# Resultado de uma importação
+@dataclass
+class ImportResult:
+    added: int = 0  # Cartões novos
+    duplicates: int = 0  # Linhas ignoradas por já existirem (no arquivo ou no baralho)
+    invalid: int = 0  # Linhas sem frente/verso ou grandes demais
+    decks: List[str] = field(default_factory=list)  # Baralhos gravados
+
+# ---------- leitura sob demanda ----------
+class _CountingLines:
+    """Itera as linhas de um arquivo binário como texto, contando os bytes lidos (para o progresso)."""
+    def __init__(self, f):
+        self.f = f
+        self.read = 0
+        self._first = True
+
+    def __iter__(self):
+        for raw in self.f:
+            self.read += len(raw)
+            line = raw.decode("utf-8", errors="replace")
+            if self._first:
+                line = line.lstrip("\ufeff"); self._first = False  # BOM do Excel
+            yield line
+
+def _is_header(row: List[str]) -> bool:
+    return len(row) >= 2 and row[0].strip().lower() in ("front", "frente") and row[1].strip().lower() in ("back", "verso")
+
+def iter_table(path: str, default_deck: str, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Row]:
+    """Linhas de um CSV/TSV: frente, verso e, opcionalmente, o nome do baralho na 3ª coluna."""
+    total = os.path.getsize(path)
+    delim = "\t" if path.lower().endswith((".tsv", ".tab")) else None
+    with open(path, "rb") as f:
+        lines = _CountingLines(f)
+        if delim is None:  # Detecta ',' ou ';' pela primeira linha
+            head = f.readline(); f.seek(0)
+            text = head.decode("utf-8", errors="replace")
+            delim = ";" if text.count(";") > text.count(",") else ","
+        for i, row in enumerate(csv.reader(lines, delimiter=delim)):
+            if i == 0 and _is_header(row):
+                continue
+            if progress is not None and i % 1000 == 0:
+                progress(lines.read, total)
+            front = row[0] if len(row) > 0 else ""
+            back = row[1] if len(row) > 1 else ""
+            deck = (row[2].strip() if len(row) > 2 else "") or default_deck
+            yield deck, front, back, {}
+
+def iter_bundle(path: str, progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Row]:
+    """Cartões de um .zip com arquivos JSON de baralho ({"name": ..., "cards": [...]})."""
+    with zipfile.ZipFile(path) as zf:
+        members = [m for m in zf.infolist() if m.filename.lower().endswith(".json") and not m.is_dir()]
+        total = sum(m.file_size for m in members) or 1
+        done = 0
+        for m in members:
+            with zf.open(m) as f:
+                try:
+                    raw = json.load(f)  # Um baralho por vez em memória
+                except ValueError:
+                    continue
+            name = raw.get("name") or os.path.splitext(os.path.basename(m.filename))[0]
+            for c in raw.get("cards", []):
+                if not isinstance(c, dict): continue
+                extra = {k: c[k] for k in ("interval", "ease", "due") if k in c}
+                yield name, str(c.get("front", "")), str(c.get("back", "")), extra
+            done += m.file_size
+            if progress is not None:
+                progress(done, total)
+
+def iter_rows(path: str, default_deck: Optional[str] = None, progress=None) -> Iterator[Row]:
+    """Escolhe o leitor pela extensão do arquivo."""
+    if path.lower().endswith(".zip"):
+        return iter_bundle(path, progress)
+    deck = default_deck or os.path.splitext(os.path.basename(path))[0]
+    return iter_table(path, deck, progress)
+
+def _key(front: str, back: str) -> bytes:
+    """Chave compacta de deduplicação (16 bytes) em vez de guardar os textos."""
+    return hashlib.blake2b(f"{front.casefold()}\0{back.casefold()}".encode("utf-8"), digest_size=16).digest()
+
+# ---------- importação ----------
+class DeckImporter:
+    """
+    Importa um arquivo para o DeckRepo.
+    - run(): importa tudo de uma vez (scripts).
+    - run_async(widget, on_progress, on_done): processa CHUNK_ROWS linhas por fatia via widget.after().
+    on_progress(fração 0..1, cartões novos) e on_done(ImportResult) são chamados na thread do Tk.
+    """
+    def __init__(self, repo, path: str, default_deck: Optional[str] = None):
+        self.repo = repo  # DeckRepo
+        self.path = path
+        self.result = ImportResult()
+        self._frac = 0.0  # Progresso de leitura
+        self._rows = iter_rows(path, default_deck, self._on_read)
+        self._new: Dict[str, List[Card]] = {}  # baralho -> cartões novos (ainda fora do baralho)
+        self._seen: Dict[str, Set[bytes]] = {}  # baralho -> chaves já presentes
+        self._dirty: Set[str] = set()  # Baralhos que receberam cartões
+
+    def _on_read(self, done: int, total: int):
+        self._frac = done / max(1, total)
+
+    def _deck(self, name: str) -> Tuple[List[Card], Set[bytes]]:
+        """Cartões novos e chaves já vistas do baralho (o baralho existente só é lido, não alterado)."""
+        new = self._new.get(name)
+        if new is None:
+            deck = self.repo.get_deck(name)
+            new = self._new[name] = []
+            self._seen[name] = {_key(c.front, c.back) for c in deck.cards} if deck else set()
+        return new, self._seen[name]
+
+    def step(self, limit: int = CHUNK_ROWS) -> bool:
+        """Processa até `limit` linhas. Retorna False quando o arquivo acabou."""
+        res = self.result
+        for _ in range(limit):
+            try:
+                name, front, back, extra = next(self._rows)
+            except StopIteration:
+                return False
+            front, back = front.strip(), back.strip()
+            if not front or not back or len(front) > MAX_FIELD or len(back) > MAX_FIELD or not name:
+                res.invalid += 1; continue
+            new, seen = self._deck(name)
+            k = _key(front, back)
+            if k in seen:
+                res.duplicates += 1; continue
+            seen.add(k)
+            card = Card(front=front, back=back)
+            try:
+                if "interval" in extra: card.interval = max(1, int(extra["interval"]))
+                if "ease" in extra: card.ease = max(1.3, float(extra["ease"]))
+                if extra.get("due"): card.due = str(extra["due"])[:10]
+            except (TypeError, ValueError):
+                pass  # Campos de revisão inválidos: mantém os padrões
+            new.append(card)
+            self._dirty.add(name)
+            res.added += 1
+        return True
+
+    def finish(self) -> ImportResult:
+        """Junta os cartões novos aos baralhos e grava cada um uma única vez (em uma única descarga do motor)."""
+        with ENGINE.batch():
+            for name in sorted(self._dirty):
+                deck = self.repo.get_deck(name) or Deck(name=name, cards=[])
+                deck.cards.extend(self._new[name])
+                self.repo.save_deck(deck)
+                self.result.decks.append(name)
+        return self.result
+
+    def run(self) -> ImportResult:
+        while self.step():
+            pass
+        return self.finish()
+
+    def run_async(self, widget, on_progress: Optional[Callable[[float, int], None]] = None,
+                  on_done: Optional[Callable[[ImportResult], None]] = None,
+                  on_error: Optional[Callable[[Exception], None]] = None):
+        def tick():
+            try:
+                more = self.step()
+                if on_progress is not None:
+                    on_progress(1.0 if not more else self._frac, self.result.added)
+                if more:
+                    widget.after(1, tick); return
+                res = self.finish()
+            except Exception as e:  # Arquivo ilegível: nada é gravado
+                if on_error is None: raise
+                on_error(e); return
+            if on_done is not None: on_done(res)
+        widget.after(1, tick)
@@ -0,0 +1,110 @@
+# journal.py
+# Este arquivo implementa um journal de operações "append-only" (uma linha JSON compacta por operação).
+# Os repositórios gravam cada mutação como uma linha no final do arquivo (custo O(1)) e, periodicamente,
+# compactam o journal reescrevendo o snapshot completo e truncando o journal.
+
+import os, json
+from typing import Dict, Iterator, List
+
+class Journal:
+    """
+    Journal de operações em JSON Lines.
+    - append(op): acrescenta uma operação (dict) como uma linha; append_many(ops) grava um lote de uma vez.
+    - replay(): itera as operações gravadas, tolerando uma última linha incompleta (gravação interrompida).
+    - needs_compaction(): indica se o journal passou do limite de operações ou de bytes.
+    - reset(): esvazia o journal (chamar só depois que o snapshot foi gravado).
+    """
+    def __init__(self, path: str, max_ops: int = 500, max_bytes: int = 256 * 1024):
+        self.path = path  # Caminho do arquivo de journal
+        self.max_ops = max_ops  # Limite de operações antes de compactar
+        self.max_bytes = max_bytes  # Limite de tamanho antes de compactar
+        self.ops = 0  # Operações atualmente no journal
+        self.size = os.path.getsize(path) if os.path.exists(path) else 0
+        self._fh = None  # Arquivo aberto para append (aberto sob demanda)
+
+    def replay(self) -> Iterator[Dict]:
+        """Lê todas as operações do journal. Uma linha final corrompida é descartada e truncada."""
+        self.ops = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        good_end = 0  # Offset do fim da última linha válida
+        pos = 0
+        while pos < len(raw):
+            nl = raw.find(b"\n", pos)
+            end = len(raw) if nl < 0 else nl + 1
+            line = raw[pos:end].strip()
+            pos = end
+            if not line:
+                good_end = end
+                continue
+            try:
+                op = json.loads(line.decode("utf-8"))
+            except (ValueError, UnicodeDecodeError):
+                if nl < 0:
+                    break  # Última linha rasgada (queda durante a escrita): descarta
+                good_end = end
+                continue  # Linha intermediária ilegível: ignora e segue
+            good_end = end
+            self.ops += 1
+            yield op
+        if good_end < len(raw):
+            self._truncate(good_end)
+        elif raw and not raw.endswith(b"\n"):
+            self._terminate_last_line()  # Linha final válida mas sem '\n': completa antes de novos appends
+
+    def append(self, op: Dict):
+        """Acrescenta uma operação ao final do journal."""
+        line = (json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        fh = self._open()
+        fh.write(line)
+        fh.flush()
+        self.ops += 1
+        self.size += len(line)
+
+    def append_many(self, ops: List[Dict]):
+        """Acrescenta várias operações com uma única escrita (usado ao confirmar um lote)."""
+        if not ops: return
+        data = "".join(json.dumps(op, ensure_ascii=False, separators=(",", ":")) + "\n" for op in ops).encode("utf-8")
+        fh = self._open()
+        fh.write(data)
+        fh.flush()
+        self.ops += len(ops)
+        self.size += len(data)
+
+    def needs_compaction(self) -> bool:
+        """True quando o journal passou do limite de operações ou de bytes."""
+        return self.ops >= self.max_ops or self.size >= self.max_bytes
+
+    def reset(self):
+        """Esvazia o journal. Deve ser chamado somente após gravar o snapshot."""
+        self.close()
+        with open(self.path, "wb"):
+            pass
+        self.ops = 0
+        self.size = 0
+
+    def close(self):
+        """Fecha o arquivo de append, se aberto."""
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # ---------- internos ----------
+    def _open(self):
+        if self._fh is None:
+            self._fh = open(self.path, "ab")
+        return self._fh
+
+    def _truncate(self, size: int):
+        self.close()
+        with open(self.path, "r+b") as f:
+            f.truncate(size)
+        self.size = size
+
+    def _terminate_last_line(self):
+        self.close()
+        with open(self.path, "ab") as f:
+            f.write(b"\n")
+        self.size += 1
@@ -55,9 +55,25 @@ class Card:
     interval: int = 1  # Intervalo de revisão em dias
     ease: float = 2.5  # Fator de facilidade para ajustar o intervalo
     due: Optional[str] = None  # Data de revisão no formato "YYYY-MM-DD"
+    id: str = ""  # Identificador estável do cartão (usado pelos patches do journal do baralho)
 
 # Classe que representa um deck de cartões de estudo
 @dataclass
 class Deck:
     name: str  # Nome do deck
-    cards: List[Card] = field(default_factory=list)  # Lista de cartões associados ao deck
\ No newline at end of file
+    cards: List[Card] = field(default_factory=list)  # Lista de cartões associados ao deck
+
+# Classe que representa a entrada de um baralho no manifesto (decks/_index.json)
+@dataclass
+class DeckInfo:
+    name: str  # Nome do baralho
+    file: str  # Nome do arquivo JSON dentro de DECKS_DIR
+    cards: int = 0  # Quantidade de cartões
+    due_hist: Dict[str, int] = field(default_factory=dict)  # Cartões por data de revisão ("" = sem data/novo)
+    mtime_ns: int = 0  # Data de modificação do arquivo quando indexado
+    size: int = 0  # Tamanho do arquivo quando indexado
+    journal_size: int = 0  # Tamanho do journal de cartões quando indexado
+
+    # Quantidade de cartões para revisar até a data informada (novos contam como devidos)
+    def due_count(self, today: str) -> int:
+        return sum(n for d, n in self.due_hist.items() if not d or d <= today)
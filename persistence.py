@@ -0,0 +1,164 @@
+# persistence.py
+# Este arquivo implementa o motor de persistência "write-behind" compartilhado pelos repositórios.
+# Em vez de reescrever o JSON a cada mutação, os repositórios marcam seus arquivos como "sujos";
+# o motor agrupa as escritas em uma única descarga (debounce), ignora conteúdos que não mudaram
+# e grava de forma atômica (arquivo temporário + rename).
+
+import os, time, atexit, hashlib, tempfile
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+def atomic_write(path: str, text: str) -> int:
+    """Grava o texto em um arquivo temporário e o renomeia por cima do destino. Retorna os bytes gravados."""
+    data = text.encode("utf-8")
+    folder = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=folder)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try: mode = os.stat(path).st_mode & 0o777  # Preserva as permissões do arquivo original
+        except OSError: mode = 0o644  # mkstemp cria com 0600
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)  # rename atômico (mesmo diretório)
+    except Exception:
+        try: os.remove(tmp)
+        except OSError: pass
+        raise
+    return len(data)
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+# Motor de escrita adiada (write-behind) com coalescência
+class WriteBehind:
+    """
+    Fila de trabalhos de persistência indexada por chave (normalmente o caminho do arquivo).
+    Marcar a mesma chave várias vezes antes da descarga resulta em uma única escrita.
+
+    - Com uma raiz Tk anexada (attach), a descarga acontece `delay_ms` após a última mutação.
+    - Sem raiz (scripts, testes), cada mutação é descarregada imediatamente, como antes.
+    """
+    def __init__(self, delay_ms: int = 400):
+        self.delay_ms = delay_ms  # Janela de debounce
+        self._jobs: Dict[str, Callable[[], None]] = {}  # chave -> trabalho pendente (ordem de inserção)
+        self._digests: Dict[str, str] = {}  # caminho -> hash do último conteúdo gravado
+        self._root = None  # Widget Tk usado para agendar com after()
+        self._after_id = None  # Agendamento pendente
+        self._hold = 0  # Profundidade de batch() aninhados
+        # métricas
+        self.flushes = 0  # Descargas que executaram ao menos um trabalho
+        self.writes = 0  # Arquivos efetivamente gravados
+        self.skipped = 0  # Escritas evitadas por conteúdo idêntico
+        self.bytes_written = 0
+        self._t0 = time.monotonic()
+
+    # ---------- integração com Tk ----------
+    def attach(self, root):
+        """Anexa a raiz Tk: passa a agendar descargas e força uma descarga ao fechar a janela."""
+        self._root = root
+        def _on_close():
+            self.flush()
+            root.destroy()
+        root.protocol("WM_DELETE_WINDOW", _on_close)
+
+    # ---------- API dos repositórios ----------
+    def schedule(self, key: str, job: Callable[[], None]):
+        """Agenda um trabalho de persistência; trabalhos com a mesma chave são coalescidos."""
+        self._jobs.pop(key, None)
+        self._jobs[key] = job
+        self._kick()
+
+    def mark_dirty(self, path: str, dump: Callable[[], str]):
+        """Marca um arquivo como sujo; `dump` só é chamado na descarga e deve retornar o texto completo."""
+        self.schedule(path, lambda: self.write_text(path, dump()))
+
+    def seen(self, path: str, text: str):
+        """Registra o conteúdo atual do arquivo em disco (ex.: recém-carregado) para evitar regravá-lo igual."""
+        self._digests[path] = _digest(text)
+
+    def write_text(self, path: str, text: str) -> bool:
+        """Grava `text` em `path` atomicamente, a menos que o conteúdo seja igual ao último gravado."""
+        digest = _digest(text)
+        if self._digests.get(path) == digest and os.path.exists(path):
+            self.skipped += 1
+            return False
+        self.bytes_written += atomic_write(path, text)
+        self._digests[path] = digest
+        self.writes += 1
+        return True
+
+    @contextmanager
+    def batch(self):
+        """Segura as descargas até o fim do bloco `with` (uma única descarga no commit)."""
+        self._hold += 1
+        try:
+            yield self
+        finally:
+            self._hold -= 1
+            self._kick()
+
+    def _kick(self):
+        if self._hold or not self._jobs:
+            return
+        if self._root is None:
+            self.flush()  # modo síncrono
+            return
+        if self._after_id is not None:
+            try: self._root.after_cancel(self._after_id)
+            except Exception: pass
+        try:
+            self._after_id = self._root.after(self.delay_ms, self._on_timer)
+        except Exception:
+            self._after_id = None
+            self.flush()  # raiz já destruída
+
+    def _on_timer(self):
+        self._after_id = None
+        self.flush()
+
+    def flush(self):
+        """Executa imediatamente todos os trabalhos pendentes."""
+        if self._after_id is not None and self._root is not None:
+            try: self._root.after_cancel(self._after_id)
+            except Exception: pass
+        self._after_id = None
+        if not self._jobs:
+            return
+        jobs, self._jobs = list(self._jobs.items()), {}
+        for i, (key, job) in enumerate(jobs):
+            try:
+                job()
+            except Exception:
+                # Recoloca o que não foi gravado para a próxima descarga
+                for k, j in jobs[i:]: self._jobs.setdefault(k, j)
+                raise
+        self.flushes += 1
+
+    def pending(self) -> int:
+        """Número de trabalhos aguardando descarga."""
+        return len(self._jobs)
+
+    # ---------- métricas ----------
+    def stats(self) -> Dict[str, float]:
+        """Retorna as métricas de escrita desde o início (ou desde reset_stats)."""
+        elapsed = max(1e-9, time.monotonic() - self._t0)
+        return {
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "skipped": self.skipped,
+            "bytes_written": self.bytes_written,
+            "elapsed_s": elapsed,
+            "flushes_per_s": self.flushes / elapsed,
+            "bytes_per_s": self.bytes_written / elapsed,
+        }
+
+    def reset_stats(self):
+        """Zera os contadores de métricas."""
+        self.flushes = self.writes = self.skipped = self.bytes_written = 0
+        self._t0 = time.monotonic()
+
+# Instância única usada por todos os repositórios
+ENGINE = WriteBehind()
+atexit.register(ENGINE.flush)  # Garante a descarga ao encerrar o processo
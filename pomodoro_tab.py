@@ -1,22 +1,28 @@
 # pomodoro_tab.py
 # Este arquivo implementa a aba "Pomodoro" do aplicativo, onde os usuários podem gerenciar sessões de foco e pausas utilizando a técnica Pomodoro.
 # Ele utiliza o tkinter para criar a interface gráfica e interage com o repositório de estatísticas e perfil para registrar progresso e recompensas.
+# O relógio é o da FSM (prazos absolutos): o loop só acorda quando o segundo exibido muda e o estado
+# em andamento é salvo em data/pomodoro.json e volta pausado, no mesmo ponto, após reiniciar o app.
 
 # Importações necessárias para a interface gráfica e funcionalidades adicionais
+import json, math
 import tkinter as tk
 from tkinter import ttk, messagebox
-from fsm import PomodoroFSM  # Máquina de estados finitos para gerenciar o ciclo Pomodoro
+from fsm import PomodoroFSM, Schedule, simulate, REWARD_COINS, REWARD_XP  # Máquina de estados do ciclo Pomodoro e simulação
+from persistence import ENGINE  # Gravação adiada do estado do cronômetro
+from utils import POMODORO_PATH  # Estado salvo do cronômetro
 from widgets import CircularProgress, CoinFloat  # CircularProgress exibe o progresso visualmente, CoinFloat exibe animações de moedas
-from storage import StatsRepo  # StatsRepo gerencia os dados estatísticos do usuário
+from registry import stats_repo  # Repositório de estatísticas compartilhado
 
 # Classe principal que representa a aba "Pomodoro"
 class PomodoroTab(ttk.Frame):
     def __init__(self, parent, profile):
         super().__init__(parent)
         self.profile = profile  # Repositório de perfil do usuário
-        self.fsm = PomodoroFSM()  # Máquina de estados para gerenciar o ciclo Pomodoro (25/5/15 padrão)
-        self.stats = StatsRepo()  # Repositório de estatísticas para registrar minutos focados
+        self.fsm = self._load()  # Máquina de estados para gerenciar o ciclo Pomodoro (25/5/15 padrão)
+        self.stats = stats_repo()  # Repositório de estatísticas (instância compartilhada entre as abas)
         self._timer = None  # Referência ao temporizador ativo
+        self._shown = None  # (estado, segundos, pausado) desenhados por último
         self._focus_seconds = self.fsm.focus  # Duração da sessão de foco em segundos
         self.streak = 0  # Contador de pomodoros concluídos consecutivamente no dia
 
@@ -38,54 +44,118 @@ class PomodoroTab(ttk.Frame):
         ttk.Button(bar, text="⏸ Pausar", command=self.pause).pack(side=tk.LEFT, padx=4)
         ttk.Button(bar, text="⟲ Reset", command=self.reset).pack(side=tk.LEFT, padx=4)
 
+        # === Projeção "e se" ===
+        # Simula um dia com outra divisão foco/pausa (ex.: 50/10) sem mexer no cronômetro
+        proj = ttk.Frame(self); proj.pack(pady=(12, 0))
+        ttk.Label(proj, text="E se:").pack(side=tk.LEFT, padx=4)
+        self.what_if = tk.StringVar(value="50/10/30")  # foco/pausa/longa em minutos
+        ttk.Entry(proj, textvariable=self.what_if, width=10).pack(side=tk.LEFT)
+        ttk.Label(proj, text="por").pack(side=tk.LEFT, padx=4)
+        self.what_if_hours = tk.IntVar(value=4)
+        ttk.Spinbox(proj, from_=1, to=24, textvariable=self.what_if_hours, width=4).pack(side=tk.LEFT)
+        ttk.Label(proj, text="h").pack(side=tk.LEFT, padx=(2, 6))
+        ttk.Button(proj, text="Projetar", command=self.project).pack(side=tk.LEFT)
+        self.proj_lbl = ttk.Label(self, text=""); self.proj_lbl.pack(pady=4)
+
+        # Sessão salva volta pausada onde estava (Iniciar retoma); o tempo com o app fechado não é creditado
+        self._render()
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
     # --------- controles ---------
     # Inicia o ciclo Pomodoro
     def start(self):
-        self.fsm.start()  # Altera o estado da máquina para "FOCUS"
+        self.fsm.start()  # Altera o estado da máquina para "FOCUS" (ou retoma a pausa)
         if self._timer: self.after_cancel(self._timer)  # Cancela o temporizador anterior, se existir
+        self._save()
         self._tick()  # Inicia o loop do temporizador
 
     # Pausa o ciclo Pomodoro
     def pause(self):
         if self._timer: self.after_cancel(self._timer); self._timer=None  # Cancela o temporizador
-        self.fsm.pause()  # Altera o estado da máquina para "PAUSED"
+        self._reward(self.fsm.advance())  # Fecha o que terminou até agora antes de congelar
+        self.fsm.pause()  # Congela o tempo restante da fase
+        self._save(); self._render()
 
     # Reseta o ciclo Pomodoro
     def reset(self):
         if self._timer: self.after_cancel(self._timer); self._timer=None  # Cancela o temporizador
-        self.fsm.reset(); self._render()  # Reseta a máquina de estados e atualiza a interface
+        self.fsm.reset(); self._save(); self._render()  # Reseta a máquina de estados e atualiza a interface
+
+    # Compara a divisão atual com a digitada no mesmo período (simulação instantânea, sem Tk)
+    def project(self):
+        try:
+            alt = Schedule.parse(self.what_if.get())
+            secs = max(1, int(self.what_if_hours.get())) * 3600
+        except (ValueError, tk.TclError):
+            messagebox.showwarning("Projeção", "Use minutos no formato foco/pausa[/longa], ex.: 50/10/30."); return
+        cur = Schedule(self.fsm.focus, self.fsm.short, self.fsm.long, self.fsm.every)
+        a = simulate(cur, secs, timeline=False)
+        b = simulate(alt, secs, timeline=False)
+        fmt = lambda sch, r: (f"{sch.focus//60}/{sch.short//60}: {r.sessions} pomodoros, "
+                              f"{r.focus_minutes} min de foco, +{r.coins} 🪙")
+        self.proj_lbl.configure(text=f"{fmt(cur, a)}   →   {fmt(alt, b)}")
+
+    # --------- estado salvo ---------
+    def _load(self) -> PomodoroFSM:
+        try:
+            with open(POMODORO_PATH, "r", encoding="utf-8") as f:
+                return PomodoroFSM.from_dict(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return PomodoroFSM()
+
+    def _dump(self) -> str:
+        return json.dumps(self.fsm.to_dict(), indent=2)
+
+    def _save(self):
+        ENGINE.mark_dirty(POMODORO_PATH, self._dump)
+
+    # Ao fechar: grava o tempo restante exato (o próximo início volta pausado nesse ponto)
+    def _on_destroy(self, ev):
+        if ev.widget is self and self.fsm.running:
+            ENGINE.write_text(POMODORO_PATH, self._dump())
 
     # --------- loop ---------
-    # Loop principal do temporizador, executado a cada segundo
+    # Loop principal do temporizador: acorda quando o segundo exibido vai mudar
     def _tick(self):
-        self._render()  # Atualiza a interface com o estado atual
-        done_focus = self.fsm.tick()  # Avança o estado da máquina e verifica se o foco foi concluído
-        if done_focus:
-            # Recompensa pelo foco concluído
-            self.streak += 1  # Incrementa o contador de streaks
-            self.streak_lbl.configure(text=f"Streak: {self.streak}")  # Atualiza o texto do streak
-            self.profile.add_rewards(coins=10, xp=10)  # Adiciona recompensas ao perfil do usuário
-            CoinFloat.show(self.winfo_toplevel(), "+10 🪙", near_widget=self.progress, offset=(0, -20))  # Animação de moedas
+        self._timer = None
+        done = self.fsm.advance()  # Aplica todo o tempo real decorrido (mesmo após travamentos)
+        if done:
+            self._reward(done)
+            self._save()  # Mudou de fase: o prazo salvo também muda
+        self._render()  # Redesenha só se o segundo exibido mudou
+        if not self.fsm.running: return
+        left = self.fsm.remaining_at()
+        frac = left - (math.ceil(left) - 1)  # Até o próximo segundo exibido (0 < frac <= 1)
+        self._timer = self.after(max(10, int(frac * 1000) + 5), self._tick)
 
-            # Estatística de minutos focados
-            focus_minutes = int(self._focus_seconds/60)  # Converte segundos de foco para minutos
-            self.stats.add_focus_minutes(focus_minutes)  # Registra os minutos focados
+    # Recompensas pelos focos concluídos (vários, se o loop ficou travado durante fases inteiras)
+    def _reward(self, done: int):
+        if not done: return
+        self.streak += done  # Incrementa o contador de streaks
+        self.streak_lbl.configure(text=f"Streak: {self.streak}")  # Atualiza o texto do streak
+        self.profile.add_rewards(coins=REWARD_COINS * done, xp=REWARD_XP * done)  # Adiciona recompensas ao perfil do usuário
+        CoinFloat.show(self.winfo_toplevel(), f"+{REWARD_COINS * done} 🪙", near_widget=self.progress, offset=(0, -20))  # Animação de moedas
 
-            # Verifica e concede badges (conquistas)
-            self._check_badges()
+        # Estatística de minutos focados
+        focus_minutes = int(self._focus_seconds/60) * done  # Converte segundos de foco para minutos
+        self.stats.add_focus_minutes(focus_minutes)  # Registra os minutos focados
 
-        self._timer = self.after(1000, self._tick)  # Agenda a próxima execução do loop em 1 segundo
+        # Verifica e concede badges (conquistas)
+        self._check_badges()
 
     # Atualiza a interface com o estado atual do ciclo Pomodoro
     def _render(self):
-        mins, secs = divmod(self.fsm.remaining, 60)  # Calcula minutos e segundos restantes
-        if self.fsm.state == "FOCUS":
-            ratio = 1 - (self.fsm.remaining / self._focus_seconds)  # Progresso da sessão de foco
-        else:
-            ratio = 1 - (self.fsm.remaining / (self.fsm.long if self.fsm.state=="LONG_BREAK" else self.fsm.short))  # Progresso da pausa
+        rem = self.fsm.remaining  # Segundos exibidos
+        shown = (self.fsm.state, rem, self.fsm.paused)
+        if shown == self._shown: return  # Nada visível mudou
+        self._shown = shown
+        mins, secs = divmod(rem, 60)  # Calcula minutos e segundos restantes
+        ratio = 1 - (rem / self.fsm.duration())  # Progresso da fase atual
         self.progress.set_progress(max(0.0, min(1.0, ratio)))  # Atualiza o progresso visual
         self.progress.set_time_text(f"{mins:02}:{secs:02}")  # Atualiza o texto do tempo restante
-        self.lbl.configure(text=f"{self.fsm.state.replace('_',' ').title()} — {mins:02}:{secs:02}")  # Atualiza o texto do estado atual
+        state = "Foco" if self.fsm.state == "IDLE" else self.fsm.state.replace('_',' ').title()
+        if self.fsm.paused: state += " (pausado)"
+        self.lbl.configure(text=f"{state} — {mins:02}:{secs:02}")  # Atualiza o texto do estado atual
 
         # Reset opcional do streak ao entrar em LONG_BREAK (aqui mantemos o streak do dia)
         # if self.fsm.state == "LONG_BREAK": self.streak = 0
@@ -99,5 +169,5 @@ class PomodoroTab(ttk.Frame):
         if self.streak >= 10 and "Streak 10+" not in bd:
             bd.append("Streak 10+"); earned.append("🔥 Streak 10+")
         if earned:
-            self.profile._save()  # Salva as conquistas no perfil
+            self.profile._save("badges")  # Salva as conquistas no perfil
             messagebox.showinfo("Conquista!", "Você ganhou:\n• " + "\n• ".join(earned))  # Exibe mensagem de conquista
@@ -6,6 +6,7 @@ from widgets import CircularProgress  # Widget personalizado para exibir progres
 from theme import Theme  # Gerencia temas visuais do aplicativo
 from badges import BadgeEngine  # Motor para gerenciar conquistas (badges)
 from dialogs import AvatarPicker  # Diálogo para selecionar avatares
+from registry import on_change  # Feed de mudanças dos repositórios
 
 # Define o avatar padrão inicial
 DEFAULT_STARTER = "🌸"
@@ -107,6 +108,7 @@ class ProfileTab(ttk.Frame):
         ttk.Button(topbar, text="Atualizar", command=self.refresh).pack()
 
         self.refresh()  # Atualiza a interface inicial
+        on_change("profile", self._on_profile_change)  # Redesenha só o que mudou no perfil
 
     # ===== helpers =====
 
@@ -148,7 +150,7 @@ class ProfileTab(ttk.Frame):
     # ===== actions =====
     def set_avatar(self, emoji):
         self.repo.data["avatar_skin"] = emoji  # Define o avatar atual
-        self.repo._save(); self.refresh()
+        self.repo._save("avatar_skin")
 
     def random_avatar(self):
         inv = self.repo.data.get("avatar_inventory", [])
@@ -160,11 +162,11 @@ class ProfileTab(ttk.Frame):
 
     def save_name(self):
         self.repo.data["name"] = self.name_var.get().strip() or "Usuário"  # Salva o nome do usuário
-        self.repo._save(); self.refresh()
+        self.repo._save("name")
 
     def save_learning(self):
         self.repo.data["learning"] = self.learn_var.get().strip()  # Salva os tópicos de aprendizado
-        self.repo._save(); self.refresh()
+        self.repo._save("learning")
 
     def open_avatar_picker(self):
         dlg = AvatarPicker(self, self.repo)  # Abre o diálogo para selecionar avatares
@@ -172,11 +174,24 @@ class ProfileTab(ttk.Frame):
         if dlg.result:
             self.set_avatar(dlg.result)  # Define o avatar selecionado
 
-    def refresh(self):
-        self.avatar_lbl.configure(text=self.cur_avatar())  # Atualiza o avatar exibido
+    def _render_meta(self):
         self.meta_lbl.configure(text=self.meta_text())  # Atualiza a meta exibida
         xp = self.repo.data.get("xp",0)
         self.cp.set_progress(min(0.99, xp/100))  # Atualiza o progresso de XP
         self.cp.set_time_text(f"XP {xp}/100")
+
+    def _on_profile_change(self, keys=()):
+        """Callback do feed "profile": redesenha apenas as partes afetadas pelas chaves alteradas."""
+        keys = set(keys)
+        if not keys:
+            self.refresh(); return  # Alteração genérica: redesenha tudo
+        if keys & {"coins", "xp", "level"}: self._render_meta()
+        if "avatar_skin" in keys: self.avatar_lbl.configure(text=self.cur_avatar())
+        if "avatar_inventory" in keys: self._render_inventory()
+        if "badges" in keys: self._render_badges()
+
+    def refresh(self):
+        self.avatar_lbl.configure(text=self.cur_avatar())  # Atualiza o avatar exibido
+        self._render_meta()  # Atualiza meta e progresso de XP
         self._render_inventory()  # Atualiza o inventário de avatares
         self._render_badges()  # Atualiza as conquistas
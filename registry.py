@@ -0,0 +1,55 @@
+# registry.py
+# Este arquivo implementa o registro único de repositórios do processo.
+# Cada repositório (perfil, tarefas, estatísticas, tags, baralhos) é criado uma única vez e
+# compartilhado por todas as abas, evitando cópias independentes do mesmo arquivo JSON
+# (onde a última aba a salvar sobrescrevia os incrementos das outras).
+
+from typing import Callable, Dict
+from events import on_change, emit  # Reexportados: feed de mudanças entre abas
+
+_instances: Dict[str, object] = {}  # nome -> instância única
+
+def _get(name: str, factory: Callable[[], object]):
+    inst = _instances.get(name)
+    if inst is None:
+        inst = _instances[name] = factory()
+    return inst
+
+def profile_repo():
+    """Repositório de perfil compartilhado."""
+    from storage import open_profile_repo
+    return _get("profile", open_profile_repo)
+
+def task_repo():
+    """Repositório de tarefas compartilhado."""
+    from storage import open_task_repo
+    return _get("tasks", open_task_repo)
+
+def stats_repo():
+    """Repositório de estatísticas compartilhado."""
+    from storage import open_stats_repo
+    return _get("stats", open_stats_repo)
+
+def tags_repo():
+    """Repositório de tags compartilhado."""
+    from tags_repo import TagsRepo
+    return _get("tags", lambda: TagsRepo(task_repo()))
+
+def deck_repo():
+    """Repositório de baralhos compartilhado."""
+    from deck_repo import DeckRepo
+    return _get("decks", DeckRepo)
+
+def scheduler():
+    """Fila de revisão de flashcards compartilhada (sobre o repositório de baralhos)."""
+    from scheduler import ReviewScheduler
+    return _get("scheduler", lambda: ReviewScheduler(deck_repo()))
+
+def card_search():
+    """Índice de busca de flashcards compartilhado."""
+    from card_search import CardSearchIndex
+    return _get("card_search", lambda: CardSearchIndex(deck_repo()))
+
+def reset():
+    """Descarta as instâncias (ex.: após trocar o backend de armazenamento)."""
+    _instances.clear()
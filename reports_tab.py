@@ -4,41 +4,69 @@
 
 # Importações necessárias para a interface gráfica e funcionalidades adicionais
 import tkinter as tk
+import datetime as dt
 from tkinter import ttk
 from widgets import BarChart  # BarChart é um widget personalizado para exibir gráficos de barras
-from storage import StatsRepo  # StatsRepo gerencia os dados estatísticos do usuário
+from registry import stats_repo, on_change  # Repositório compartilhado e feed de mudanças
 from theme import Theme  # Theme gerencia o tema visual do aplicativo
 
+# Períodos disponíveis: rótulo -> função que devolve (início, fim, granularidade)
+def _last_days(today): return today - dt.timedelta(days=6), today, "day"
+def _last_weeks(today): return today - dt.timedelta(weeks=11), today, "week"
+def _last_months(today):
+    m = today.year * 12 + today.month - 1 - 11
+    return dt.date(m // 12, m % 12 + 1, 1), today, "month"
+def _last_years(today): return dt.date(today.year - 4, 1, 1), today, "year"
+
+PERIODS = {
+    "últimos 7 dias": _last_days,
+    "últimas 12 semanas": _last_weeks,
+    "últimos 12 meses": _last_months,
+    "últimos 5 anos": _last_years,
+}
+
 # Classe principal que representa a aba "Relatórios"
 class ReportsTab(ttk.Frame):
     def __init__(self, parent, task_repo):
         super().__init__(parent)
-        self.stats = StatsRepo()  # Repositório de estatísticas para obter dados semanais
+        self.stats = stats_repo()  # Repositório de estatísticas (instância compartilhada entre as abas)
 
         # === Cabeçalho ===
         # Contém o título "Relatórios da Semana" e um botão para atualizar os gráficos
         head = ttk.Frame(self); head.pack(fill=tk.X, pady=8)
-        ttk.Label(head, text="Relatórios da Semana", style="Header.TLabel").pack(side=tk.LEFT, padx=8)
+        ttk.Label(head, text="Relatórios", style="Header.TLabel").pack(side=tk.LEFT, padx=8)
         ttk.Button(head, text="Atualizar", command=self.refresh).pack(side=tk.RIGHT, padx=8)
+        # Seletor de período (consultas servidas pelos agregados semana/mês/ano do StatsRepo)
+        self.period = tk.StringVar(value="últimos 7 dias")
+        cb = ttk.Combobox(head, textvariable=self.period, values=list(PERIODS), state="readonly", width=18)
+        cb.pack(side=tk.RIGHT, padx=4)
+        cb.bind("<<ComboboxSelected>>", lambda e: self.refresh())
 
         # === Cartão para o gráfico de tarefas concluídas ===
         card1 = ttk.Frame(self, style="Card.TFrame"); card1.pack(fill=tk.X, padx=12, pady=8)
-        ttk.Label(card1, text="✅ Tarefas concluídas (últimos 7 dias)", style="Sub.TLabel").pack(anchor="w", padx=12, pady=6)
+        self.lbl_done = ttk.Label(card1, text="✅ Tarefas concluídas (últimos 7 dias)", style="Sub.TLabel")
+        self.lbl_done.pack(anchor="w", padx=12, pady=6)
         self.chart_done = BarChart(card1, width=980, height=240)  # Gráfico de barras para tarefas concluídas
         self.chart_done.pack(padx=12, pady=8)
 
         # === Cartão para o gráfico de minutos de foco ===
         card2 = ttk.Frame(self, style="Card.TFrame"); card2.pack(fill=tk.X, padx=12, pady=8)
-        ttk.Label(card2, text="⏳ Minutos de foco (últimos 7 dias)", style="Sub.TLabel").pack(anchor="w", padx=12, pady=6)
+        self.lbl_focus = ttk.Label(card2, text="⏳ Minutos de foco (últimos 7 dias)", style="Sub.TLabel")
+        self.lbl_focus.pack(anchor="w", padx=12, pady=6)
         self.chart_focus = BarChart(card2, width=980, height=240)  # Gráfico de barras para minutos de foco
         self.chart_focus.pack(padx=12, pady=8)
 
         self.refresh()  # Atualiza os gráficos ao inicializar a aba
+        on_change("stats", lambda **_: self.refresh())  # Redesenha quando tarefas/foco são registrados
 
     # Método para atualizar os gráficos com os dados mais recentes
     def refresh(self):
-        days, done, focus = self.stats.last7()  # Obtém os últimos 7 dias de dados
-        labels = [d[5:] for d in days]  # Formata as datas no formato "mm-dd"
+        name = self.period.get()
+        start, end, gran = PERIODS.get(name, _last_days)(dt.date.today())
+        keys, done, focus = self.stats.range(start, end, gran)  # Buckets do período escolhido
+        labels = [k[5:] if gran in ("day", "week", "month") else k for k in keys]  # Remove o ano (exceto por ano)
+        self.lbl_done.configure(text=f"✅ Tarefas concluídas ({name})")
+        self.lbl_focus.configure(text=f"⏳ Minutos de foco ({name})")
         pal = Theme.palette  # Obtém a paleta de cores do tema atual
 
         # Define cores seguras com valores padrão (fallback)
@@ -0,0 +1,157 @@
+# scheduler.py
+# Este arquivo implementa a fila de revisão espaçada (SM-2 simplificado) sobre o DeckRepo.
+# Cada baralho tem um heap mínimo de (data de revisão, id do cartão); a fila geral combina as
+# cabeças desses heaps, então uma sessão de estudo só visita cartões devidos, sem percorrer baralhos inteiros.
+# Baralhos sem nada devido (segundo o manifesto) só são carregados quando a primeira data chega.
+# O baralho em si é sempre pedido ao DeckRepo (que mantém um único objeto por arquivo); se o objeto
+# mudou (ex.: descartado do cache e relido), o heap do baralho é remontado a partir do novo.
+
+import heapq, weakref, datetime as dt
+from typing import Dict, List, Optional, Set, Tuple
+from models import Deck, Card
+from events import on_change  # Alterações de cartões feitas pelo DeckRepo
+
+Entry = Tuple[str, str]  # (data de revisão, id do cartão); "" = cartão novo (vem primeiro)
+
+def _key(card: Card) -> str:
+    return card.due or ""
+
+class ReviewScheduler:
+    """
+    Fila de revisão entre baralhos.
+    - next_due(limit, deck=None, today=None): cartões devidos em ordem de data (sem removê-los da fila).
+    - grade(deck, card, correct): calcula intervalo/facilidade/data, persiste e recoloca o cartão (O(log n)).
+    Entradas desatualizadas (cartão editado/removido) são descartadas ao chegar ao topo do heap.
+    """
+    def __init__(self, repo):
+        self.repo = repo  # DeckRepo
+        self._decks: Dict[str, "weakref.ref[Deck]"] = {}  # nome -> baralho indexado (ref. fraca: o cache decide o que fica em memória)
+        self._cards: Dict[str, Dict[str, Card]] = {}  # nome -> id -> cartão
+        self._heaps: Dict[str, List[Entry]] = {}  # nome -> heap de revisões
+        self._waiting: List[Tuple[str, str]] = []  # (primeira data devida, nome) de baralhos ainda não carregados
+        self._names: Set[str] = set()  # Baralhos conhecidos (carregados ou aguardando)
+        for info in repo.list_deck_infos():
+            self._watch(info.name, min(info.due_hist, default=None))
+        on_change("decks", self._on_deck_change)
+
+    # ---------- carga ----------
+    def _watch(self, name: str, first_due: Optional[str]):
+        """Registra um baralho para ser carregado quando `first_due` chegar (None = vazio)."""
+        self._names.add(name)
+        if first_due is not None:
+            heapq.heappush(self._waiting, (first_due, name))
+
+    def _load(self, name: str) -> Optional[Deck]:
+        """Carrega um baralho e monta seu heap (O(n))."""
+        deck = self.repo.get_deck(name)
+        if deck is None:
+            self._forget(name); return None
+        self._decks[name] = weakref.ref(deck)
+        self._cards[name] = {c.id: c for c in deck.cards}
+        h = [(_key(c), c.id) for c in deck.cards]
+        heapq.heapify(h)
+        self._heaps[name] = h
+        return deck
+
+    def _deck(self, name: str) -> Optional[Deck]:
+        """Baralho atual segundo o DeckRepo; remonta o heap só se o objeto não for o já indexado."""
+        deck = self.repo.get_deck(name)
+        ref = self._decks.get(name)
+        if deck is None or ref is None or ref() is not deck:
+            return self._load(name)
+        return deck
+
+    def _forget(self, name: str):
+        self._decks.pop(name, None); self._cards.pop(name, None); self._heaps.pop(name, None)
+        self._names.discard(name)
+
+    def _load_due(self, today: str):
+        """Carrega os baralhos em espera cuja primeira data devida já chegou."""
+        while self._waiting and self._waiting[0][0] <= today:
+            _, name = heapq.heappop(self._waiting)
+            if name in self._names and name not in self._decks:
+                self._load(name)
+
+    def _clean(self, name: str):
+        """Remove do topo do heap entradas de cartões removidos ou reagendados."""
+        h, cards = self._heaps[name], self._cards[name]
+        while h:
+            due, cid = h[0]
+            c = cards.get(cid)
+            if c is not None and _key(c) == due:
+                return
+            heapq.heappop(h)
+
+    # ---------- consultas ----------
+    def next_due(self, limit: int = 20, deck: Optional[str] = None, today: Optional[str] = None) -> List[Tuple[Deck, Card]]:
+        """Até `limit` cartões devidos até `today`, do mais atrasado ao mais recente (novos primeiro)."""
+        today = today or dt.date.today().isoformat()
+        if deck is None:
+            self._load_due(today)  # Fila geral: baralhos em espera cuja data chegou
+        names = [deck] if deck is not None else list(self._heaps)
+        decks: Dict[str, Deck] = {}
+        heads = []
+        for name in names:
+            d = self._deck(name)  # Objeto atual (com deck=, só este baralho é lido)
+            if d is None: continue
+            decks[name] = d
+            self._clean(name)
+            h = self._heaps[name]
+            if h and h[0][0] <= today:
+                heads.append((h[0][0], name))
+        heapq.heapify(heads)
+        out: List[Tuple[Deck, Card]] = []
+        taken: List[Tuple[str, Entry]] = []
+        seen = set()
+        while heads and len(out) < limit:
+            _, name = heapq.heappop(heads)
+            e = heapq.heappop(self._heaps[name])
+            if (name, e[1]) not in seen:  # Entradas repetidas do mesmo cartão são descartadas
+                seen.add((name, e[1]))
+                taken.append((name, e))
+                out.append((decks[name], self._cards[name][e[1]]))
+            self._clean(name)
+            h = self._heaps[name]
+            if h and h[0][0] <= today:
+                heapq.heappush(heads, (h[0][0], name))
+        for name, e in taken:  # Consulta não consome a fila
+            heapq.heappush(self._heaps[name], e)
+        return out
+
+    # ---------- revisão ----------
+    def grade(self, deck: Deck, card: Card, correct: bool, today: Optional[str] = None) -> Card:
+        """Aplica o SM-2 simplificado, persiste o cartão e o recoloca na fila pela nova data."""
+        cur = self._deck(deck.name)
+        if cur is not None:  # Objetos atuais do DeckRepo (o chamador pode ter uma cópia já descartada do cache)
+            deck, card = cur, self._cards[deck.name].get(card.id, card)
+        day = dt.date.fromisoformat(today) if today else dt.date.today()
+        if correct:
+            interval = max(1, int(round(card.interval * card.ease)))
+            ease = max(1.3, card.ease + 0.1)
+        else:
+            interval = 1
+            ease = max(1.3, card.ease - 0.1)
+        due = (day + dt.timedelta(days=interval)).isoformat()
+        self.repo.review_card(deck, card, interval, ease, due)  # Emite "decks" -> _requeue
+        return card
+
+    def _requeue(self, name: str, card: Card):
+        if name not in self._decks:
+            self._watch(name, _key(card))
+            return
+        if self._deck(name) is None:
+            return
+        self._cards[name][card.id] = card
+        heapq.heappush(self._heaps[name], (_key(card), card.id))
+
+    def _on_deck_change(self, deck: str, op: str, card: Optional[Card] = None, **_):
+        """Mantém a fila em dia com as alterações feitas pelo DeckRepo."""
+        if op in ("add", "set") and card is not None:
+            self._requeue(deck, card)
+        elif op == "del" and deck in self._cards:
+            self._cards[deck].pop(getattr(card, "id", None), None)
+        elif op == "save":
+            if deck in self._decks: self._load(deck)
+            else: self._watch(deck, "")
+        elif op == "delete":
+            self._forget(deck)
@@ -7,6 +7,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from theme import Theme  # Gerencia os temas do aplicativo
 from widgets import CoinFloat, ScrollableFrame  # CoinFloat exibe animações de moedas, ScrollableFrame cria áreas roláveis
+from registry import on_change  # Feed de mudanças dos repositórios
 
 # Lista de itens disponíveis na loja, cada item é representado como um dicionário com suas propriedades
 SHOP_ITEMS = [
@@ -79,6 +80,15 @@ class ShopTab(ttk.Frame):
             ttk.Label(self, text="(Módulos de jogos não encontrados)").pack()
 
         self.refresh_buttons()  # Atualiza o estado dos botões de jogos
+        on_change("profile", self._on_profile_change)  # Moedas/jogos mudam em outras abas
+
+    # Callback do feed "profile": só atualiza o que depende das chaves alteradas
+    def _on_profile_change(self, keys=()):
+        keys = set(keys)
+        if not keys or keys & {"coins", "level"}:
+            self.lbl.configure(text=self.meta_text())
+        if not keys or "unlocked_games" in keys:
+            self.refresh_buttons()
 
     # Retorna o texto com informações do usuário (moedas e nível)
     def meta_text(self):
@@ -108,7 +118,7 @@ class ShopTab(ttk.Frame):
             if e not in inv:
                 inv.append(e); changed = True
         if changed:
-            self.profile._save()  # Salva as alterações no perfil
+            self.profile._save("avatar_inventory")  # Salva as alterações no perfil
 
     # Alterna para o próximo tema na ordem definida
     def _theme_cycle(self):
@@ -133,10 +143,10 @@ class ShopTab(ttk.Frame):
             self._theme_cycle()
         elif t == "boost":
             self.profile.data["coin_multiplier"] = float(item.get("mult", 2.0))
-            self.profile._save()
+            self.profile._save("coin_multiplier")
         elif t == "sound":
             self.profile.data["sound_pack"] = True
-            self.profile._save()
+            self.profile._save("sound_pack")
         elif t == "avatar":
             self._add_avatars([item.get("emoji","🌸")])
         elif t == "pack":
@@ -147,4 +157,3 @@ class ShopTab(ttk.Frame):
         # Exibe animação de moedas e mensagem de confirmação
         CoinFloat.show(self.winfo_toplevel(), f"-{price} 🪙", near_widget=self, offset=(0, -20))
         messagebox.showinfo("Loja", f"Você adquiriu: {item['name']}!")
-        self.refresh()  # Atualiza a interface após a compra
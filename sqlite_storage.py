@@ -0,0 +1,443 @@
+# sqlite_storage.py
+# Este arquivo implementa o backend SQLite opcional para tarefas, estatísticas e perfil.
+# As classes mantêm a mesma API dos repositórios JSON de storage.py (list_all, get, add, update, remove,
+# last7, add_rewards, ...), mas filtros e ordenação são resolvidos em SQL, com índices.
+# A aba Tarefas usa query_ids() neste backend: busca e ordenação rodam no banco, sem carregar todas as tarefas.
+# Ativado por utils.STORAGE_BACKEND = "sqlite" (variável de ambiente STUDYHUB_BACKEND=sqlite).
+
+import os, json, sqlite3, datetime as dt
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Union
+from models import Task, Profile  # Modelos de dados para tarefas e perfil
+from utils import DB_PATH, ensure_data_dirs  # Caminho do banco e utilitários
+from events import emit  # Feed de mudanças para as abas
+from cooccur import TOP_K, pair_delta, rank_related  # Coocorrência de tags
+from persistence import ENGINE  # Descargas dos arquivos derivados (ex.: tags.json)
+from storage import PROFILE_PATH, TASKS_PATH, TASKS_JOURNAL_PATH, STATS_PATH, ProfileRepo, StatsRepo, profile_defaults, _merged_tags  # Fontes da migração e classes base
+from timeseries import DailySeries  # Séries diárias com agregados
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tasks (
+    id        INTEGER PRIMARY KEY,
+    title     TEXT NOT NULL,
+    priority  INTEGER NOT NULL DEFAULT 2,
+    scheduled TEXT,
+    done      INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_done      ON tasks(done);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority  ON tasks(priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_scheduled ON tasks(scheduled);
+CREATE TABLE IF NOT EXISTS task_tags (
+    task_id INTEGER NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+    pos     INTEGER NOT NULL,
+    tag     TEXT NOT NULL,
+    PRIMARY KEY (task_id, pos)
+);
+CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag);
+CREATE TABLE IF NOT EXISTS tag_pairs (
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (a, b)
+);
+CREATE INDEX IF NOT EXISTS idx_tag_pairs_top ON tag_pairs(a, n DESC);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    day   TEXT PRIMARY KEY,
+    done  INTEGER NOT NULL DEFAULT 0,
+    focus INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS profile (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# Expressões de ORDER BY por coluna (evita injeção de SQL); mesmas chaves de task_sort.COLUMN_KEYS,
+# com valores ausentes no fim em ordem crescente
+SORTABLE = {
+    "id": ("t.id",),
+    "title": ("py_lower(t.title)",),
+    "priority": ("COALESCE(t.priority, 3)",),
+    "tags": ("(SELECT py_lower(group_concat(tag, ' ')) FROM (SELECT tag FROM task_tags WHERE task_id = t.id ORDER BY pos))",),
+    "scheduled": ("t.scheduled IS NULL", "t.scheduled"),
+    "done": ("t.done",),
+}
+
+_conns: Dict[str, sqlite3.Connection] = {}
+
+def _py_lower(text):
+    """lower() do Python (o do SQLite só conhece ASCII): busca e ordenação iguais às do backend JSON."""
+    return text.lower() if isinstance(text, str) else text
+
+def connect(path: str = DB_PATH) -> sqlite3.Connection:
+    """Abre (uma vez por processo) a conexão com o banco, em modo WAL, com o schema e a migração aplicados."""
+    conn = _conns.get(path)
+    if conn is not None:
+        return conn
+    ensure_data_dirs()
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+    conn.executescript(SCHEMA)
+    migrate_from_json(conn)
+    build_tag_pairs(conn)
+    _conns[path] = conn
+    return conn
+
+# ---------- migração ----------
+def _json_tasks() -> List[Task]:
+    """
+    Tarefas do backend JSON (snapshot + journal), lidas sem instanciar o TaskRepo:
+    nada é compactado, truncado ou regravado (linhas ilegíveis do journal são só ignoradas).
+    """
+    by_id: Dict[int, Task] = {}
+    if os.path.exists(TASKS_PATH):
+        with open(TASKS_PATH, "r", encoding="utf-8") as f:
+            for x in json.load(f):
+                t = Task.from_dict(x); by_id[t.id] = t
+    if os.path.exists(TASKS_JOURNAL_PATH):
+        with open(TASKS_JOURNAL_PATH, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    continue
+                if op.get("op") == "put":
+                    t = Task.from_dict(op["task"]); by_id[t.id] = t
+                elif op.get("op") == "del":
+                    by_id.pop(op.get("id"), None)
+    return list(by_id.values())
+
+def migrate_from_json(conn: sqlite3.Connection, force: bool = False) -> bool:
+    """
+    Migra uma única vez os dados de data/*.json para o banco.
+    Retorna True se a migração foi executada agora.
+    """
+    row = conn.execute("SELECT value FROM meta WHERE key='migrated_from_json'").fetchone()
+    if row and not force:
+        return False
+    with conn:
+        for t in _json_tasks():
+            _insert_task(conn, t)
+        if os.path.exists(STATS_PATH):
+            with open(STATS_PATH, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+            days = set(stats.get("done_per_day", {})) | set(stats.get("focus_minutes", {}))
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_stats(day, done, focus) VALUES (?, ?, ?)",
+                [(d, stats.get("done_per_day", {}).get(d, 0), stats.get("focus_minutes", {}).get(d, 0)) for d in days])
+        if os.path.exists(PROFILE_PATH):
+            with open(PROFILE_PATH, "r", encoding="utf-8") as f:
+                prof = json.load(f)
+            conn.executemany("INSERT OR REPLACE INTO profile(key, value) VALUES (?, ?)",
+                             [(k, json.dumps(v, ensure_ascii=False)) for k, v in prof.items()])
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('migrated_from_json', ?)",
+                     (dt.datetime.now().isoformat(timespec="seconds"),))
+    return True
+
+def build_tag_pairs(conn: sqlite3.Connection, force: bool = False) -> bool:
+    """Monta uma única vez a tabela de coocorrência a partir de task_tags; depois ela é mantida por _insert_task."""
+    row = conn.execute("SELECT value FROM meta WHERE key='tag_pairs_built'").fetchone()
+    if row and not force:
+        return False
+    with conn:
+        conn.execute("DELETE FROM tag_pairs")
+        conn.execute("""INSERT INTO tag_pairs(a, b, n)
+                        SELECT x.tag, y.tag, COUNT(DISTINCT x.task_id) FROM task_tags x
+                        JOIN task_tags y ON y.task_id = x.task_id AND y.tag <> x.tag
+                        GROUP BY x.tag, y.tag""")
+        conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES ('tag_pairs_built', ?)",
+                     (dt.datetime.now().isoformat(timespec="seconds"),))
+    return True
+
+def _task_tags(conn: sqlite3.Connection, tid: int) -> set:
+    return {r[0] for r in conn.execute("SELECT tag FROM task_tags WHERE task_id=?", (tid,))}
+
+def _update_pairs(conn: sqlite3.Connection, old, new):
+    """Aplica em tag_pairs só os pares que mudaram entre as tags antigas e as novas de uma tarefa."""
+    gone, came = pair_delta(old, new)
+    if gone:
+        conn.executemany("UPDATE tag_pairs SET n = n - 1 WHERE a=? AND b=?", gone)
+        conn.execute("DELETE FROM tag_pairs WHERE n <= 0")
+    if came:
+        conn.executemany("INSERT INTO tag_pairs(a, b, n) VALUES (?, ?, 1) "
+                         "ON CONFLICT(a, b) DO UPDATE SET n = n + 1", came)
+
+def _insert_task(conn: sqlite3.Connection, t: Task):
+    _update_pairs(conn, _task_tags(conn, t.id), t.tags or [])
+    conn.execute("INSERT OR REPLACE INTO tasks(id, title, priority, scheduled, done) VALUES (?, ?, ?, ?, ?)",
+                 (t.id, t.title, t.priority, t.scheduled, int(bool(t.done))))
+    conn.execute("DELETE FROM task_tags WHERE task_id=?", (t.id,))
+    conn.executemany("INSERT INTO task_tags(task_id, pos, tag) VALUES (?, ?, ?)",
+                     [(t.id, i, tag) for i, tag in enumerate(t.tags or [])])
+
+# Repositório de tarefas em SQLite
+class SqliteTaskRepo:
+    """Mesma API do TaskRepo JSON; consultas filtradas/ordenadas (query, query_ids) são executadas no banco."""
+    def __init__(self, path: str = DB_PATH):
+        self.conn = connect(path)
+        self._hold = 0  # Profundidade de batch() aninhados
+        self._touched: Dict[int, set] = {}  # id -> tags envolvidas nas mutações do lote atual
+
+    @contextmanager
+    def _tx(self):
+        """Transação de uma operação; dentro de batch() o commit fica para o fim do lote."""
+        if self._hold:
+            yield
+        else:
+            with self.conn:
+                yield
+
+    @contextmanager
+    def batch(self):
+        """
+        Agrupa mutações em uma única transação e uma única descarga do motor de persistência.
+        Commit só no fim do lote externo; se o lote falhar, nada dele é gravado (rollback).
+        """
+        self._hold += 1
+        try:
+            with ENGINE.batch():
+                yield self
+        except BaseException:
+            self._hold -= 1
+            if not self._hold:
+                self.conn.rollback()
+                self._undo_events()
+            raise
+        self._hold -= 1
+        if not self._hold:
+            self.conn.commit()
+            self._touched.clear()
+
+    def _emit(self, op: str, tid: int, tags):
+        """Publica a mudança (dentro de um lote, guarda o id para republicar se houver rollback)."""
+        if self._hold:
+            self._touched.setdefault(tid, set()).update(tags)
+        emit("tasks", op=op, id=tid, tags=list(tags))
+
+    def _undo_events(self):
+        """Após o rollback, republica as tarefas do lote com o estado restaurado do banco."""
+        touched, self._touched = self._touched, {}
+        for tid, tags in touched.items():
+            gone = self.conn.execute("SELECT 1 FROM tasks WHERE id=?", (tid,)).fetchone() is None
+            emit("tasks", op="del" if gone else "put", id=tid, tags=list(tags | self._tags_of(tid)))
+
+    def _rows_to_tasks(self, rows) -> List[Task]:
+        """Converte linhas de `tasks` em objetos Task, buscando as tags de todas de uma vez."""
+        tasks = [Task(id=r["id"], title=r["title"], priority=r["priority"], tags=[],
+                      scheduled=r["scheduled"], done=bool(r["done"])) for r in rows]
+        if not tasks:
+            return tasks
+        by_id = {t.id: t for t in tasks}
+        ids = list(by_id)
+        for i in range(0, len(ids), 900):  # Limite de parâmetros do SQLite
+            chunk = ids[i:i+900]
+            marks = ",".join("?" * len(chunk))
+            for r in self.conn.execute(
+                    f"SELECT task_id, tag FROM task_tags WHERE task_id IN ({marks}) ORDER BY task_id, pos", chunk):
+                by_id[r["task_id"]].tags.append(r["tag"])
+        return tasks
+
+    def list_all(self):
+        """Retorna todas as tarefas."""
+        return self._rows_to_tasks(self.conn.execute("SELECT * FROM tasks ORDER BY id"))
+
+    @staticmethod
+    def _select(cols: str, done: Optional[bool], tag: Union[str, Sequence[str], None], text: Optional[str],
+                order_by: Sequence[str], limit: Optional[int]):
+        """Monta o SELECT de query()/query_ids(): (sql, argumentos)."""
+        where, args = [], []
+        if done is not None:
+            where.append("t.done = ?"); args.append(int(done))
+        if tag is not None:
+            tags = [tag] if isinstance(tag, str) else list(tag)
+            marks = ",".join("?" * len(tags)) or "NULL"
+            where.append(f"t.id IN (SELECT task_id FROM task_tags WHERE tag IN ({marks}))"); args.extend(tags)
+        if text:
+            q = text.lower()
+            where.append("(instr(py_lower(t.title), ?) OR instr(CAST(t.priority AS TEXT), ?)"
+                         " OR EXISTS (SELECT 1 FROM task_tags g WHERE g.task_id = t.id AND instr(py_lower(g.tag), ?)))")
+            args.extend((q, q, q))
+        order, descs = [], []
+        for col in order_by:
+            desc = col.startswith("-"); col = col.lstrip("-")
+            if col not in SORTABLE:
+                raise ValueError(f"coluna de ordenação inválida: {col}")
+            order.extend(f"{e} {'DESC' if desc else 'ASC'}" for e in SORTABLE[col])
+            descs.append(desc)
+        order.append("t.id DESC" if descs and all(descs) else "t.id ASC")  # Desempate como em task_sort
+        sql = f"SELECT {cols} FROM tasks t"
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY " + ", ".join(order)
+        if limit is not None:
+            sql += " LIMIT ?"; args.append(int(limit))
+        return sql, args
+
+    def query(self, done: Optional[bool] = None, tag: Union[str, Sequence[str], None] = None, text: Optional[str] = None,
+              order_by: Sequence[str] = ("done", "priority", "scheduled"), limit: Optional[int] = None) -> List[Task]:
+        """
+        Consulta filtrada e ordenada no banco.
+        - done: filtra por estado de conclusão; tag: tarefas com a tag (ou com alguma das tags de uma lista).
+        - text: trecho no título, na prioridade ou em alguma tag (mesma regra da busca da aba, sem maiúsculas).
+        - order_by: colunas de SORTABLE (prefixo '-' para decrescente); o id desempata.
+        """
+        return self._rows_to_tasks(self.conn.execute(*self._select("t.*", done, tag, text, order_by, limit)))
+
+    def query_ids(self, done: Optional[bool] = None, tag: Union[str, Sequence[str], None] = None, text: Optional[str] = None,
+                  order_by: Sequence[str] = ("done", "priority", "scheduled"), limit: Optional[int] = None) -> List[int]:
+        """Como query(), mas só os ids (a tabela busca as linhas visíveis sob demanda)."""
+        return [r[0] for r in self.conn.execute(*self._select("t.id", done, tag, text, order_by, limit))]
+
+    def by_tag(self, tag: str) -> List[Task]:
+        """Tarefas que possuem a tag (usa o índice de task_tags)."""
+        return self.query(tag=tag, order_by=("id",))
+
+    def tags(self) -> Dict[str, int]:
+        """Contagem de tarefas por tag."""
+        return {r[0]: r[1] for r in self.conn.execute(
+            "SELECT tag, COUNT(DISTINCT task_id) FROM task_tags GROUP BY tag")}
+
+    def tag_count(self, tag: str) -> int:
+        """Número de tarefas com a tag (usa o índice de task_tags)."""
+        return self.conn.execute("SELECT COUNT(DISTINCT task_id) FROM task_tags WHERE tag=?", (tag,)).fetchone()[0]
+
+    def _tags_of(self, tid: int) -> set:
+        return _task_tags(self.conn, tid)
+
+    def related_tags(self, tags: List[str], k: int = 6) -> List[str]:
+        """Tags que mais aparecem junto de `tags` nas tarefas (sem elas); usa o índice (a, n) de tag_pairs."""
+        tags = set(tags)
+        tops = {}
+        for t in tags:
+            top = [(r[1], r[0]) for r in self.conn.execute(
+                "SELECT b, n FROM tag_pairs WHERE a=? ORDER BY n DESC, b LIMIT ?", (t, TOP_K))]
+            tops[t] = (self.tag_count(t) if top else 0, top)
+        return rank_related(tops, tags, k)
+
+    def due_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Task]:
+        """Tarefas agendadas entre `start` e `end` (inclusivos), em ordem de data."""
+        sql, args = "SELECT * FROM tasks WHERE scheduled IS NOT NULL", []
+        if start is not None: sql += " AND scheduled >= ?"; args.append(start)
+        if end is not None: sql += " AND scheduled <= ?"; args.append(end)
+        return self._rows_to_tasks(self.conn.execute(sql + " ORDER BY scheduled, id", args))
+
+    def open_tasks(self) -> List[Task]:
+        """Tarefas ainda não concluídas."""
+        return self.query(done=False, order_by=("id",))
+
+    def done_tasks(self) -> List[Task]:
+        """Tarefas concluídas."""
+        return self.query(done=True, order_by=("id",))
+
+    def get(self, tid: int):
+        """Obtém uma tarefa pelo ID."""
+        rows = self._rows_to_tasks(self.conn.execute("SELECT * FROM tasks WHERE id=?", (tid,)))
+        if not rows:
+            raise KeyError(tid)
+        return rows[0]
+
+    def add(self, title, priority=2, tags=None, scheduled=None):
+        """Adiciona uma nova tarefa."""
+        with self._tx():
+            cur = self.conn.execute("INSERT INTO tasks(title, priority, scheduled, done) VALUES (?, ?, ?, 0)",
+                                    (title, priority, scheduled))
+            t = Task(id=cur.lastrowid, title=title, priority=priority, tags=list(tags or []), scheduled=scheduled)
+            _insert_task(self.conn, t)
+        self._emit("put", t.id, set(t.tags))
+        return t
+
+    def restore(self, data: Dict):
+        """Recoloca uma tarefa removida (usado pelo Undo), preservando o ID original."""
+        t = Task.from_dict(data)
+        old = self._tags_of(t.id)
+        with self._tx():
+            _insert_task(self.conn, t)
+        self._emit("put", t.id, old ^ set(t.tags))
+        return t
+
+    def update(self, tid: int, **fields):
+        """Atualiza os campos de uma tarefa existente."""
+        t = self.get(tid)
+        old = set(t.tags)
+        for k, v in fields.items(): setattr(t, k, v)
+        with self._tx():
+            _insert_task(self.conn, t)
+        self._emit("put", t.id, old ^ set(t.tags))
+        return t
+
+    def remove(self, tid: int):
+        """Remove uma tarefa pelo ID."""
+        old = self._tags_of(tid)
+        with self._tx():
+            _update_pairs(self.conn, old, ())
+            self.conn.execute("DELETE FROM tasks WHERE id=?", (tid,))
+        self._emit("del", tid, old)
+
+    def merge_tags(self, sources: List[str], target: str) -> int:
+        """Troca as tags `sources` por `target` em todas as tarefas que as usam, em uma única transação."""
+        target = target.strip()
+        sources = {s for s in sources if s and s != target}
+        if not target or not sources: return 0
+        marks = ",".join("?" * len(sources))
+        rows = self.conn.execute(f"SELECT DISTINCT task_id FROM task_tags WHERE tag IN ({marks}) ORDER BY task_id",
+                                 list(sources)).fetchall()
+        with self.batch():
+            for (tid,) in rows:
+                self.update(tid, tags=_merged_tags(self.get(tid).tags, sources, target))
+        return len(rows)
+
+    def rename_tag(self, old: str, new: str) -> int:
+        """Renomeia uma tag em todas as tarefas."""
+        return self.merge_tags([old], new)
+
+# Repositório de estatísticas em SQLite
+class SqliteStatsRepo(StatsRepo):
+    """
+    Estatísticas diárias na tabela daily_stats. As séries em memória (e seus agregados) são carregadas
+    uma vez e cada incremento é gravado com um UPSERT de uma linha.
+    """
+    def __init__(self, path: str = DB_PATH):
+        self.conn = connect(path)
+        self.data = {}
+        self.done, self.focus = DailySeries(), DailySeries()
+        for r in self.conn.execute("SELECT day, done, focus FROM daily_stats ORDER BY day"):
+            if r["done"]: self.done.add(r["day"], r["done"])
+            if r["focus"]: self.focus.add(r["day"], r["focus"])
+
+    def _save(self):
+        """Nada a fazer: cada incremento já é gravado em _persist."""
+
+    def _persist(self, kind: str, day: str, n: int):
+        with self.conn:
+            self.conn.execute(
+                f"INSERT INTO daily_stats(day, {kind}) VALUES (?, ?) "
+                f"ON CONFLICT(day) DO UPDATE SET {kind} = {kind} + excluded.{kind}",
+                (day, n))
+
+# Repositório de perfil em SQLite
+class SqliteProfileRepo(ProfileRepo):
+    """
+    Perfil como pares chave/valor (valor em JSON). Mantém `data` em memória, como o ProfileRepo,
+    e no _save grava apenas as chaves que mudaram.
+    """
+    def __init__(self, path: str = DB_PATH):
+        self.conn = connect(path)
+        rows = self.conn.execute("SELECT key, value FROM profile").fetchall()
+        self._persisted = {r["key"]: r["value"] for r in rows}  # Último valor gravado por chave
+        data = {k: json.loads(v) for k, v in self._persisted.items()} or Profile().__dict__
+        self.data = profile_defaults(data)
+        self._save()
+
+    def _save(self, *keys):
+        """Grava no banco somente as chaves alteradas desde o último _save."""
+        enc = {k: json.dumps(v, ensure_ascii=False) for k, v in self.data.items()}
+        changed = [(k, v) for k, v in enc.items() if self._persisted.get(k) != v]
+        removed = [k for k in self._persisted if k not in enc]
+        if not changed and not removed:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO profile(key, value) VALUES (?, ?)", changed)
+            self.conn.executemany("DELETE FROM profile WHERE key=?", [(k,) for k in removed])
+        self._persisted = enc
+        emit("profile", keys=keys)
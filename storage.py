@@ -1,14 +1,32 @@
 # storage.py
 # Importa módulos necessários para manipulação de arquivos, JSON e tipos
-import json, os
-from typing import List, Dict
+import json, os, bisect
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Set, Tuple
 from models import Task, Profile  # Modelos de dados para tarefas e perfil
-from utils import DATA_DIR, ensure_data_dirs, today_str  # Utilitários para diretórios e datas
+from utils import DATA_DIR, ensure_data_dirs, today_str, TASKS_JOURNAL, STORAGE_BACKEND  # Utilitários para diretórios, datas e configuração
+from persistence import ENGINE  # Motor de escrita adiada (write-behind)
+from journal import Journal  # Journal de operações append-only
+from events import emit  # Feed de mudanças para as abas
+from timeseries import DailySeries  # Série diária com agregados semana/mês/ano
+from cooccur import CooccurrenceIndex, text_sig  # Coocorrência de tags (tags relacionadas)
 
 # Caminhos para os arquivos de dados
 PROFILE_PATH = os.path.join(DATA_DIR, "profile.json")
 TASKS_PATH   = os.path.join(DATA_DIR, "tasks.json")
 STATS_PATH   = os.path.join(DATA_DIR, "stats.json")
+TASKS_JOURNAL_PATH = os.path.join(DATA_DIR, "tasks.journal")
+COOCCUR_PATH = os.path.join(DATA_DIR, "cooccur.json")
+
+def profile_defaults(data: Dict) -> Dict:
+    """Garante que chaves novas sejam adicionadas a perfis antigos (compartilhado pelos backends)."""
+    data.setdefault("badges", [])
+    data.setdefault("learning", "Java, Redes, POO")
+    data.setdefault("coin_multiplier", 1.0)
+    data.setdefault("sound_pack", False)
+    data.setdefault("themes", ["princess"])
+    data.setdefault("unlocked_games", ["snake"])
+    return data
 
 # Classe para gerenciar o repositório de perfil
 class ProfileRepo:
@@ -16,27 +34,27 @@ class ProfileRepo:
         ensure_data_dirs()  # Garante que os diretórios necessários existam
         if not os.path.exists(PROFILE_PATH):
             # Cria um perfil padrão se o arquivo não existir
-            self.data = Profile().__dict__
-            self.data.setdefault("badges", [])
-            self.data.setdefault("learning", "Java, Redes, POO")
+            self.data = profile_defaults(Profile().__dict__)
             self._save()
         else:
             # Carrega os dados do perfil
             with open(PROFILE_PATH, "r", encoding="utf-8") as f:
-                self.data = json.load(f)
-            # Garante que chaves novas sejam adicionadas a perfis antigos
-            self.data.setdefault("badges", [])
-            self.data.setdefault("learning", "Java, Redes, POO")
-            self.data.setdefault("coin_multiplier", 1.0)
-            self.data.setdefault("sound_pack", False)
-            self.data.setdefault("themes", ["princess"])
-            self.data.setdefault("unlocked_games", ["snake"])
+                raw = f.read()
+            self.data = profile_defaults(json.loads(raw))
+            ENGINE.seen(PROFILE_PATH, raw)  # Evita regravar o arquivo se nada mudar
             self._save()
 
-    def _save(self):
-        """Salva os dados do perfil no arquivo JSON."""
-        with open(PROFILE_PATH, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+    def _dump(self) -> str:
+        """Serializa o perfil para o formato do arquivo JSON."""
+        return json.dumps(self.data, ensure_ascii=False, indent=2)
+
+    def _save(self, *keys):
+        """
+        Marca o perfil como alterado; a gravação é feita pelo motor de persistência.
+        `keys` indica quais chaves mudaram (vazio = qualquer uma) e é repassado às abas inscritas em "profile".
+        """
+        ENGINE.mark_dirty(PROFILE_PATH, self._dump)
+        emit("profile", keys=keys)
 
     def add_rewards(self, coins=0, xp=0):
         """Adiciona recompensas de moedas e XP ao perfil."""
@@ -46,77 +64,277 @@ class ProfileRepo:
         while self.data["xp"] >= 100:
             self.data["xp"] -= 100
             self.data["level"] = self.data.get("level", 1) + 1
-        self._save()
+        self._save("coins", "xp", "level")
 
     def spend(self, amount) -> bool:
         """Deduz uma quantidade de moedas do perfil, se possível."""
         if self.data.get("coins", 0) >= amount:
             self.data["coins"] -= amount
-            self._save(); return True
+            self._save("coins"); return True
         return False
 
     def unlock_game(self, key: str):
         """Desbloqueia um jogo no perfil."""
         ug = self.data.setdefault("unlocked_games", [])
         if key not in ug:
-            ug.append(key); self._save()
+            ug.append(key); self._save("unlocked_games")
 
     def add_theme(self, key: str):
         """Adiciona um tema ao perfil."""
         th = self.data.setdefault("themes", [])
         if key not in th:
-            th.append(key); self._save()
+            th.append(key); self._save("themes")
 
 # Classe para gerenciar o repositório de tarefas
 class TaskRepo:
-    def __init__(self):
+    """
+    Repositório de tarefas. Em modo journal (padrão, ver utils.TASKS_JOURNAL), cada add/update/remove
+    acrescenta uma linha em tasks.journal e o tasks.json só é reescrito na compactação.
+
+    Índices em memória, atualizados incrementalmente a cada mutação:
+    - _by_id: id -> Task (ordem de inserção)
+    - _by_tag: tag -> ids (fonte das contagens de tags; os eventos "tasks" trazem as tags cuja contagem mudou)
+    - _sched: lista ordenada de (data agendada, id) para consultas por intervalo (bisect)
+    - _done / _open: ids concluídos / em aberto
+    - cooc: coocorrência de tags, salva com o snapshot (cooccur.json) para não ser recalculada ao abrir
+    """
+    def __init__(self, journal: Optional[bool] = None):
         ensure_data_dirs()  # Garante que os diretórios necessários existam
         if not os.path.exists(TASKS_PATH):
             # Cria um arquivo vazio de tarefas se não existir
             with open(TASKS_PATH, "w", encoding="utf-8") as f: json.dump([], f)
+        use_journal = TASKS_JOURNAL if journal is None else journal
+        self.journal: Optional[Journal] = Journal(TASKS_JOURNAL_PATH) if use_journal else None
+        self._hold = 0  # Profundidade de batch() aninhados
+        self._held: List[Dict] = []  # Operações do lote ainda não gravadas no journal
+        self._tag_delta: Dict[str, int] = {}  # Variação das contagens de tags desde o último evento
         self._load()
-        self._next_id = max([t.id for t in self.tasks], default=0) + 1
+        self._tag_delta.clear()
+        self._next_id = max(self._by_id, default=0) + 1
 
     def _load(self):
-        """Carrega as tarefas do arquivo JSON."""
+        """Carrega as tarefas do snapshot JSON e reaplica as operações do journal."""
         with open(TASKS_PATH, "r", encoding="utf-8") as f:
-            arr = json.load(f)
-            self.tasks: List[Task] = [Task.from_dict(x) for x in arr]
+            raw = f.read()
+        self._by_id: Dict[int, Task] = {}
+        self._by_tag: Dict[str, Set[int]] = {}
+        self._sched: List[Tuple[str, int]] = []
+        self._done: Set[int] = set()
+        self._open: Set[int] = set()
+        self.cooc = None  # Desligada durante a leitura do snapshot
+        for x in json.loads(raw):
+            self._put(Task.from_dict(x))
+        ENGINE.seen(TASKS_PATH, raw)
+        self.cooc = CooccurrenceIndex.load(COOCCUR_PATH, text_sig(raw))
+        if self.cooc is None:  # Sem matriz salva para este snapshot: monta uma vez
+            self.cooc = CooccurrenceIndex()
+            for t in self._by_id.values(): self.cooc.update((), t.tags)
+            text = self.cooc.dump(text_sig(raw))  # Retrato do snapshot (antes do journal)
+            ENGINE.mark_dirty(COOCCUR_PATH, lambda: text)
+        if self.journal is not None:
+            for op in self.journal.replay():
+                self._apply(op)
+            if self.journal.needs_compaction():
+                self._save()
+
+    @property
+    def tasks(self) -> List[Task]:
+        """Lista das tarefas (cópia; use add/update/remove para alterar)."""
+        return list(self._by_id.values())
+
+    # ---------- índices ----------
+    def _index(self, t: Task):
+        for tag in set(t.tags or []):
+            self._by_tag.setdefault(tag, set()).add(t.id)
+            self._tag_delta[tag] = self._tag_delta.get(tag, 0) + 1
+        if t.scheduled:
+            bisect.insort(self._sched, (t.scheduled, t.id))
+        (self._done if t.done else self._open).add(t.id)
+
+    def _unindex(self, t: Task):
+        for tag in set(t.tags or []):
+            ids = self._by_tag.get(tag)
+            if ids is not None:
+                ids.discard(t.id)
+                if not ids: del self._by_tag[tag]
+                self._tag_delta[tag] = self._tag_delta.get(tag, 0) - 1
+        if t.scheduled:
+            i = bisect.bisect_left(self._sched, (t.scheduled, t.id))
+            if i < len(self._sched) and self._sched[i] == (t.scheduled, t.id):
+                del self._sched[i]
+        self._done.discard(t.id); self._open.discard(t.id)
+
+    def _put(self, t: Task):
+        """Insere ou substitui uma tarefa mantendo os índices."""
+        old = self._by_id.get(t.id)
+        if old is not None:
+            self._unindex(old)
+        self._by_id[t.id] = t
+        self._index(t)
+        if self.cooc is not None:
+            self.cooc.update(old.tags if old is not None else (), t.tags)
+
+    def _drop(self, tid: int):
+        """Remove uma tarefa mantendo os índices."""
+        old = self._by_id.pop(tid, None)
+        if old is not None:
+            self._unindex(old)
+            if self.cooc is not None: self.cooc.update(old.tags, ())
+
+    def _apply(self, op: Dict):
+        """Reaplica uma operação do journal (idempotente: 'put' grava a tarefa inteira)."""
+        if op.get("op") == "put":
+            self._put(Task.from_dict(op["task"]))
+        elif op.get("op") == "del":
+            self._drop(op["id"])
+
+    def _log(self, op: Dict):
+        """Registra uma mutação: uma linha no journal (O(1)) ou, sem journal, o arquivo inteiro."""
+        if self.journal is None:
+            self._save()
+        elif self._hold:
+            self._held.append(op)  # Gravado de uma vez ao fim do lote
+        else:
+            self.journal.append(op)
+            if self.journal.needs_compaction():
+                self._save()
+        changed = [tag for tag, d in self._tag_delta.items() if d]
+        self._tag_delta.clear()
+        emit("tasks", op=op["op"], id=op["task"]["id"] if "task" in op else op["id"], tags=changed)
+
+    @contextmanager
+    def batch(self):
+        """Agrupa mutações: as operações vão ao journal em uma única escrita e o snapshot em uma única descarga."""
+        self._hold += 1
+        try:
+            with ENGINE.batch():
+                yield self
+        finally:
+            self._hold -= 1
+            if not self._hold and self._held:
+                ops, self._held = self._held, []
+                self.journal.append_many(ops)
+                if self.journal.needs_compaction():
+                    self._save()
+
+    def _dump(self) -> str:
+        """Serializa as tarefas para o formato do arquivo JSON."""
+        return json.dumps([t.to_dict() for t in self._by_id.values()], ensure_ascii=False, indent=2)
+
+    def _compact(self):
+        """Reescreve o snapshot (e a coocorrência correspondente) e só então esvazia o journal."""
+        text = self._dump()
+        ENGINE.write_text(TASKS_PATH, text)
+        ENGINE.write_text(COOCCUR_PATH, self.cooc.dump(text_sig(text)))
+        if self.journal is not None:
+            self.journal.reset()
 
     def _save(self):
-        """Salva as tarefas no arquivo JSON."""
-        with open(TASKS_PATH, "w", encoding="utf-8") as f:
-            json.dump([t.to_dict() for t in self.tasks], f, ensure_ascii=False, indent=2)
+        """Agenda a gravação do snapshot completo (e a compactação do journal) no motor de persistência."""
+        ENGINE.schedule(TASKS_PATH, self._compact)
 
+    # ---------- consultas ----------
     def list_all(self):
         """Retorna todas as tarefas."""
-        return list(self.tasks)
+        return list(self._by_id.values())
 
     def get(self, tid: int):
-        """Obtém uma tarefa pelo ID."""
-        for t in self.tasks:
-            if t.id == tid: return t
-        raise KeyError(tid)
+        """Obtém uma tarefa pelo ID (O(1))."""
+        return self._by_id[tid]
+
+    def by_tag(self, tag: str) -> List[Task]:
+        """Tarefas que possuem a tag (comparação exata)."""
+        return [self._by_id[i] for i in sorted(self._by_tag.get(tag, ()))]
+
+    def tags(self) -> Dict[str, int]:
+        """Contagem de tarefas por tag."""
+        return {tag: len(ids) for tag, ids in self._by_tag.items()}
+
+    def tag_count(self, tag: str) -> int:
+        """Número de tarefas com a tag (O(1))."""
+        return len(self._by_tag.get(tag, ()))
+
+    def related_tags(self, tags: List[str], k: int = 6) -> List[str]:
+        """Tags que mais aparecem junto de `tags` nas tarefas (sem elas)."""
+        return self.cooc.related(tags, k)
 
+    def due_between(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Task]:
+        """Tarefas agendadas entre `start` e `end` (YYYY-MM-DD, inclusivos), em ordem de data."""
+        lo = 0 if start is None else bisect.bisect_left(self._sched, (start, -1))
+        hi = len(self._sched) if end is None else bisect.bisect_right(self._sched, (end, float("inf")))
+        return [self._by_id[tid] for _, tid in self._sched[lo:hi]]
+
+    def open_tasks(self) -> List[Task]:
+        """Tarefas ainda não concluídas."""
+        return [self._by_id[i] for i in sorted(self._open)]
+
+    def done_tasks(self) -> List[Task]:
+        """Tarefas concluídas."""
+        return [self._by_id[i] for i in sorted(self._done)]
+
+    # ---------- mutações ----------
     def add(self, title, priority=2, tags=None, scheduled=None):
         """Adiciona uma nova tarefa."""
         t = Task(id=self._next_id, title=title, priority=priority, tags=tags or [], scheduled=scheduled)
         self._next_id += 1
-        self.tasks.append(t); self._save(); return t
+        self._put(t)
+        self._log({"op": "put", "task": t.to_dict()}); return t
+
+    def restore(self, data: Dict):
+        """Recoloca uma tarefa removida (usado pelo Undo), preservando o ID original."""
+        t = Task.from_dict(data)
+        self._put(t)
+        self._next_id = max(self._next_id, t.id + 1)
+        self._log({"op": "put", "task": t.to_dict()}); return t
 
     def update(self, tid: int, **fields):
         """Atualiza os campos de uma tarefa existente."""
         t = self.get(tid)
+        old_tags = t.tags
+        self._unindex(t)
         for k, v in fields.items(): setattr(t, k, v)
-        self._save(); return t
+        self._index(t)
+        self.cooc.update(old_tags, t.tags)
+        self._log({"op": "put", "task": t.to_dict()}); return t
 
     def remove(self, tid: int):
         """Remove uma tarefa pelo ID."""
-        self.tasks = [t for t in self.tasks if t.id != tid]
-        self._save()
+        self._drop(tid)
+        self._log({"op": "del", "id": tid})
+
+    def merge_tags(self, sources: List[str], target: str) -> int:
+        """
+        Troca as tags `sources` por `target` em todas as tarefas que as usam (renomear = uma única origem).
+        Só as tarefas do índice são visitadas, em um único lote (uma escrita). Retorna quantas mudaram.
+        """
+        target = target.strip()
+        sources = {s for s in sources if s and s != target}
+        if not target or not sources: return 0
+        ids = set().union(*(self._by_tag.get(s, ()) for s in sources))
+        with self.batch():
+            for tid in sorted(ids):
+                self.update(tid, tags=_merged_tags(self._by_id[tid].tags, sources, target))
+        return len(ids)
+
+    def rename_tag(self, old: str, new: str) -> int:
+        """Renomeia uma tag em todas as tarefas."""
+        return self.merge_tags([old], new)
+
+def _merged_tags(tags: List[str], sources: Set[str], target: str) -> List[str]:
+    """Tags com as de `sources` trocadas por `target` (na posição da primeira), sem repetições."""
+    out: List[str] = []
+    for tag in tags:
+        tag = target if tag in sources else tag
+        if tag not in out: out.append(tag)
+    return out
 
 # Classe para gerenciar estatísticas
 class StatsRepo:
+    """
+    Estatísticas diárias (tarefas concluídas e minutos de foco) em séries temporais (timeseries.DailySeries),
+    com agregados por semana/mês/ano mantidos a cada incremento. No arquivo JSON continuam os dicionários
+    esparsos "done_per_day" e "focus_minutes".
+    """
     def __init__(self):
         ensure_data_dirs()  # Garante que os diretórios necessários existam
         if not os.path.exists(STATS_PATH):
@@ -124,34 +342,77 @@ class StatsRepo:
             with open(STATS_PATH, "w", encoding="utf-8") as f:
                 json.dump({"done_per_day": {}, "focus_minutes": {}}, f)
         with open(STATS_PATH, "r", encoding="utf-8") as f:
-            self.data: Dict = json.load(f)
+            raw = f.read()
+        self.data: Dict = json.loads(raw)
+        ENGINE.seen(STATS_PATH, raw)
+        self.done = DailySeries.from_dict(self.data.get("done_per_day", {}))  # Tarefas concluídas por dia
+        self.focus = DailySeries.from_dict(self.data.get("focus_minutes", {}))  # Minutos de foco por dia
+
+    def _dump(self) -> str:
+        """Serializa as estatísticas para o formato do arquivo JSON."""
+        self.data["done_per_day"] = self.done.to_dict()
+        self.data["focus_minutes"] = self.focus.to_dict()
+        return json.dumps(self.data, ensure_ascii=False, indent=2)
 
     def _save(self):
-        """Salva os dados de estatísticas no arquivo JSON."""
-        with open(STATS_PATH, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        """Marca as estatísticas como alteradas; a gravação é feita pelo motor de persistência."""
+        ENGINE.mark_dirty(STATS_PATH, self._dump)
+
+    def _persist(self, kind: str, day: str, n: int):
+        """Grava um incremento (no JSON, o arquivo inteiro via motor de persistência)."""
+        self._save()
+
+    def _record(self, kind: str, n: int):
+        d = today_str()
+        (self.done if kind == "done" else self.focus).add(d, n)
+        self._persist(kind, d, n)
+        emit("stats", day=d, kind=kind)
 
     def inc_done_today(self, n=1):
         """Incrementa o número de tarefas concluídas hoje."""
-        d = today_str()
-        self.data.setdefault("done_per_day", {})
-        self.data["done_per_day"][d] = self.data["done_per_day"].get(d, 0) + n
-        self._save()
+        self._record("done", n)
 
     def add_focus_minutes(self, minutes):
         """Adiciona minutos de foco ao dia atual."""
-        d = today_str()
-        self.data.setdefault("focus_minutes", {})
-        self.data["focus_minutes"][d] = self.data["focus_minutes"].get(d, 0) + minutes
-        self._save()
+        self._record("focus", minutes)
+
+    def range(self, start, end, granularity: str = "day"):
+        """
+        Consulta por intervalo (datas inclusivas) agrupada por "day", "week", "month" ou "year".
+        Retorna (rótulos, concluídas, minutos de foco).
+        """
+        done = self.done.range(start, end, granularity)
+        focus = self.focus.range(start, end, granularity)
+        return [k for k, _ in done], [v for _, v in done], [v for _, v in focus]
 
     def last7(self):
         """Retorna os dados dos últimos 7 dias (tarefas concluídas e minutos de foco)."""
         import datetime as dt
-        days = [(dt.date.today()-dt.timedelta(days=i)).isoformat() for i in range(6, -1, -1)]
-        done = [self.data.get("done_per_day", {}).get(d, 0) for d in days]
-        focus = [self.data.get("focus_minutes", {}).get(d, 0) for d in days]
-        return days, done, focus
+        today = dt.date.today()
+        return self.range(today - dt.timedelta(days=6), today)
+
+# ---------- seleção de backend ----------
+# utils.STORAGE_BACKEND escolhe entre os arquivos JSON (padrão) e o banco SQLite (sqlite_storage.py).
+def open_profile_repo():
+    """Cria o repositório de perfil do backend configurado."""
+    if STORAGE_BACKEND == "sqlite":
+        from sqlite_storage import SqliteProfileRepo
+        return SqliteProfileRepo()
+    return ProfileRepo()
+
+def open_task_repo():
+    """Cria o repositório de tarefas do backend configurado."""
+    if STORAGE_BACKEND == "sqlite":
+        from sqlite_storage import SqliteTaskRepo
+        return SqliteTaskRepo()
+    return TaskRepo()
+
+def open_stats_repo():
+    """Cria o repositório de estatísticas do backend configurado."""
+    if STORAGE_BACKEND == "sqlite":
+        from sqlite_storage import SqliteStatsRepo
+        return SqliteStatsRepo()
+    return StatsRepo()
 
 # DeckRepo permanece igual em seu arquivo original (se você já tiver).
 # Se ele estiver neste mesmo arquivo no seu projeto, mantenha a versão que cria/exibe decks.
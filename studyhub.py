@@ -6,7 +6,8 @@ from tkinter import ttk
 # Importa módulos e classes auxiliares do projeto
 from theme import Theme  # Gerencia temas visuais do aplicativo
 from utils import ensure_data_dirs, init_default_files  # Funções utilitárias para inicializar diretórios e arquivos padrão
-from storage import ProfileRepo, TaskRepo  # Repositórios para persistência de dados de perfil e tarefas
+import registry  # Instâncias únicas dos repositórios (backend configurado)
+from persistence import ENGINE  # Motor de escrita adiada compartilhado pelos repositórios
 from tasks_tab import TasksTab  # Aba de tarefas e hábitos
 from pomodoro_tab import PomodoroTab  # Aba de Pomodoro
 from flashcards_tab import FlashcardsTab  # Aba de flashcards
@@ -22,6 +23,7 @@ class App(tk.Tk):
         self.title("StudyHub — Produtividade + Estudos + Games")  # Define o título da janela principal
         self.geometry("1200x780")  # Define o tamanho inicial da janela
         Theme.apply(self, "princess")  # Aplica o tema inicial "princess"
+        ENGINE.attach(self)  # Agrupa as gravações em disco e descarrega ao fechar a janela
 
         # Header decorativo com título, subtítulo e seletor de tema
         header = Theme.header(self, title="StudyHub", subtitle="produtividade • estudos • games")
@@ -37,8 +39,8 @@ class App(tk.Tk):
                    command=lambda: self._switch_theme("neon")).pack(side=tk.LEFT, padx=2)
 
         # Inicializa os repositórios de dados para persistência
-        self.profile = ProfileRepo()  # Repositório para dados de perfil
-        self.tasks = TaskRepo()  # Repositório para dados de tarefas
+        self.profile = registry.profile_repo()  # Repositório para dados de perfil
+        self.tasks = registry.task_repo()  # Repositório para dados de tarefas
 
         # Cria um widget Notebook para gerenciar abas
         self.nb = ttk.Notebook(self)
@@ -0,0 +1,95 @@
+# tag_trie.py
+# Este arquivo implementa a árvore de prefixos (trie) usada nas sugestões de tags.
+# As chaves são normalizadas (minúsculas e sem acentos: "Programação" -> "programacao") e cada nó
+# guarda em cache as `k` tags mais frequentes da sua subárvore, então sugerir custa
+# O(tamanho do prefixo + k) em vez de ordenar todas as tags a cada tecla.
+
+from typing import Dict, List, Optional, Tuple
+from utils import normalize_text
+
+TOP_K = 16  # Tags em cache por nó (limites maiores caem na varredura da subárvore)
+
+Entry = Tuple[int, str]  # (-contagem, tag): ordena por frequência e depois alfabeticamente
+
+class _Node:
+    __slots__ = ("children", "tags", "top")
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.tags: Dict[str, int] = {}  # Tags cuja chave normalizada termina aqui -> contagem
+        self.top: List[Entry] = []  # Melhores `k` da subárvore, ordenadas
+
+class TagTrie:
+    """
+    Contagens de tags com sugestões por prefixo.
+    - set(tag, count): define a contagem (0 remove); atualiza só o caminho da tag.
+    - suggest(prefix, limit): tags cuja forma normalizada começa com o prefixo, mais usadas primeiro.
+    """
+    def __init__(self, counts: Optional[Dict[str, int]] = None, k: int = TOP_K):
+        self.k = k
+        self.root = _Node()
+        for tag, n in (counts or {}).items():
+            self.set(tag, n)
+
+    def _path(self, key: str, create: bool) -> List[_Node]:
+        node, path = self.root, [self.root]
+        for ch in key:
+            nxt = node.children.get(ch)
+            if nxt is None:
+                if not create: return []
+                nxt = node.children[ch] = _Node()
+            node = nxt
+            path.append(node)
+        return path
+
+    def set(self, tag: str, count: int):
+        key = normalize_text(tag)
+        path = self._path(key, create=count > 0)
+        if not path: return
+        leaf = path[-1]
+        old = leaf.tags.get(tag, 0)
+        if count == old: return
+        if count > 0: leaf.tags[tag] = count
+        else: leaf.tags.pop(tag, None)
+        if count > old:
+            self._raise(path, tag, count)
+        else:
+            self._lower(path, key)
+
+    def _raise(self, path: List[_Node], tag: str, count: int):
+        """Contagem subiu: a tag só pode entrar (ou subir) no top de cada nó do caminho."""
+        entry = (-count, tag)
+        for node in path:
+            top = node.top
+            for i, (_, t) in enumerate(top):
+                if t == tag:
+                    del top[i]; break
+            if len(top) < self.k or entry < top[-1]:
+                top.append(entry); top.sort()
+                del top[self.k:]
+
+    def _lower(self, path: List[_Node], key: str):
+        """Contagem caiu: recalcula o top de baixo para cima juntando o dos filhos (já exatos)."""
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            cands = [(-n, t) for t, n in node.tags.items()]
+            for child in node.children.values():
+                cands.extend(child.top)
+            cands.sort()
+            node.top = cands[:self.k]
+            if depth and not node.top:  # Ramo vazio: remove o nó
+                del path[depth - 1].children[key[depth - 1]]
+
+    def suggest(self, prefix: str = "", limit: int = 8) -> List[str]:
+        path = self._path(normalize_text((prefix or "").strip()), create=False)
+        if not path: return []
+        node = path[-1]
+        if limit <= self.k:
+            return [t for _, t in node.top[:limit]]
+        out: List[Entry] = []  # Limite acima do cache: varre a subárvore
+        stack = [node]
+        while stack:
+            n = stack.pop()
+            out.extend((-c, t) for t, c in n.tags.items())
+            stack.extend(n.children.values())
+        out.sort()
+        return [t for _, t in out[:limit]]
@@ -3,66 +3,74 @@
 import os, json
 from typing import List, Dict
 from utils import DATA_DIR, ensure_data_dirs  # Utilitários para gerenciar diretórios e dados
+from tag_trie import TagTrie  # Sugestões por prefixo com top-k em cache
+from persistence import ENGINE  # Motor de escrita adiada (uma escrita por lote)
+from events import on_change  # Feed de mudanças das tarefas
 
 # Caminho para o arquivo que armazena as tags globais
 TAGS_PATH = os.path.join(DATA_DIR, "tags.json")
 
 class TagsRepo:
     """
-    Repositório para gerenciar tags globais armazenadas em data/tags.json.
-    Estrutura do arquivo JSON:
+    Contagem de uso das tags, derivada do índice tag -> tarefas do repositório de tarefas.
+    As contagens são exatas (número de tarefas com a tag) e acompanham os eventos "tasks";
+    data/tags.json é só um retrato delas para outras ferramentas:
     {
         "tags": {
-            "java": 3,  # Tag 'java' foi usada 3 vezes
-            "redes": 1  # Tag 'redes' foi usada 1 vez
+            "java": 3,  # 3 tarefas com a tag 'java'
+            "redes": 1  # 1 tarefa com a tag 'redes'
         }
     }
     """
-    def __init__(self):
+    def __init__(self, task_repo=None):
         ensure_data_dirs()  # Garante que os diretórios necessários existam
-        if not os.path.exists(TAGS_PATH):
-            # Cria o arquivo tags.json vazio, se não existir
-            with open(TAGS_PATH, "w", encoding="utf-8") as f:
-                json.dump({"tags": {}}, f)
-        # Carrega os dados do arquivo JSON
-        with open(TAGS_PATH, "r", encoding="utf-8") as f:
-            self.data: Dict[str, Dict[str, int]] = json.load(f)
-        # Garante que a chave "tags" exista no dicionário
-        self.data.setdefault("tags", {})
+        if task_repo is None:
+            from registry import task_repo as shared
+            task_repo = shared()
+        self.tasks = task_repo  # Fonte das contagens
+        self.data: Dict[str, Dict[str, int]] = {"tags": dict(task_repo.tags())}
+        self.trie = TagTrie(self.data["tags"])  # Índice de prefixos (sem acentos/maiúsculas)
+        self._unsub = on_change("tasks", self._on_task)
+        self.save()
+
+    def close(self):
+        """Cancela a inscrição nos eventos de tarefas."""
+        self._unsub()
+
+    def _dump(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, indent=2)
 
     def save(self):
-        """Salva os dados de tags no arquivo JSON."""
-        with open(TAGS_PATH, "w", encoding="utf-8") as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        """Agenda a gravação do retrato das contagens (coalescida com as demais escritas do lote)."""
+        ENGINE.mark_dirty(TAGS_PATH, self._dump)
 
-    def add_many(self, tags: List[str]):
-        """Adiciona múltiplas tags ao repositório, incrementando sua contagem."""
+    def _on_task(self, tags=(), **_):
+        """Atualiza só as tags cuja contagem mudou na operação."""
+        if not tags: return
+        counts = self.data["tags"]
         for t in tags:
-            t = t.strip()  # Remove espaços extras
-            if not t: continue  # Ignora tags vazias
-            # Incrementa a contagem da tag ou inicializa com 1
-            self.data["tags"][t] = self.data["tags"].get(t, 0) + 1
-        self.save()  # Salva as alterações
+            n = self.tasks.tag_count(t)
+            if n: counts[t] = n
+            else: counts.pop(t, None)
+            self.trie.set(t, n)
+        self.save()
 
-    def remove_many(self, tags: List[str]):
-        """Remove múltiplas tags do repositório, decrementando sua contagem."""
-        for t in tags:
-            if t in self.data["tags"]:
-                # Decrementa a contagem da tag, mas não permite valores negativos
-                self.data["tags"][t] = max(0, self.data["tags"][t]-1)
-                # Remove a tag se sua contagem chegar a 0
-                if self.data["tags"][t] == 0:
-                    del self.data["tags"][t]
-        self.save()  # Salva as alterações
+    def count(self, tag: str) -> int:
+        """Número de tarefas com a tag."""
+        return self.data["tags"].get(tag, 0)
+
+    def rename(self, old: str, new: str) -> int:
+        """Renomeia a tag em todas as tarefas (uma passada, uma gravação). Retorna quantas tarefas mudaram."""
+        return self.tasks.rename_tag(old, new)
+
+    def merge(self, sources: List[str], target: str) -> int:
+        """Junta várias tags em `target` em todas as tarefas. Retorna quantas tarefas mudaram."""
+        return self.tasks.merge_tags(sources, target)
+
+    def related(self, tags: List[str], k: int = 6) -> List[str]:
+        """Tags que costumam aparecer junto de `tags` (coocorrência mantida pelo repositório de tarefas)."""
+        return self.tasks.related_tags(tags, k)
 
     def suggestions(self, prefix: str = "", limit: int = 8) -> List[str]:
-        """Sugere tags com base em um prefixo e ordena por frequência e ordem alfabética."""
-        prefix = (prefix or "").strip().lower()  # Normaliza o prefixo
-        items = list(self.data["tags"].items())  # Obtém as tags e suas contagens
-        # Ordena por frequência (descendente) e depois por ordem alfabética
-        items.sort(key=lambda kv: (-kv[1], kv[0]))
-        if not prefix:
-            # Retorna as tags mais frequentes, limitado ao número especificado
-            return [k for k, _ in items[:limit]]
-        # Filtra as tags que começam com o prefixo e aplica o limite
-        return [k for k, _ in items if k.lower().startswith(prefix)][:limit]
+        """Sugere tags que começam com o prefixo (ignorando acentos e maiúsculas), por frequência e ordem alfabética."""
+        return self.trie.suggest(prefix, limit)
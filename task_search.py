@@ -0,0 +1,117 @@
+# task_search.py
+# Este arquivo implementa a busca incremental de tarefas usada pela aba de tarefas.
+# Mantém um índice palavra -> tarefas e trigramas do vocabulário (trigrama -> palavras) sobre títulos e tags,
+# atualizado pelos eventos "tasks". Quando a consulta só cresce (ex.: "rel" -> "rela"), o resultado
+# anterior é apenas filtrado em vez de consultar o índice de novo.
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from events import on_change
+from utils import WORD_RE, trigrams  # Mesmas palavras/trigramas da busca de cartões
+
+Fields = Tuple[str, str, Tuple[str, ...]]  # (título, prioridade, tags) em minúsculas
+
+class TaskSearch:
+    """
+    Busca de tarefas por trecho de texto (mesma regra da aba: título, prioridade ou alguma tag contém a consulta).
+    - search(q): ids das tarefas que casam (None quando a consulta é vazia = todas).
+    """
+    def __init__(self, repo):
+        self.repo = repo  # Repositório de tarefas
+        self._fields: Dict[int, Fields] = {}  # id -> campos normalizados
+        self._words: Dict[str, Set[int]] = {}  # palavra -> ids
+        self._tri: Dict[str, Set[str]] = {}  # trigrama -> palavras
+        self._last: Optional[Tuple[str, Set[int]]] = None  # Última consulta e resultado (para estreitar)
+        for t in repo.list_all():
+            self._add(t)
+        self._unsub = on_change("tasks", self._on_task)
+
+    def close(self):
+        """Cancela a inscrição nos eventos de tarefas."""
+        self._unsub()
+
+    # ---------- índice ----------
+    @staticmethod
+    def _fields_of(t) -> Fields:
+        return ((t.title or "").lower(), str(getattr(t, "priority", "")), tuple((g or "").lower() for g in (t.tags or [])))
+
+    @staticmethod
+    def _words_of(f: Fields) -> Set[str]:
+        ws = set(WORD_RE.findall(f[0]))
+        ws.add(f[1])
+        for g in f[2]: ws.update(WORD_RE.findall(g))
+        return ws
+
+    def _add(self, t):
+        f = self._fields[t.id] = self._fields_of(t)
+        for w in self._words_of(f):
+            ids = self._words.get(w)
+            if ids is None:
+                ids = self._words[w] = set()
+                for g in trigrams(w): self._tri.setdefault(g, set()).add(w)
+            ids.add(t.id)
+
+    def _remove(self, tid: int):
+        f = self._fields.pop(tid, None)
+        if f is None: return
+        for w in self._words_of(f):
+            ids = self._words.get(w)
+            if ids is None: continue
+            ids.discard(tid)
+            if not ids:
+                del self._words[w]
+                for g in trigrams(w):
+                    s = self._tri.get(g)
+                    if s is not None:
+                        s.discard(w)
+                        if not s: del self._tri[g]
+
+    def _on_task(self, op: str, id: int, **_):
+        self._remove(id)
+        t = self.repo.get(id) if op != "del" else None
+        if t is not None:
+            self._add(t)
+        self._last = None  # Resultado anterior pode ter ficado desatualizado
+
+    # ---------- busca ----------
+    def _vocab_matching(self, term: str) -> Iterable[str]:
+        """Palavras do vocabulário que contêm `term` (trigramas quando possível; senão, varre o vocabulário)."""
+        if len(term) < 3:
+            return [w for w in self._words if term in w]
+        grams = sorted((self._tri.get(g, set()) for g in trigrams(term)), key=len)
+        if not grams[0]: return []
+        return [w for w in grams[0].intersection(*grams[1:]) if term in w]
+
+    def _candidates(self, q: str) -> Set[int]:
+        """Tarefas com todas as palavras da consulta (superconjunto do resultado final)."""
+        terms = sorted(set(WORD_RE.findall(q)), key=len, reverse=True)  # Termos longos filtram mais
+        if not terms:
+            return set(self._fields)  # Só pontuação: verificação direta
+        out: Optional[Set[int]] = None
+        for term in terms:
+            ids: Set[int] = set()
+            for w in self._vocab_matching(term):
+                ids |= self._words[w]
+            out = ids if out is None else out & ids
+            if not out: break
+        return out or set()
+
+    def _match(self, tid: int, q: str) -> bool:
+        title, pri, tags = self._fields[tid]
+        return q in title or q in pri or any(q in g for g in tags)
+
+    def search(self, q: str) -> Optional[Set[int]]:
+        """Ids das tarefas que contêm `q` (já em minúsculas/sem espaços nas pontas); None se `q` é vazia."""
+        if not q:
+            self._last = None
+            return None
+        if self._last is not None and self._last[0] in q:
+            cands: Iterable[int] = self._last[1]  # Consulta estendida: o resultado só pode encolher
+        else:
+            cands = self._candidates(q)
+        result = {tid for tid in cands if tid in self._fields and self._match(tid, q)}
+        self._last = (q, result)
+        return result
+
+    def ids(self) -> List[int]:
+        """Todos os ids indexados."""
+        return list(self._fields)
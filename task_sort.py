@@ -0,0 +1,95 @@
+# task_sort.py
+# Este arquivo implementa a ordenação de tarefas por várias colunas com chaves em cache.
+# A chave de cada tarefa é calculada uma vez e só recalculada quando a tarefa muda (eventos "tasks");
+# a lista ordenada é mantida com bisect (inserção/remoção O(log n) para localizar), então a busca
+# e os redesenhos não reordenam tudo de novo.
+
+import bisect
+from functools import total_ordering
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from events import on_change
+
+# Chave de cada coluna (valores ausentes vão para o fim em ordem crescente)
+COLUMN_KEYS: Dict[str, Callable] = {
+    "id": lambda t: t.id,
+    "title": lambda t: (t.title or "").lower(),
+    "priority": lambda t: getattr(t, "priority", 3) or 3,
+    "tags": lambda t: " ".join(t.tags or []).lower(),
+    "scheduled": lambda t: t.scheduled or "9999-99-99",
+    "done": lambda t: bool(t.done),
+}
+DEFAULT_SORT: List[Tuple[str, bool]] = [("done", False), ("priority", False), ("scheduled", False)]
+
+@total_ordering
+class _Desc:
+    """Inverte a comparação de um valor (coluna em ordem decrescente misturada com crescentes)."""
+    __slots__ = ("v",)
+    def __init__(self, v): self.v = v
+    def __eq__(self, other): return self.v == other.v
+    def __lt__(self, other): return other.v < self.v
+
+class SortedTasks:
+    """
+    Ordem das tarefas segundo `spec` = [(coluna, decrescente), ...]; o id desempata sempre.
+    - set_spec(spec): troca a ordenação (única operação que reordena tudo).
+    - ordered(ids=None): ids na ordem atual, opcionalmente só os do conjunto `ids`.
+    """
+    def __init__(self, repo, spec: Optional[List[Tuple[str, bool]]] = None):
+        self.repo = repo  # Repositório de tarefas
+        self.spec: List[Tuple[str, bool]] = list(spec or DEFAULT_SORT)
+        self._keys: Dict[int, tuple] = {}  # id -> chave em cache
+        self._sorted: List[tuple] = []  # Chaves ordenadas (a última posição é o id)
+        self._rebuild()
+        self._unsub = on_change("tasks", self._on_task)
+
+    def close(self):
+        self._unsub()
+
+    # ---------- chaves ----------
+    def _key(self, t) -> tuple:
+        parts = []
+        for col, desc in self.spec:
+            v = COLUMN_KEYS[col](t)
+            parts.append(_Desc(v) if desc and self._mixed else v)
+        parts.append(t.id)
+        return tuple(parts)
+
+    def _rebuild(self):
+        # Todas as colunas na mesma direção: tupla simples (rápida); a inversão é feita na leitura
+        self._mixed = len({d for _, d in self.spec}) > 1
+        self._reversed = not self._mixed and bool(self.spec) and self.spec[0][1]
+        self._keys = {t.id: self._key(t) for t in self.repo.list_all()}
+        self._sorted = sorted(self._keys.values())
+
+    def set_spec(self, spec: List[Tuple[str, bool]]):
+        """Define as colunas de ordenação (na ordem de prioridade)."""
+        self.spec = [(c, d) for c, d in spec if c in COLUMN_KEYS] or list(DEFAULT_SORT)
+        self._rebuild()
+
+    # ---------- manutenção incremental ----------
+    def _remove(self, tid: int):
+        k = self._keys.pop(tid, None)
+        if k is None: return
+        i = bisect.bisect_left(self._sorted, k)
+        if i < len(self._sorted) and self._sorted[i][-1] == tid:
+            del self._sorted[i]
+
+    def _on_task(self, op: str, id: int, **_):
+        self._remove(id)
+        t = self.repo.get(id) if op != "del" else None
+        if t is not None:
+            k = self._keys[id] = self._key(t)
+            bisect.insort(self._sorted, k)
+
+    # ---------- leitura ----------
+    def ordered(self, ids: Optional[Set[int]] = None) -> List[int]:
+        """Ids na ordem atual; com `ids`, apenas esses (ordenados pelas chaves em cache)."""
+        if ids is None:
+            out = [k[-1] for k in self._sorted]
+        elif len(ids) * 8 < len(self._sorted):  # Poucos resultados: ordena só eles
+            out = sorted((i for i in ids if i in self._keys), key=self._keys.__getitem__)
+        else:
+            out = [k[-1] for k in self._sorted if k[-1] in ids]
+        if self._reversed:
+            out.reverse()
+        return out
@@ -1,11 +1,18 @@
 # tasks_tab.py
 # Importa módulos necessários para criar a interface gráfica e gerenciar tarefas
 import tkinter as tk
-from tkinter import ttk, filedialog
+from tkinter import ttk, filedialog, simpledialog
 from command import CommandManager, AddTask, EditTask, DeleteTask, ToggleDone  # Gerencia comandos de tarefas
-from storage import StatsRepo  # Repositório para estatísticas
+from registry import stats_repo  # Repositório de estatísticas compartilhado
 from dialogs import TaskDialog  # Diálogo para adicionar/editar tarefas
 from widgets import CoinFloat  # Animação de recompensa visual
+from task_search import TaskSearch  # Índice de busca incremental das tarefas
+from tree_diff import VirtualTree  # Aplica só as diferenças na tabela e virtualiza listas grandes
+from task_sort import SortedTasks, DEFAULT_SORT  # Ordenação por várias colunas com chaves em cache
+from utils import HISTORY_PATH  # Histórico de desfazer salvo
+
+SEARCH_DELAY_MS = 150  # Espera após a última tecla antes de buscar
+VIRTUAL_THRESHOLD = 2000  # Acima disso, só as linhas visíveis existem no Treeview
 
 # Constantes para exibir o estado de conclusão das tarefas
 CHECK_UN = '☐'  # Não concluída
@@ -31,31 +38,45 @@ class TasksTab(ttk.Frame):
         super().__init__(parent)
         self.repo = repo  # Repositório de tarefas
         self.profile = profile_repo  # Repositório de perfil para recompensas visuais
-        self.cm = CommandManager()  # Gerenciador de comandos (Undo/Redo)
-        self.stats = StatsRepo()  # Repositório de estatísticas
+        self.cm = CommandManager(repo, HISTORY_PATH)  # Gerenciador de comandos (Undo/Redo, salvo entre sessões)
+        self.stats = stats_repo()  # Repositório de estatísticas (instância compartilhada entre as abas)
+        # Backend SQLite: busca e ordenação feitas pelo banco (query_ids), sem carregar as tarefas na abertura
+        self.sql = hasattr(repo, "query_ids")
+        self.spec = list(DEFAULT_SORT)  # Ordenação atual: [(coluna, decrescente), ...]
+        self.search = None if self.sql else TaskSearch(repo)  # Índice de busca (atualizado pelos eventos de tarefas)
+        self.sorter = None if self.sql else SortedTasks(repo, self.spec)  # Ordem atual (mantida incrementalmente)
+        self._shift = False  # Shift pressionado no último clique (ordenação por várias colunas)
+        self._search_after = None  # Busca agendada (debounce)
 
         # Barra superior com busca e botões de ação
         top = ttk.Frame(self); top.pack(fill=tk.X, pady=6)
         ttk.Label(top, text="Busca:").pack(side=tk.LEFT, padx=4)
         self.q = tk.StringVar(); e = ttk.Entry(top, textvariable=self.q, width=28); e.pack(side=tk.LEFT)
-        e.bind("<KeyRelease>", lambda ev: self.refresh())  # Atualiza a lista ao digitar
+        e.bind("<KeyRelease>", lambda ev: self._schedule_search())  # Busca após uma pausa na digitação
         ttk.Button(top, text="＋ Nova", style="Accent.TButton", command=self.add).pack(side=tk.LEFT, padx=8)
         ttk.Button(top, text="✎ Editar", command=self.edit).pack(side=tk.LEFT)
         ttk.Button(top, text="🗑", command=self.delete).pack(side=tk.LEFT)
+        ttk.Button(top, text="✔ Concluir", command=self.complete_selected).pack(side=tk.LEFT, padx=(8, 0))
+        ttk.Button(top, text="🏷 Tags", command=self.retag_selected).pack(side=tk.LEFT)
         ttk.Button(top, text="↶ Undo", command=lambda:(self.cm.undo(), self.refresh())).pack(side=tk.RIGHT)
         ttk.Button(top, text="↷ Redo", command=lambda:(self.cm.redo(), self.refresh())).pack(side=tk.RIGHT)
         ttk.Button(top, text="⬇ CSV", command=self.export_csv).pack(side=tk.RIGHT, padx=6)
 
         # Configuração da tabela de tarefas
         cols = ("id","title","priority","tags","scheduled","done")
-        self.tree = ttk.Treeview(self, columns=cols, show="headings", height=18)
+        body = ttk.Frame(self); body.pack(fill=tk.BOTH, expand=True, pady=6)
+        self.tree = ttk.Treeview(body, columns=cols, show="headings", height=18)
         headers = ["#","Tarefa","Pri","Tags","Data","Feita"]
+        self._headers = dict(zip(cols, headers))
         for c,h in zip(cols,headers): self.tree.heading(c, text=h, command=lambda col=c: self.sort_by(col))
         widths = [50, 520, 60, 260, 120, 70]
         for c,w in zip(cols,widths): self.tree.column(c, width=w, anchor=tk.W)
 
-        self.tree.pack(fill=tk.BOTH, expand=True, pady=6)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        vsb = ttk.Scrollbar(body, orient=tk.VERTICAL); vsb.pack(side=tk.RIGHT, fill=tk.Y)
         self.tree.bind("<Button-1>", self.on_click)  # Detecta cliques na tabela
+        # Tabela dirigida pela lista de ids (filtrada e ordenada); acima do limite, rolagem virtual
+        self.table = VirtualTree(self.tree, vsb, lambda tid: self._row(self.repo.get(tid)), threshold=VIRTUAL_THRESHOLD)
 
         # Configuração de cores para prioridades e tarefas concluídas
         self.tree.tag_configure("pri1", background="#FDE7E9", foreground="#7F1D1D")  # Vermelho leve
@@ -63,78 +84,68 @@ class TasksTab(ttk.Frame):
         self.tree.tag_configure("pri3", background="#DCFCE7", foreground="#065F46")  # Verde
         self.tree.tag_configure("done", foreground="#9AA0A6")  # Texto apagado para concluídas
 
-        self.sort_col = "done"  # Coluna padrão para ordenação
-        self.sort_reverse = False
         self.refresh()  # Atualiza a tabela inicial
 
     # ---------- helpers ----------
-    def filter_items(self):
-        """Filtra as tarefas com base no texto de busca."""
-        q = self.q.get().strip().lower()
-        items = self.repo.list_all()
-        if not q: return items
-        def match(t):
-            return (q in t.title.lower()) or any(q in tag.lower() for tag in t.tags) or q in str(t.priority)
-        return [t for t in items if match(t)]
+    def filter_ids(self):
+        """Ids das tarefas que passam na busca (None = todas); '#tag' consulta o índice de tags do repositório."""
+        q = (self.q.get() or "").strip().lower()
+        if q.startswith("#") and len(q) > 1 and hasattr(self.repo, "by_tag"):
+            want = q[1:]
+            return {t.id for tag in self._tags_matching(want) for t in self.repo.by_tag(tag)}
+        return self.search.search(q)
 
-    def refresh(self):
-        """Atualiza a tabela de tarefas com base no repositório e filtros."""
-        # Limpa a tabela
-        for iid in self.tree.get_children():
-            self.tree.delete(iid)
-
-        # Carrega itens do repositório
-        try:
-            items = list(self.repo.list_all())
-        except Exception:
-            items = []
-
-        # Aplica filtro de busca
+    def query_ids(self):
+        """Backend SQLite: ids filtrados e ordenados em uma única consulta (mesmas regras de filter_ids)."""
         q = (self.q.get() or "").strip().lower()
-        if q:
-            def hit(t):
-                if q in (t.title or "").lower(): 
-                    return True
-                if q in str(getattr(t, "priority", "")): 
-                    return True
-                for tg in (t.tags or []):
-                    if q in (tg or "").lower(): 
-                        return True
-                return False
-            items = [t for t in items if hit(t)]
-
-        # Ordena as tarefas: feitas por último, depois prioridade e data
-        def sort_key(t):
-            sched = t.scheduled or "9999-99-99"
-            pri = getattr(t, "priority", 3) or 3
-            return (t.done, pri, sched, t.id)
-        items.sort(key=sort_key)
-
-        # Insere as tarefas na tabela
-        for t in items:
-            check = CHECK_OK if t.done else CHECK_UN
-            row_tags = ["done"] if t.done else [f"pri{getattr(t, 'priority', 3)}"]
-            self.tree.insert(
-                "", tk.END, iid=str(t.id),
-                values=(
-                    t.id,
-                    t.title,
-                    getattr(t, "priority", 3),
-                    _pretty_tags(t.tags),  # Tags formatadas
-                    t.scheduled or "",
-                    check
-                ),
-                tags=tuple(row_tags)
-            )
+        order = [("-" if desc else "") + col for col, desc in self.spec]
+        if q.startswith("#") and len(q) > 1:
+            return self.repo.query_ids(tag=self._tags_matching(q[1:]), order_by=order)
+        return self.repo.query_ids(text=q or None, order_by=order)
+
+    def _schedule_search(self):
+        """Agenda a atualização da busca (teclas seguidas reiniciam a espera)."""
+        if self._search_after is not None:
+            self.after_cancel(self._search_after)
+        self._search_after = self.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_after = None
+        self.refresh()
+
+    def _tags_matching(self, want: str):
+        """Tags do repositório iguais a `want` ignorando maiúsculas (ex.: '#python' acha 'Python')."""
+        return [tag for tag in self.repo.tags() if tag.lower() == want]
+
+    def refresh(self):
+        """Atualiza a tabela de tarefas com base no repositório e filtros, aplicando só as diferenças."""
+        # Ids filtrados pela busca, na ordem mantida pelo SortedTasks (sem reordenar a cada tecla) ou pelo banco
+        ids = self.query_ids() if self.sql else self.sorter.ordered(self.filter_ids())
+
+        # Reconciliação: só as linhas novas, removidas, alteradas ou fora de ordem (da janela visível) tocam o Treeview
+        self.table.set_ids(ids)
+
+    @staticmethod
+    def _row(t):
+        """Linha da tabela para a tarefa: (iid, valores, tags)."""
+        check = CHECK_OK if t.done else CHECK_UN
+        row_tags = ("done",) if t.done else (f"pri{getattr(t, 'priority', 3)}",)
+        values = (t.id, t.title, getattr(t, "priority", 3), _pretty_tags(t.tags), t.scheduled or "", check)
+        return str(t.id), values, row_tags
 
     def current_id(self):
         """Retorna o ID da tarefa selecionada na tabela."""
         sel = self.tree.selection()
         return int(sel[0]) if sel else None
 
+    def selected_ids(self):
+        """IDs de todas as tarefas selecionadas (seleção múltipla com Ctrl/Shift)."""
+        return [int(i) for i in self.tree.selection()]
+
     # ---------- eventos ----------
     def on_click(self, ev):
         """Lida com cliques na tabela, como marcar tarefas como concluídas."""
+        self._shift = bool(ev.state & 0x0001)  # Lido por sort_by ao soltar o clique no cabeçalho
         region = self.tree.identify("region", ev.x, ev.y)
         if region != "cell": return
         iid = self.tree.identify_row(ev.y)
@@ -170,16 +181,71 @@ class TasksTab(ttk.Frame):
             self.cm.do(EditTask(self.repo, tid, dlg.result)); self.refresh()
 
     def delete(self):
-        """Remove a tarefa selecionada."""
-        tid = self.current_id()
-        if not tid: return
-        self.cm.do(DeleteTask(self.repo, tid)); self.refresh()
+        """Remove as tarefas selecionadas (um único passo de desfazer)."""
+        ids = self.selected_ids()
+        if not ids: return
+        with self.cm.transaction(f"Excluir {len(ids)} tarefa(s)"):
+            for tid in ids:
+                self.cm.do(DeleteTask(self.repo, tid))
+        self.refresh()
+
+    def complete_selected(self):
+        """Marca como concluídas todas as tarefas selecionadas ainda em aberto."""
+        todo = [tid for tid in self.selected_ids() if not self.repo.get(tid).done]
+        if not todo: return
+        with self.cm.transaction(f"Concluir {len(todo)} tarefa(s)"):
+            for tid in todo:
+                self.cm.do(ToggleDone(self.repo, tid, stats=self.stats))
+        if self.profile:
+            self.profile.add_rewards(coins=5 * len(todo), xp=2 * len(todo))
+            CoinFloat.show(self.winfo_toplevel(), f"+{5 * len(todo)} 🪙", near_widget=self.tree, offset=(0, -10))
+        self.refresh()
+
+    def retag_selected(self):
+        """Substitui as tags de todas as tarefas selecionadas."""
+        ids = self.selected_ids()
+        if not ids: return
+        raw = simpledialog.askstring("Tags", f"Novas tags para {len(ids)} tarefa(s) (separadas por vírgula):", parent=self)
+        if raw is None: return
+        tags = list(dict.fromkeys(t.strip() for t in raw.split(",") if t.strip()))
+        with self.cm.transaction(f"Alterar tags de {len(ids)} tarefa(s)"):
+            for tid in ids:
+                self.cm.do(EditTask(self.repo, tid, {"tags": list(tags)}))
+        self.refresh()
 
     def sort_by(self, col):
-        """Define a coluna para ordenação e atualiza a tabela."""
-        self.sort_col = col
+        """
+        Clique no cabeçalho: ordena pela coluna (clicar de novo inverte).
+        Shift+clique: acrescenta a coluna como critério seguinte (ou inverte, se já estiver na lista).
+        """
+        spec = list(self.spec)
+        cols = [c for c, _ in spec]
+        if self._shift:
+            if col in cols:
+                i = cols.index(col); spec[i] = (col, not spec[i][1])
+            else:
+                spec.append((col, False))
+        elif cols == [col]:
+            spec = [(col, not spec[0][1])]
+        else:
+            spec = [(col, False)]
+        self._shift = False
+        if self.sorter is not None:
+            self.sorter.set_spec(spec); spec = self.sorter.spec
+        self.spec = spec
+        self._update_headings()
         self.refresh()
 
+    def _update_headings(self):
+        """Mostra ▲/▼ (e a ordem, se houver mais de um critério) nos cabeçalhos."""
+        spec = self.spec
+        for col, text in self._headers.items():
+            mark = ""
+            for i, (c, desc) in enumerate(spec):
+                if c == col:
+                    mark = (" ▼" if desc else " ▲") + (str(i + 1) if len(spec) > 1 else "")
+            self.tree.heading(col, text=text + mark)
+
     def export_csv(self):
         """Exporta as tarefas para um arquivo CSV."""
         import csv
@@ -0,0 +1,66 @@
+# test_fsm.py
+# Testes da máquina Pomodoro (fsm.py): o salto em O(1) de advance() tem de chegar ao mesmo estado que
+# avançar fase por fase, a pausa longa vem a cada `every` focos e simulate() aguenta um ano sem esperar.
+
+import os, sys, random
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # Módulos na raiz do projeto
+
+import pytest
+from fsm import PomodoroFSM, Schedule, simulate
+
+def _stepped(fsm: PomodoroFSM, now: float) -> PomodoroFSM:
+    """Referência: atravessa as fases uma a uma até `now`."""
+    while now >= fsm.deadline:
+        fsm._next()
+    return fsm
+
+@pytest.mark.parametrize("seed", range(20))
+def test_advance_matches_per_phase_stepping(seed):
+    rnd = random.Random(seed)
+    sch = (rnd.randint(1, 50) * 60, rnd.randint(1, 15) * 60, rnd.randint(1, 30) * 60, rnd.randint(1, 6))
+    for _ in range(20):
+        now = rnd.uniform(0, 3 * 86400)
+        fast = PomodoroFSM(*sch, clock=lambda: 0.0); fast.start(0.0)
+        slow = PomodoroFSM(*sch, clock=lambda: 0.0); slow.start(0.0)
+        done = fast.advance(now)
+        _stepped(slow, now)
+        assert (fast.state, fast.cycles, fast.deadline) == (slow.state, slow.cycles, slow.deadline)
+        assert done == slow.cycles
+        assert fast.remaining_at(now) == pytest.approx(slow.deadline - now)
+
+def test_long_break_every_n_focus():
+    fsm = PomodoroFSM(focus=60, short=10, long=30, every=3, clock=lambda: 0.0)
+    fsm.start(0.0)
+    states = [fsm.state]
+    for _ in range(12):
+        fsm._next(); states.append(fsm.state)
+    assert states == ["FOCUS", "BREAK", "FOCUS", "BREAK", "FOCUS", "LONG_BREAK",
+                      "FOCUS", "BREAK", "FOCUS", "BREAK", "FOCUS", "LONG_BREAK", "FOCUS"]
+    assert fsm.cycles == 6
+
+def test_pause_keeps_remaining_time():
+    t = [0.0]
+    fsm = PomodoroFSM(focus=100, short=10, long=20, every=2, clock=lambda: t[0])
+    fsm.start()
+    t[0] = 40.0; fsm.pause()
+    t[0] = 10_000.0
+    assert fsm.advance() == 0 and fsm.remaining == 60
+    fsm.resume(); t[0] = 10_060.0
+    assert fsm.advance() == 1 and fsm.state == "BREAK"
+
+def test_simulate_one_year():
+    year = 365 * 86400
+    sch = Schedule()  # 25/5/15, pausa longa a cada 4
+    fast = simulate(sch, year, timeline=False)
+    full = simulate(sch, year, timeline=True)
+    period = 4 * sch.focus + 3 * sch.short + sch.long
+    cycles, rest = divmod(year, period)
+    assert fast.sessions == full.sessions == cycles * 4 + min(4, (rest + sch.short) // (sch.focus + sch.short))
+    assert fast.long_breaks == fast.sessions // 4
+    assert (fast.end_state, fast.end_remaining) == (full.end_state, full.end_remaining)
+    assert fast.coins == full.coins and fast.focus_minutes == 25 * fast.sessions
+    # Linha do tempo contínua: cada fase começa onde a anterior terminou e a última é cortada no fim
+    starts = [s for s, _, _ in full.timeline]
+    assert starts[0] == 0.0 and all(a + d == b for (a, _, d), b in zip(full.timeline, starts[1:]))
+    last_start, _, last_dur = full.timeline[-1]
+    assert last_start + last_dur == year
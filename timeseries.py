@@ -0,0 +1,151 @@
+# timeseries.py
+# Este arquivo implementa uma série temporal diária compacta com agregados pré-calculados.
+# Os valores diários ficam em um array indexado pelo ordinal do dia; totais por semana, mês e ano
+# são mantidos incrementalmente a cada add(), então consultas longas (ex.: um ano por mês)
+# leem os agregados em vez de somar dia a dia.
+
+import datetime as dt
+from array import array
+from typing import Dict, List, Tuple, Union
+
+DayLike = Union[str, dt.date]
+GRANULARITIES = ("day", "week", "month", "year")
+
+def _ord(day: DayLike) -> int:
+    if isinstance(day, str):
+        day = dt.date.fromisoformat(day)
+    return day.toordinal()
+
+def _week_key(o: int) -> int:
+    return o - dt.date.fromordinal(o).weekday()  # ordinal da segunda-feira da semana
+
+def _month_key(o: int) -> int:
+    d = dt.date.fromordinal(o)
+    return d.year * 12 + d.month - 1
+
+def _year_key(o: int) -> int:
+    return dt.date.fromordinal(o).year
+
+# Início (ordinal) e rótulo de cada tipo de bucket a partir da chave
+def _bucket_start(gran: str, key: int) -> int:
+    if gran == "week": return key
+    if gran == "month": return dt.date(key // 12, key % 12 + 1, 1).toordinal()
+    if gran == "year": return dt.date(key, 1, 1).toordinal()
+    return key
+
+def _bucket_label(gran: str, key: int) -> str:
+    if gran == "week":
+        y, w, _ = dt.date.fromordinal(key).isocalendar()
+        return f"{y}-W{w:02}"
+    if gran == "month": return f"{key // 12:04}-{key % 12 + 1:02}"
+    if gran == "year": return f"{key:04}"
+    return dt.date.fromordinal(key).isoformat()
+
+def _next_key(gran: str, key: int) -> int:
+    return key + 7 if gran == "week" else key + 1
+
+_KEY_FN = {"day": lambda o: o, "week": _week_key, "month": _month_key, "year": _year_key}
+
+class DailySeries:
+    """
+    Série de contadores diários.
+    - add(dia, n): soma n ao dia e aos agregados de semana/mês/ano (O(1) amortizado).
+    - get(dia): valor de um dia.
+    - range(início, fim, granularidade): lista de (rótulo, valor) por dia/semana/mês/ano.
+    - total(início, fim): soma no intervalo usando os agregados.
+    """
+    def __init__(self):
+        self._base = 0  # Ordinal do primeiro dia armazenado
+        self._days = array("q")  # Valores diários a partir de _base
+        self._rollups: Dict[str, Dict[int, int]] = {"week": {}, "month": {}, "year": {}}
+
+    # ---------- escrita ----------
+    def add(self, day: DayLike, n: int = 1):
+        """Soma `n` ao dia e aos agregados correspondentes."""
+        o = _ord(day)
+        self._ensure(o)
+        self._days[o - self._base] += n
+        for gran, roll in self._rollups.items():
+            k = _KEY_FN[gran](o)
+            roll[k] = roll.get(k, 0) + n
+
+    def _ensure(self, o: int):
+        """Garante que o array cubra o ordinal `o` (cresce nas duas pontas)."""
+        if not self._days:
+            self._base = o
+            self._days.append(0)
+        elif o < self._base:
+            self._days = array("q", [0] * (self._base - o)) + self._days
+            self._base = o
+        elif o >= self._base + len(self._days):
+            self._days.extend([0] * (o - self._base - len(self._days) + 1))
+
+    # ---------- leitura ----------
+    def get(self, day: DayLike) -> int:
+        """Valor registrado no dia (0 se ausente)."""
+        i = _ord(day) - self._base
+        return self._days[i] if 0 <= i < len(self._days) else 0
+
+    def _sum_days(self, lo: int, hi: int) -> int:
+        """Soma direta dos dias [lo, hi] (ordinais inclusivos)."""
+        a = max(lo, self._base) - self._base
+        b = min(hi, self._base + len(self._days) - 1) - self._base
+        return sum(self._days[a:b + 1]) if a <= b else 0
+
+    def range(self, start: DayLike, end: DayLike, granularity: str = "day") -> List[Tuple[str, int]]:
+        """
+        Buckets de `granularity` que intersectam [start, end] (inclusivos), em ordem.
+        Buckets inteiros vêm dos agregados; apenas os das pontas, se parciais, somam dias.
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularidade inválida: {granularity}")
+        lo, hi = _ord(start), _ord(end)
+        if lo > hi:
+            return []
+        key_fn = _KEY_FN[granularity]
+        out: List[Tuple[str, int]] = []
+        k, last = key_fn(lo), key_fn(hi)
+        while k <= last:
+            b_lo = _bucket_start(granularity, k)
+            b_hi = _bucket_start(granularity, _next_key(granularity, k)) - 1
+            if granularity == "day":
+                val = self.get(dt.date.fromordinal(k))
+            elif b_lo >= lo and b_hi <= hi:
+                val = self._rollups[granularity].get(k, 0)
+            else:
+                val = self._sum_days(max(lo, b_lo), min(hi, b_hi))
+            out.append((_bucket_label(granularity, k), val))
+            k = _next_key(granularity, k)
+        return out
+
+    def total(self, start: DayLike, end: DayLike) -> int:
+        """Soma no intervalo [start, end] combinando anos, meses e dias das pontas."""
+        lo, hi = _ord(start), _ord(end)
+        total = 0
+        while lo <= hi:
+            d = dt.date.fromordinal(lo)
+            y_end = dt.date(d.year, 12, 31).toordinal()
+            if d.month == 1 and d.day == 1 and y_end <= hi:
+                total += self._rollups["year"].get(d.year, 0); lo = y_end + 1; continue
+            m_next = dt.date(d.year + (d.month == 12), d.month % 12 + 1, 1).toordinal()
+            if d.day == 1 and m_next - 1 <= hi:
+                total += self._rollups["month"].get(_month_key(lo), 0); lo = m_next; continue
+            stop = min(hi, m_next - 1)
+            total += self._sum_days(lo, stop); lo = stop + 1
+        return total
+
+    # ---------- serialização ----------
+    def to_dict(self) -> Dict[str, int]:
+        """Formato esparso {"YYYY-MM-DD": valor} usado no JSON (apenas dias não nulos)."""
+        return {dt.date.fromordinal(self._base + i).isoformat(): v for i, v in enumerate(self._days) if v}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> "DailySeries":
+        """Reconstrói a série (e os agregados) a partir do formato esparso."""
+        s = cls()
+        for day in sorted(data or {}):
+            try:
+                s.add(day, int(data[day]))
+            except (ValueError, TypeError):
+                continue  # Ignora entradas inválidas
+        return s
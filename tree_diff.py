@@ -0,0 +1,201 @@
+# tree_diff.py
+# Este arquivo implementa a reconciliação de linhas de um ttk.Treeview (lista plana).
+# Guarda o que já foi desenhado (iid -> valores/tags e a ordem) e, dada a nova lista ordenada,
+# emite só as chamadas necessárias: delete das linhas que saíram, item() das que mudaram,
+# insert das novas e move() apenas das linhas fora da maior subsequência já ordenada.
+
+import bisect
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+Row = Tuple[str, tuple, tuple]  # (iid, valores, tags)
+REORDER_DIRECT = 4_000_000  # Acima disso (linhas soltas × total), reposiciona linha a linha pelo índice
+
+def _lis_keep(seq: Sequence[int]) -> List[bool]:
+    """Marca os elementos de uma maior subsequência crescente de `seq` (O(n log n))."""
+    tails: List[int] = []  # Último valor de cada comprimento
+    tails_i: List[int] = []  # Índice em seq desse valor
+    prev = [-1] * len(seq)
+    for i, v in enumerate(seq):
+        k = bisect.bisect_left(tails, v)
+        if k == len(tails):
+            tails.append(v); tails_i.append(i)
+        else:
+            tails[k] = v; tails_i[k] = i
+        prev[i] = tails_i[k - 1] if k else -1
+    keep = [False] * len(seq)
+    i = tails_i[-1] if tails_i else -1
+    while i >= 0:
+        keep[i] = True
+        i = prev[i]
+    return keep
+
+class TreeReconciler:
+    """
+    Mantém um Treeview em sincronia com uma lista ordenada de linhas.
+    - apply(rows): aplica as diferenças e retorna contadores {"inserted", "deleted", "updated", "moved"}.
+    """
+    def __init__(self, tree, parent: str = ""):
+        self.tree = tree  # Treeview controlado
+        self.parent = parent  # Item pai das linhas ("" = raiz)
+        self._rows: Dict[str, Tuple[tuple, tuple]] = {}  # iid -> (valores, tags) desenhados
+        self._order: List[str] = []  # Ordem atual dos iids na tela
+
+    def __contains__(self, iid: str) -> bool:
+        return iid in self._rows
+
+    def apply(self, rows: Iterable[Row]) -> Dict[str, int]:
+        tree, parent = self.tree, self.parent
+        new_rows: Dict[str, Tuple[tuple, tuple]] = {}
+        order: List[str] = []
+        for iid, values, tags in rows:
+            new_rows[iid] = (tuple(values), tuple(tags))
+            order.append(iid)
+        stats = {"inserted": 0, "deleted": 0, "updated": 0, "moved": 0}
+
+        # 1) Linhas que saíram
+        gone = [iid for iid in self._order if iid not in new_rows]
+        if gone:
+            tree.delete(*gone)
+            stats["deleted"] = len(gone)
+        cur = [iid for iid in self._order if iid in new_rows]  # Espelho da ordem na tela
+
+        # 2) Linhas que mudaram de conteúdo
+        for iid in cur:
+            row = new_rows[iid]
+            if self._rows[iid] != row:
+                tree.item(iid, values=row[0], tags=row[1])
+                stats["updated"] += 1
+
+        # 3) Ordem: a maior subsequência já ordenada fica parada; o resto é movido/inserido após o antecessor
+        old_pos = {iid: i for i, iid in enumerate(cur)}
+        kept = [iid for iid in order if iid in old_pos]
+        anchored = set(iid for iid, k in zip(kept, _lis_keep([old_pos[i] for i in kept])) if k)
+        if len(anchored) != len(cur) or len(cur) != len(order):
+            loose = len(order) - len(anchored)
+            if loose * len(order) > REORDER_DIRECT:
+                # Reordenação grande: posiciona cada linha no seu índice (sem espelho O(n) por passo)
+                for i, iid in enumerate(order):
+                    if iid in old_pos:
+                        if iid not in anchored: stats["moved"] += 1
+                        tree.move(iid, parent, i)
+                    else:
+                        row = new_rows[iid]
+                        tree.insert(parent, i, iid=iid, values=row[0], tags=row[1])
+                        stats["inserted"] += 1
+            else:
+                for i, iid in enumerate(order):
+                    if iid in anchored:
+                        continue
+                    if iid in old_pos:
+                        cur.remove(iid)
+                    idx = cur.index(order[i - 1]) + 1 if i else 0
+                    if iid in old_pos:
+                        tree.move(iid, parent, idx)
+                        stats["moved"] += 1
+                    else:
+                        row = new_rows[iid]
+                        tree.insert(parent, idx, iid=iid, values=row[0], tags=row[1])
+                        stats["inserted"] += 1
+                    cur.insert(idx, iid)
+
+        self._rows = new_rows
+        self._order = order
+        return stats
+
+    def clear(self):
+        """Remove todas as linhas controladas."""
+        if self._order:
+            self.tree.delete(*self._order)
+        self._rows.clear(); self._order = []
+
+# Rolagem virtual: só a janela visível de linhas (mais uma folga) existe no Treeview
+class VirtualTree:
+    """
+    Exibe uma lista ordenada de ids materializando apenas as linhas visíveis + `overscan`.
+    - set_ids(ids): troca a lista (já filtrada/ordenada) e redesenha a janela atual.
+    - A barra de rolagem própria (ttk.Scrollbar) rola a posição na lista, não o Treeview.
+    Com até `threshold` linhas, todas são materializadas e a barra rola o Treeview normalmente.
+    """
+    def __init__(self, tree, scrollbar, row_fn, threshold: int = 2000, overscan: int = 10):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_fn = row_fn  # id -> (iid, valores, tags)
+        self.threshold = threshold
+        self.overscan = overscan
+        self.rows = TreeReconciler(tree)
+        self.ids: List = []
+        self.offset = 0  # Índice da primeira linha visível
+        self.virtual = None  # Modo atual (None = ainda não definido)
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tree.bind(seq, self._on_wheel, add="+")
+        tree.bind("<Prior>", lambda e: self._scroll_break(-self.visible()), add="+")
+        tree.bind("<Next>", lambda e: self._scroll_break(self.visible()), add="+")
+        tree.bind("<Configure>", lambda e: self.virtual and self.render(), add="+")
+
+    def visible(self) -> int:
+        """Quantas linhas cabem na área do Treeview."""
+        h = self.tree.winfo_height()
+        if h <= 1:
+            return int(self.tree.cget("height"))
+        try: rh = int(self.tree.tk.call("ttk::style", "lookup", "Treeview", "-rowheight") or 20)
+        except Exception: rh = 20
+        return max(1, (h - 24) // rh)  # Desconta o cabeçalho
+
+    def _set_mode(self, virtual: bool):
+        if virtual == self.virtual: return
+        self.virtual = virtual
+        if virtual:
+            self.tree.configure(yscrollcommand="")
+            self.scrollbar.configure(command=self._on_scrollbar)
+        else:
+            self.tree.configure(yscrollcommand=self.scrollbar.set)
+            self.scrollbar.configure(command=self.tree.yview)
+
+    def set_ids(self, ids: List):
+        self.ids = list(ids)
+        self._set_mode(len(self.ids) > self.threshold)
+        self.render()
+
+    def render(self):
+        n = len(self.ids)
+        if not self.virtual:
+            self.offset = 0
+            self.rows.apply(self.row_fn(i) for i in self.ids)
+            return
+        vis = self.visible()
+        self.offset = max(0, min(self.offset, n - vis))
+        start = max(0, self.offset - self.overscan)
+        end = min(n, self.offset + vis + self.overscan)
+        self.rows.apply(self.row_fn(i) for i in self.ids[start:end])
+        self.tree.yview_moveto(0)
+        if self.offset > start:
+            self.tree.yview_scroll(self.offset - start, "units")
+        self.scrollbar.set(self.offset / max(1, n), min(1.0, (self.offset + vis) / max(1, n)))
+
+    def scroll(self, delta: int):
+        """Rola `delta` linhas (negativo = para cima)."""
+        if not self.virtual:
+            self.tree.yview_scroll(delta, "units"); return
+        self.offset += delta
+        self.render()
+
+    def _scroll_break(self, delta: int):
+        self.scroll(delta)
+        return "break"
+
+    def _on_wheel(self, ev):
+        if not self.virtual: return None  # O Treeview rola sozinho
+        if getattr(ev, "num", None) == 4: step = -3
+        elif getattr(ev, "num", None) == 5: step = 3
+        else: step = -3 if ev.delta > 0 else 3
+        self.scroll(step)
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        """Comando da barra de rolagem no modo virtual ("moveto f" ou "scroll n units|pages")."""
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.ids))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self.offset += n * (self.visible() if args[2] == "pages" else 1)
+        self.render()
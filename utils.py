@@ -7,20 +7,47 @@
 # - PROFILE_PATH: Caminho para o arquivo de perfil do usuário.
 # - TASKS_PATH: Caminho para o arquivo de tarefas.
 # - STATS_PATH: Caminho para o arquivo de estatísticas.
+# - HISTORY_PATH: Caminho do histórico de desfazer das tarefas.
+# - POMODORO_PATH: Caminho do estado salvo do cronômetro Pomodoro.
+# - TASKS_JOURNAL: Ativa o journal de operações das tarefas.
+# - DECKS_JOURNAL: Ativa os patches por cartão nos baralhos.
+# - STORAGE_BACKEND / DB_PATH: Backend de armazenamento ("json" ou "sqlite") e caminho do banco.
 
-import os, json, datetime as dt
+import os, re, json, unicodedata, datetime as dt
 
 DATA_DIR = "data"
 DECKS_DIR = os.path.join(DATA_DIR, "decks")
 PROFILE_PATH = os.path.join(DATA_DIR, "profile.json")
 TASKS_PATH = os.path.join(DATA_DIR, "tasks.json")
 STATS_PATH = os.path.join(DATA_DIR, "stats.json")
+HISTORY_PATH = os.path.join(DATA_DIR, "history.json")
+POMODORO_PATH = os.path.join(DATA_DIR, "pomodoro.json")
+
+# Configurações de armazenamento (podem ser sobrescritas por variáveis de ambiente)
+# - TASKS_JOURNAL: grava cada mutação de tarefa como uma linha em tasks.journal em vez de reescrever tasks.json.
+TASKS_JOURNAL = os.environ.get("STUDYHUB_TASKS_JOURNAL", "1") != "0"
+# - DECKS_JOURNAL: grava cada alteração/revisão de cartão como uma linha em decks/<baralho>.journal.
+DECKS_JOURNAL = os.environ.get("STUDYHUB_DECKS_JOURNAL", "1") != "0"
+# - STORAGE_BACKEND: "json" (arquivos em data/) ou "sqlite" (data/studyhub.db, migrado uma vez dos JSON).
+STORAGE_BACKEND = os.environ.get("STUDYHUB_BACKEND", "json").strip().lower()
+DB_PATH = os.path.join(DATA_DIR, "studyhub.db")
 
 def ensure_data_dirs():
     """Garante que os diretórios de dados necessários existam."""
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(DECKS_DIR, exist_ok=True)
 
+def normalize_text(text: str) -> str:
+    """Minúsculas e sem acentos ("Função" -> "funcao"), para buscas e sugestões."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)  # Palavras para os índices de busca e de distratores
+
+def trigrams(word: str) -> set:
+    """Trigramas da palavra ("rede" -> {"red", "ede"}), para achar trechos de palavras."""
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
 def today_str():
     """Retorna a data atual no formato ISO (YYYY-MM-DD)."""
     return dt.date.today().isoformat()
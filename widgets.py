@@ -253,16 +253,31 @@ class TagChip(tk.Canvas):
     """
     Pílula fofinha com cor pastel, hover glow e botão 'x'.
     on_remove(tag), on_drag_start(tag), on_drag_over(tag), on_drag_end(tag) são callbacks do TagInput.
+    set_text(tag) redesenha a mesma pílula com outra tag (reaproveitada pelo TagInput).
     """
     def __init__(self, master, text, on_remove, on_drag_start=None, on_drag_over=None, on_drag_end=None):
-        self.text = text
-        self.bg = _hash_color(text)
-        self.fg = _contrast_fg(self.bg)
         super().__init__(master, width=1, height=1, bg=master.cget("bg"), highlightthickness=0, bd=0)
         self.on_remove = on_remove
         self._drag_start_cb = on_drag_start
         self._drag_over_cb  = on_drag_over
         self._drag_end_cb   = on_drag_end
+        self._over = None  # Último chip sob o ponteiro durante o arrasto
+
+        # binds
+        for tag in ("<Enter>", "<Leave>"):
+            self.bind(tag, self._hover)
+        for ev in ("<Button-1>", "<B1-Motion>", "<ButtonRelease-1>"):
+            self.bind(ev, self._drag_events)
+        # clique no x (o bind vale para os itens redesenhados com a tag "xbtn")
+        self.tag_bind("xbtn", "<Button-1>", lambda e: self.on_remove(self.text))
+        self.set_text(text)
+
+    def set_text(self, text):
+        """Desenha a pílula para `text` (apaga o desenho anterior)."""
+        self.text = text
+        self.bg = _hash_color(text)
+        self.fg = _contrast_fg(self.bg)
+        self.delete("all")
 
         # desenha
         padx, pady = 10, 6
@@ -286,17 +301,9 @@ class TagChip(tk.Canvas):
         x_r = 9
         cx = pill_w - (x_r + 6)
         cy = pill_h//2
-        self.btn_circle = self.create_oval(cx-x_r, cy-x_r, cx+x_r, cy+x_r, fill=_mix(self.bg, "#000000", 0.12), outline="")
-        self.btn_x = self.create_text(cx, cy, text="×", fill=self.fg, font=("Segoe UI", 9, "bold"))
-
-        # binds
-        for tag in ("<Enter>", "<Leave>"):
-            self.bind(tag, self._hover)
-        for ev in ("<Button-1>", "<B1-Motion>", "<ButtonRelease-1>"):
-            self.bind(ev, self._drag_events)
-        # clique no x
-        self.tag_bind(self.btn_circle, "<Button-1>", lambda e: self.on_remove(self.text))
-        self.tag_bind(self.btn_x,      "<Button-1>", lambda e: self.on_remove(self.text))
+        self.btn_circle = self.create_oval(cx-x_r, cy-x_r, cx+x_r, cy+x_r, fill=_mix(self.bg, "#000000", 0.12),
+                                           outline="", tags=("xbtn",))
+        self.btn_x = self.create_text(cx, cy, text="×", fill=self.fg, font=("Segoe UI", 9, "bold"), tags=("xbtn",))
 
     def _hover(self, e):
         if e.type == "7":  # Enter
@@ -308,12 +315,18 @@ class TagChip(tk.Canvas):
                 self.itemconfigure(it, fill=self.bg)
 
     def _drag_events(self, e):
-        # notifica o container (swap simples ao passar por cima)
+        # notifica o container (o chip arrastado vai para a posição do chip sob o ponteiro)
         if e.type == tk.EventType.ButtonPress:
+            self._over = self
             if self._drag_start_cb: self._drag_start_cb(self.text)
         elif e.type == tk.EventType.Motion:
-            if self._drag_over_cb:  self._drag_over_cb(self.text)
+            # Os movimentos chegam ao chip pressionado; o alvo é o widget sob o ponteiro
+            target = self.winfo_containing(e.x_root, e.y_root)
+            if isinstance(target, TagChip) and target is not self._over:
+                self._over = target
+                if self._drag_over_cb and target is not self: self._drag_over_cb(target.text)
         elif e.type == tk.EventType.ButtonRelease:
+            self._over = None
             if self._drag_end_cb:   self._drag_end_cb(self.text)
 
 class TagInput(ttk.Frame):
@@ -322,13 +335,19 @@ class TagInput(ttk.Frame):
       • chips fofas (TagChip) com cores;
       • Enter/',' cria, clique no '×' remove;
       • sugestões globais (TagsRepo) com drop-down;
+      • tags relacionadas (coocorrência com as chips atuais) clicáveis abaixo da caixa;
       • arrastar um chip por cima de outro troca a ordem.
     """
     def __init__(self, master, initial=None, repo: TagsRepo | None = None):
         super().__init__(master, style="Card.TFrame")
-        self.repo = repo or TagsRepo()
+        if repo is None:
+            from registry import tags_repo
+            repo = tags_repo()
+        self.repo = repo
         self.tags: list[str] = []
         self.dragging: str | None = None
+        self._chip_of: dict[str, TagChip] = {}  # tag -> chip exibido
+        self._pool: list[TagChip] = []  # Chips escondidos para reaproveitar
 
         # caixa externa com borda fininha
         self.box = tk.Frame(self, bg=self.master.cget("background"),
@@ -355,6 +374,10 @@ class TagInput(ttk.Frame):
         self.entry.bind(",", self._create_from_entry)
         self.entry.bind("<KeyRelease>", self._on_typing)
 
+        # linha de tags relacionadas (preenchida por _refresh_related)
+        self.related = tk.Frame(self.box, bg=self.master.cget("background"))
+        self.related.pack(fill=tk.X, padx=8, pady=(0, 4))
+
         # dropdown de sugestões
         self.dropdown = None
 
@@ -398,6 +421,18 @@ class TagInput(ttk.Frame):
         lb.bind("<Button-1>", lambda e, lb=lb: self._pick_from_list(lb))
         lb.bind("<Return>",   lambda e, lb=lb: self._pick_from_list(lb))
 
+    def _refresh_related(self):
+        """Mostra as tags que costumam aparecer junto das chips atuais (clique adiciona)."""
+        for w in self.related.winfo_children(): w.destroy()
+        items = self.repo.related(self.tags) if self.tags else []
+        if not items: return
+        bg = self.related.cget("bg")
+        tk.Label(self.related, text="Relacionadas:", bg=bg, fg="#6B7280").pack(side=tk.LEFT)
+        for t in items:
+            lb = tk.Label(self.related, text=f"＋ {t}", bg=bg, fg="#4F46E5", cursor="hand2")
+            lb.pack(side=tk.LEFT, padx=(6, 0))
+            lb.bind("<Button-1>", lambda e, t=t: self._add_tag(t))
+
     def _close_dropdown(self):
         if self.dropdown and self.dropdown.winfo_exists(): self.dropdown.destroy()
         self.dropdown = None
@@ -419,29 +454,36 @@ class TagInput(ttk.Frame):
         for p in parts: self._add_tag(p)
         self.entry_var.set(""); self._ph_on = False; self._close_dropdown()
 
-    def _add_tag(self, t: str):
-        if t in self.tags: return
-        self.tags.append(t)
-        chip = TagChip(self.chips, t,
+    def _chip(self, t: str) -> TagChip:
+        """Chip para a tag: reaproveita um escondido do pool ou cria um novo."""
+        if self._pool:
+            chip = self._pool.pop(); chip.set_text(t)
+            return chip
+        return TagChip(self.chips, t,
                        on_remove=self._remove_tag,
                        on_drag_start=self._drag_start,
                        on_drag_over=self._drag_over,
                        on_drag_end=self._drag_end)
-        chip.pack(side=tk.LEFT, padx=4, pady=2)
-        self.repo.add_many([t])
+
+    def _release(self, t: str):
+        chip = self._chip_of.pop(t, None)
+        if chip is not None:
+            chip.pack_forget(); self._pool.append(chip)
+
+    def _add_tag(self, t: str, refresh: bool = True):
+        if t in self.tags: return
+        self.tags.append(t)
+        chip = self._chip_of[t] = self._chip(t)
+        chip.pack(side=tk.LEFT, padx=4, pady=2)  # Vai para o fim da linha
+        if refresh: self._refresh_related()
 
     def _remove_tag(self, t: str):
-        self.tags = [x for x in self.tags if x != t]
-        for w in self.chips.winfo_children(): w.destroy()
-        for t2 in self.tags:
-            TagChip(self.chips, t2,
-                    on_remove=self._remove_tag,
-                    on_drag_start=self._drag_start,
-                    on_drag_over=self._drag_over,
-                    on_drag_end=self._drag_end)\
-                .pack(side=tk.LEFT, padx=4, pady=2)
-
-    # ---------- drag & drop (swap ao passar por cima) ----------
+        if t not in self.tags: return
+        self.tags.remove(t)
+        self._release(t)  # Os demais chips ficam onde estão
+        self._refresh_related()
+
+    # ---------- drag & drop (move o chip existente para a posição do alvo) ----------
     def _drag_start(self, tag: str):
         self.dragging = tag
 
@@ -452,24 +494,21 @@ class TagInput(ttk.Frame):
         except ValueError:
             return
         if i == j: return
-        self.tags[i], self.tags[j] = self.tags[j], self.tags[i]
-        for w in self.chips.winfo_children(): w.destroy()
-        for t in self.tags:
-            TagChip(self.chips, t,
-                    on_remove=self._remove_tag,
-                    on_drag_start=self._drag_start,
-                    on_drag_over=self._drag_over,
-                    on_drag_end=self._drag_end)\
-                .pack(side=tk.LEFT, padx=4, pady=2)
+        self.tags.insert(j, self.tags.pop(i))
+        chip, target = self._chip_of[self.dragging], self._chip_of[target_tag]
+        # Reordena o próprio widget na fila do pack (nenhum chip é recriado)
+        if j < i: chip.pack_configure(before=target)
+        else: chip.pack_configure(after=target)
 
     def _drag_end(self, _=None):
         self.dragging = None
 
     # ---------- API ----------
     def set_tags(self, tags):
+        for t in self.tags: self._release(t)
         self.tags = []
-        for w in self.chips.winfo_children(): w.destroy()
-        for t in tags: self._add_tag(t)
+        for t in tags: self._add_tag(t, refresh=False)
+        self._refresh_related()
 
     def get_tags(self):
         return list(self.tags)